@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import numpy as np
+from solver import scatter_add
+
+def zz_error_indicator(batch, potential):
+    """
+    Estimador de Zienkiewicz-Zhu por elemento (P1). O gradiente recuperado G* é a média
+    nodal dos gradientes dos elementos ponderada pela área; o indicador é a norma de energia
+    de G* - G_h, integrada pelos vértices:  eta_e^2 = k_e * Delta_e/3 * sum_i |G*_i - G_e|^2,
+    com k_e o coeficiente do material (eps ou nu). Retorna eta (E,) e a norma de energia da
+    solução (para o erro relativo).
+    """
+    dx, dy = batch.gradient(potential)
+    numNodes = len(potential)
+    tri = batch.triElements
+    coef = getattr(batch, batch.materialProperties[0])
+    # Recuperação nodal: média ponderada pela área dos elementos vizinhos
+    weights = np.repeat(batch.Delta[:, None], 3, axis=1)
+    area = scatter_add(tri, weights, numNodes)
+    area[area == 0] = 1.0
+    gx = scatter_add(tri, weights * dx[:, None], numNodes) / area
+    gy = scatter_add(tri, weights * dy[:, None], numNodes) / area
+
+    jump = np.abs(gx[tri] - dx[:, None]) ** 2 + np.abs(gy[tri] - dy[:, None]) ** 2
+    eta = np.sqrt(coef * batch.Delta / 3 * jump.sum(axis=1))
+    energy = np.sqrt(np.sum(coef * batch.Delta * (np.abs(dx) ** 2 + np.abs(dy) ** 2)))
+    return eta, energy
+
+def mark_elements(eta, theta=0.5):
+    """Marcação de Dörfler: menor conjunto de elementos com sum(eta^2) >= theta * total."""
+    order = np.argsort(eta ** 2)[::-1]
+    cumulative = np.cumsum(eta[order] ** 2)
+    count = np.searchsorted(cumulative, theta * cumulative[-1]) + 1
+    marked = np.zeros(len(eta), dtype=bool)
+    marked[order[:count]] = True
+    return marked
+
+def refine_mesh(nodes, triElements, marked, boundaryNodes=None):
+    """
+    Bissecção pela maior aresta com fechamento de conformidade. Toda aresta marcada também
+    marca a maior aresta dos elementos vizinhos, até estabilizar; cada elemento é então
+    dividido em 2, 3 ou 4 triângulos (primeiro pela maior aresta, depois pelas demais
+    arestas marcadas nos filhos), o que preserva a qualidade dos ângulos.
+    boundaryNodes: {nome: nós} — os pontos médios de arestas de contorno cujos dois extremos
+    pertencem ao grupo entram no grupo (ficam sobre a corda, não sobre a curva original).
+    Retorna novos nós, nova conectividade, o elemento pai de cada filho e os grupos de contorno.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    tri = np.asarray(triElements, dtype=np.int64)
+    numNodes = len(nodes)
+
+    # Arestas locais (0-1, 1-2, 2-0) e numeração global das arestas
+    localEdges = np.stack([tri[:, [0, 1]], tri[:, [1, 2]], tri[:, [2, 0]]], axis=1)   # (E, 3, 2)
+    sortedEdges = np.sort(localEdges, axis=2).reshape(-1, 2)
+    edges, edgeIndex = np.unique(sortedEdges, axis=0, return_inverse=True)
+    elemEdges = edgeIndex.reshape(-1, 3)
+
+    lengths = np.linalg.norm(nodes[edges[:, 0], :2] - nodes[edges[:, 1], :2], axis=1)
+    longest = np.argmax(lengths[elemEdges], axis=1)
+    longestEdge = elemEdges[np.arange(len(tri)), longest]
+
+    markedEdge = np.zeros(len(edges), dtype=bool)
+    markedEdge[longestEdge[marked]] = True
+    while True:
+        pending = markedEdge[elemEdges].any(axis=1) & ~markedEdge[longestEdge]
+        if not pending.any():
+            break
+        markedEdge[longestEdge[pending]] = True
+
+    # Novos nós nos pontos médios das arestas marcadas
+    midpoint = np.full(len(edges), -1, dtype=np.int64)
+    midpoint[markedEdge] = numNodes + np.arange(markedEdge.sum())
+    newNodes = np.vstack([nodes, 0.5 * (nodes[edges[markedEdge, 0]] + nodes[edges[markedEdge, 1]])])
+
+    # Gira cada elemento para que a maior aresta seja (v0, v1)
+    rows = np.arange(len(tri))[:, None]
+    rotation = (longest[:, None] + np.arange(3)) % 3
+    v = tri[rows, rotation]
+    m = midpoint[elemEdges[rows, rotation]]          # pontos médios de (v0v1, v1v2, v2v0)
+    refined = m[:, 0] >= 0
+
+    children, parents = [tri[~refined]], [np.flatnonzero(~refined)]
+    v0, v1, v2, m01, m12, m20 = (a[refined] for a in (v[:, 0], v[:, 1], v[:, 2], m[:, 0], m[:, 1], m[:, 2]))
+    parent = np.flatnonzero(refined)
+    # Filho A = (v0, m01, v2), dividido de novo se v2-v0 estiver marcada
+    splitA = m20 >= 0
+    children += [np.column_stack([v0, m01, v2])[~splitA],
+                 np.column_stack([v0, m01, m20])[splitA], np.column_stack([m20, m01, v2])[splitA]]
+    parents += [parent[~splitA], parent[splitA], parent[splitA]]
+    # Filho B = (m01, v1, v2), dividido de novo se v1-v2 estiver marcada
+    splitB = m12 >= 0
+    children += [np.column_stack([m01, v1, v2])[~splitB],
+                 np.column_stack([m01, v1, m12])[splitB], np.column_stack([m01, m12, v2])[splitB]]
+    parents += [parent[~splitB], parent[splitB], parent[splitB]]
+
+    newBoundary = {}
+    if boundaryNodes:
+        # Arestas de contorno pertencem a um único elemento
+        onBoundary = np.bincount(edgeIndex, minlength=len(edges)) == 1
+        candidates = np.flatnonzero(markedEdge & onBoundary)
+        for name, groupNodes in boundaryNodes.items():
+            inGroup = np.zeros(numNodes, dtype=bool)
+            inGroup[np.asarray(list(groupNodes), dtype=np.int64)] = True
+            added = candidates[inGroup[edges[candidates, 0]] & inGroup[edges[candidates, 1]]]
+            newBoundary[name] = np.concatenate([np.flatnonzero(inGroup), midpoint[added]])
+
+    return newNodes, np.concatenate(children), np.concatenate(parents), newBoundary
+
+def refine_batch(batch, nodes, triElements, parent):
+    """Batch da malha refinada; os filhos herdam os materiais e fontes do elemento pai."""
+    refined = type(batch)(nodes, triElements)
+    for name in batch.properties:
+        setattr(refined, name, getattr(batch, name)[parent])
+    refined.computeMatrix()
+    return refined
+
+def adaptive_refinement(solver, tol=0.05, max_dofs=200000, max_iterations=10, theta=0.5, run_dir=None):
+    """
+    Laço adaptativo: resolve, estima o erro (ZZ), marca (Dörfler) e refina até o erro
+    relativo estimado ficar abaixo de `tol` ou a malha passar de `max_dofs` nós.
+    Os DOFs, o erro e os tempos de cada iteração vão para run_dir/adaptivity.json.
+    Retorna o solver da última malha, já resolvido.
+    """
+    if solver.batch.order != 1:
+        raise ValueError("Refinamento adaptativo disponível apenas para elementos P1.")
+    history = []
+    for iteration in range(max_iterations + 1):
+        t0 = time.perf_counter()
+        solver.apply_boundary_conditions()
+        solver.assemble_global_matrix_and_vector()
+        solver.solve()
+        t1 = time.perf_counter()
+        eta, energy = zz_error_indicator(solver.batch, solver.potential)
+        error = float(np.sqrt(np.sum(eta ** 2)) / energy) if energy > 0 else 0.0
+        t2 = time.perf_counter()
+
+        record = {
+            "iteration": iteration,
+            "dofs": int(solver.numNodes),
+            "free_dofs": int(len(solver.freeNodes)),
+            "elements": int(solver.numElements),
+            "estimated_error": error,
+            "solve_time": t1 - t0,
+            "estimate_time": t2 - t1,
+        }
+        history.append(record)
+        print(f"Adaptativo [{iteration}]: {solver.numNodes} DOFs, {solver.numElements} elementos, "
+              f"erro estimado {error:.3e}")
+        if error <= tol or solver.numNodes >= max_dofs or iteration == max_iterations:
+            break
+
+        marked = mark_elements(eta, theta)
+        boundaryNodes = {name: props['nodes'] for name, props in solver.boundaryConditions.items()}
+        nodes, triElements, parent, boundaryNodes = refine_mesh(solver.nodes, solver.batch.triElements,
+                                                                marked, boundaryNodes)
+        boundaryConditions = {name: {**props, 'nodes': boundaryNodes[name]}
+                              for name, props in solver.boundaryConditions.items()}
+        batch = refine_batch(solver.batch, nodes, triElements, parent)
+        solver = solver.with_mesh(nodes, triElements, batch, boundaryConditions)
+        record["marked"] = int(marked.sum())
+        record["refine_time"] = time.perf_counter() - t2
+
+    if run_dir is not None:
+        os.makedirs(run_dir, exist_ok=True)
+        with open(os.path.join(run_dir, "adaptivity.json"), "w") as f:
+            json.dump({"tol": tol, "max_dofs": max_dofs, "theta": theta, "iterations": history}, f, indent=4)
+    return solver
@@ -7,6 +7,7 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
+import numpy as np
 from datetime import datetime
 import shutil
 import subprocess
@@ -16,6 +17,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import CONFIG
 from backend.training_manager import training_manager
+from backend.mesh_jobs import mesh_jobs
+from utils.field_store import FieldStore, open_fields
+from utils.mesh_catalog import mesh_catalog
 
 app = FastAPI(title="PINN Benchmark API")
 
@@ -53,9 +57,17 @@ class ConfigUpdate(BaseModel):
     mu: Optional[float] = None
     Nx_train: Optional[int] = None
     Ny_train: Optional[int] = None
+    fem_solver: Optional[Dict[str, Any]] = None
+    fem_adaptivity: Optional[Dict[str, Any]] = None
 
 class MeshGenRequest(BaseModel):
     type: str
+    # Parâmetros do gerador (n_slots, r_in, lc, order, seed...); ausentes usam os defaults
+    params: Dict[str, Any] = {}
+    # Varredura: parâmetro -> lista de valores (produto cartesiano, gerado em paralelo)
+    grid: Optional[Dict[str, List[Any]]] = None
+    # False: retorna logo com os job_ids (acompanhar em /mesh/jobs/{job_id})
+    wait: bool = True
 
 # --- ROUTES ---
 
@@ -82,40 +94,36 @@ def get_metrics():
             return {"error": str(e)}
     return {}
 
+MESH_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "meshes", "files")
+
 @app.get("/meshes")
-def list_meshes():
-    mesh_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "meshes", "files")
-    if not os.path.exists(mesh_dir):
-        return []
-    return [f for f in os.listdir(mesh_dir) if f.endswith(".msh")]
+def list_meshes(details: bool = False):
+    # Catálogo JSON: só os.stat por arquivo; o .msh é lido apenas quando muda
+    entries = mesh_catalog(MESH_DIR).list()
+    if details:
+        return entries
+    return [entry["filename"] for entry in entries]
 
-@app.get("/meshes/{filename}/boundaries")
-def get_mesh_boundaries(filename: str):
+def _mesh_entry(filename):
     if not filename.endswith(".msh") or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
-    mesh_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "meshes", "files", filename)
-    if not os.path.exists(mesh_path):
-        raise HTTPException(status_code=404, detail="Mesh not found")
-    boundaries = []
     try:
-        in_section = False
-        with open(mesh_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line == "$PhysicalNames":
-                    in_section = True
-                    continue
-                if line == "$EndPhysicalNames":
-                    break
-                if in_section and '"' in line:
-                    parts = line.split()
-                    dim = int(parts[0])
-                    name = line.split('"')[1]
-                    if dim == 1:  # only boundary lines, not surface domains
-                        boundaries.append(name)
+        return mesh_catalog(MESH_DIR).get(filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Mesh not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return boundaries
+
+@app.get("/meshes/{filename}")
+def get_mesh_info(filename: str):
+    return _mesh_entry(filename)
+
+@app.get("/meshes/{filename}/boundaries")
+def get_mesh_boundaries(filename: str):
+    entry = _mesh_entry(filename)
+    if "error" in entry:
+        raise HTTPException(status_code=422, detail=f"Invalid mesh file: {entry['error']}")
+    return entry["boundaries"]
 
 @app.get("/runs")
 def list_runs():
@@ -165,6 +173,87 @@ def get_run_details(run_id: str):
             
     return details
 
+def _run_profile(run_path):
+    """Perfil FEM (fem_profile) e custo do PINN de um run, com a malha usada."""
+    metrics, config = {}, {}
+    try:
+        with open(os.path.join(run_path, "metrics.json"), "r") as f:
+            metrics = json.load(f)
+        with open(os.path.join(run_path, "config.json"), "r") as f:
+            config = json.load(f)
+    except Exception:
+        pass
+    return {
+        "id": os.path.basename(run_path),
+        "problem": config.get("problem"),
+        "mesh_file": config.get("mesh_file"),
+        "pinn_time": metrics.get("pinn_time"),
+        "fem_profile": metrics.get("fem_profile"),
+    }
+
+@app.get("/runs/{run_id}/profile")
+def get_run_profile(run_id: str):
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
+    run_path = os.path.join(results_dir, run_id)
+    if not os.path.exists(run_path):
+        raise HTTPException(status_code=404, detail="Run not found")
+    return _run_profile(run_path)
+
+@app.get("/profiles")
+def list_profiles():
+    """Perfis FEM x PINN de todos os runs que registraram fem_profile (comparação entre malhas)."""
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
+    if not os.path.exists(results_dir):
+        return []
+    profiles = []
+    for d in sorted(os.listdir(results_dir)):
+        run_path = os.path.join(results_dir, d)
+        if d == "latest" or not os.path.isdir(run_path):
+            continue
+        profile = _run_profile(run_path)
+        if profile["fem_profile"] is not None:
+            profiles.append(profile)
+    return profiles
+
+# Máximo de valores devolvidos por requisição de fatia (o resto fica no memmap)
+MAX_FIELD_VALUES = 200000
+
+def _field_store(run_id):
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
+    store_dir = os.path.join(results_dir, run_id, "fem_fields")
+    if not FieldStore.exists(store_dir):
+        raise HTTPException(status_code=404, detail="Run has no stored FEM fields")
+    return open_fields(store_dir)
+
+@app.get("/runs/{run_id}/fields")
+def get_run_fields(run_id: str):
+    """Cabeçalho (fields.json) dos campos FEM gravados pelo run."""
+    return _field_store(run_id).header
+
+@app.get("/runs/{run_id}/fields/{name}")
+def get_run_field(run_id: str, name: str, start: int = 0, stop: Optional[int] = None, step: int = 1):
+    """Fatia [start:stop:step] de um campo (ou de 'nodes'/'elements') lida via memmap."""
+    store = _field_store(run_id)
+    if name == "nodes":
+        values = store.nodes
+    elif name == "elements":
+        values = store.triElements
+    elif name in store.names:
+        values = store.field(name)
+    else:
+        raise HTTPException(status_code=404, detail=f"Field '{name}' not found")
+    if step < 1:
+        raise HTTPException(status_code=400, detail="step must be >= 1")
+    chunk = values[start:stop:step]
+    if chunk.size > MAX_FIELD_VALUES:
+        raise HTTPException(status_code=400, detail=f"Slice too large ({chunk.size} > {MAX_FIELD_VALUES} values)")
+    if np.iscomplexobj(chunk):
+        data = {"real": chunk.real.tolist(), "imag": chunk.imag.tolist()}
+    else:
+        data = chunk.tolist()
+    return {"name": name, "start": start, "stop": stop, "step": step,
+            "shape": list(chunk.shape), "dtype": chunk.dtype.str, "values": data}
+
 @app.delete("/runs/{run_id}")
 def delete_run(run_id: str):
     results_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "results")
@@ -234,10 +323,46 @@ async def upload_mesh(file: UploadFile = File(...)):
     try:
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
-        return {"status": "success", "message": f"Mesh {file.filename} uploaded", "filename": file.filename}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {e}")
 
+    # O arquivo já está gravado: falha de leitura da malha vai como campo, não como erro HTTP
+    response = {"status": "success", "message": f"Mesh {file.filename} uploaded", "filename": file.filename}
+    try:
+        entry = mesh_catalog(mesh_dir).update(file.filename)
+        if "error" in entry:
+            response["catalog_error"] = entry["error"]
+    except Exception as e:
+        response["catalog_error"] = str(e)
+    return response
+
+@app.post("/mesh/generate")
+async def generate_mesh(request: MeshGenRequest):
+    try:
+        if request.grid:
+            jobs = mesh_jobs.submit_grid(request.type, request.params, request.grid)
+        else:
+            jobs = [mesh_jobs.submit(request.type, request.params)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Mesh generator unavailable: {e}")
+
+    if request.wait:
+        jobs = await mesh_jobs.wait([job["job_id"] for job in jobs])
+    return {"jobs": jobs}
+
+@app.get("/mesh/jobs/{job_id}")
+def get_mesh_job(job_id: str):
+    job = mesh_jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.on_event("shutdown")
+def shutdown_mesh_jobs():
+    mesh_jobs.shutdown()
+
 @app.get("/docs/{filename}")
 def get_documentation(filename: str):
     allowed_files = {
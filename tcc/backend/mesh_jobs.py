@@ -0,0 +1,164 @@
+import os
+import json
+import shutil
+import asyncio
+import hashlib
+import inspect
+import itertools
+import importlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from utils.mesh_catalog import mesh_catalog
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MESH_DIR = os.path.join(ROOT_DIR, "meshes", "files")
+
+# Tipo de malha -> (módulo, função geradora). O gmsh só é importado quando o tipo é usado.
+GENERATORS = {
+    "stator": ("utils.generate_stator", "generate_stator_mesh"),
+    "plate_holes": ("utils.generate_plate_holes", "generate_plate_holes"),
+    "lshape": ("utils.generate_lshape", "generate_lshape"),
+}
+
+def _generator(kind):
+    if kind not in GENERATORS:
+        raise ValueError(f"Tipo de malha desconhecido: {kind} (disponíveis: {', '.join(GENERATORS)})")
+    module, function = GENERATORS[kind]
+    return getattr(importlib.import_module(module), function)
+
+def _generate(kind, params, filename):
+    """
+    Executado no processo do pool: gera em um diretório temporário e renomeia para o nome
+    final (uma malha parcial nunca aparece em meshes/files). O cache de arrays da malha
+    (utils.mesh_cache) já é preenchido aqui, fora do processo do servidor.
+    """
+    from utils.mesh_cache import load_mesh
+
+    staging = tempfile.mkdtemp(dir=os.path.dirname(filename), prefix=".gen-")
+    try:
+        partial = os.path.join(staging, os.path.basename(filename))
+        _generator(kind)(filename=partial, **params)
+        os.replace(partial, filename)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    mesh = load_mesh(filename)
+    return {
+        "num_nodes": int(len(mesh.points)),
+        "num_elements": int(len(mesh.triangles)),
+        "order": mesh.order,
+        "boundaries": mesh.boundary_names,
+    }
+
+class MeshJobManager:
+    """
+    Geração de malhas gmsh em um pool de processos. Cada combinação (tipo, parâmetros com os
+    defaults do gerador) tem um hash que dá nome ao arquivo (<tipo>_<hash>.msh) e ao job: um
+    pedido repetido devolve o arquivo existente sem rodar o gmsh, e pedidos iguais em
+    andamento compartilham o mesmo job.
+    """
+    def __init__(self, mesh_dir: str = MESH_DIR, max_workers: Optional[int] = None):
+        self.mesh_dir = mesh_dir
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+    def _pool(self):
+        if self.executor is None:
+            # spawn: o gmsh não é seguro após fork de um processo com threads (uvicorn)
+            self.executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.executor
+
+    @staticmethod
+    def resolve_params(kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Parâmetros completos (defaults do gerador + pedido); nomes desconhecidos são erro."""
+        signature = inspect.signature(_generator(kind))
+        defaults = {name: p.default for name, p in signature.parameters.items() if name != "filename"}
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Parâmetros inválidos para '{kind}': {', '.join(sorted(unknown))}")
+        resolved = {**defaults, **params}
+        # Sem seed os furos são aleatórios e o cache por parâmetros não faria sentido
+        if "seed" in resolved and resolved["seed"] is None:
+            resolved["seed"] = 0
+        return resolved
+
+    @staticmethod
+    def job_id(kind: str, params: Dict[str, Any]) -> str:
+        key = json.dumps({"type": kind, "params": params}, sort_keys=True, default=str)
+        return f"{kind}_{hashlib.md5(key.encode('utf-8')).hexdigest()[:12]}"
+
+    def _record(self, job):
+        record = {name: job[name] for name in ("job_id", "type", "params", "filename")}
+        future = job.get("future")
+        if future is None:
+            record["status"] = "cached"
+        elif not future.done():
+            record["status"] = "running"
+        elif future.exception() is not None:
+            record["status"] = "error"
+            record["error"] = str(future.exception())
+        else:
+            record["status"] = "completed"
+            record.update(future.result())
+        return record
+
+    def _catalog(self, future, filename):
+        # Malha nova entra no catálogo assim que o worker termina
+        if not future.cancelled() and future.exception() is None:
+            mesh_catalog(self.mesh_dir).update(filename)
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        params = self.resolve_params(kind, params)
+        job_id = self.job_id(kind, params)
+        filename = f"{job_id}.msh"
+        job = self.jobs.get(job_id)
+        # Job com erro é refeito; job em andamento ou concluído é reaproveitado
+        if job is not None and job.get("future") is not None and job["future"].done() \
+                and job["future"].exception() is not None:
+            job = None
+        if job is None:
+            job = {"job_id": job_id, "type": kind, "params": params, "filename": filename}
+            path = os.path.join(self.mesh_dir, filename)
+            if not os.path.exists(path):
+                os.makedirs(self.mesh_dir, exist_ok=True)
+                try:
+                    job["future"] = self._pool().submit(_generate, kind, params, path)
+                except BrokenProcessPool:
+                    # Um worker morreu (ex.: crash do gmsh): recria o pool uma vez
+                    self.executor = None
+                    job["future"] = self._pool().submit(_generate, kind, params, path)
+                job["future"].add_done_callback(lambda future: self._catalog(future, filename))
+            self.jobs[job_id] = job
+        return self._record(job)
+
+    def submit_grid(self, kind: str, params: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """Produto cartesiano de grid (parâmetro -> lista de valores) sobre params; tudo em paralelo."""
+        names = list(grid)
+        return [self.submit(kind, {**params, **dict(zip(names, values))})
+                for values in itertools.product(*(grid[name] for name in names))]
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if job_id in self.jobs:
+            return self._record(self.jobs[job_id])
+        # Gerada em outra execução do servidor: o nome do arquivo é o próprio job_id
+        if os.path.exists(os.path.join(self.mesh_dir, f"{job_id}.msh")):
+            return {"job_id": job_id, "filename": f"{job_id}.msh", "status": "cached"}
+        return None
+
+    async def wait(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        futures = [self.jobs[job_id]["future"] for job_id in job_ids if self.jobs[job_id].get("future")]
+        if futures:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        return [self._record(self.jobs[job_id]) for job_id in job_ids]
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+mesh_jobs = MeshJobManager()
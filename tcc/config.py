@@ -20,7 +20,8 @@ def load_config(path=None):
             "use_mesh": True,
             "boundary_conditions": {"Left": 1.0, "Right": 0.0},
             "scaling_factor": 100.0,
-            "slice_config": {"type": "linear"}
+            "slice_config": {"type": "linear"},
+            "fem_solver": {"method": "direct", "preconditioner": "none"}
         }
 
 # Alias para manter compatibilidade com main.py
@@ -0,0 +1,179 @@
+import os
+import warnings
+import multiprocessing
+import numpy as np
+from scipy.sparse import csr_matrix, diags
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import splu, cg, bicgstab, LinearOperator
+from linear_solvers import DirectSolver
+
+def partition_nodes(A, numParts):
+    """
+    Particiona o grafo de A (conectividade dos triângulos restrita aos nós livres) em
+    numParts subdomínios: a ordem de Cuthill-McKee reversa percorre o grafo por níveis de
+    BFS e é cortada em fatias contíguas de mesmo tamanho, o que dá faixas conexas com
+    interfaces curtas em malhas 2D. Os nós de interface são os que têm vizinho em outra parte.
+    Retorna part (n,) com o subdomínio de cada nó e a máscara interface (n,).
+    """
+    A = csr_matrix(A)
+    n = A.shape[0]
+    order = reverse_cuthill_mckee(A, symmetric_mode=True)
+    part = np.empty(n, dtype=np.int64)
+    part[order] = np.arange(n) * numParts // max(n, 1)
+    coo = A.tocoo()
+    cut = part[coo.row] != part[coo.col]
+    interface = np.zeros(n, dtype=bool)
+    interface[coo.row[cut]] = True
+    return part, interface
+
+def _subdomain_worker(conn, A_ii, A_ig, A_gi):
+    """
+    Processo persistente de um subdomínio: fatora A_ii uma vez e atende pedidos pelo Pipe.
+      ("schur", x_g)    -> A_gi A_ii^-1 A_ig x_g   (contribuição ao produto pelo complemento de Schur)
+      ("rhs", b_i)      -> A_gi A_ii^-1 b_i        (condensação do lado direito)
+      ("back", b_i, x_g) -> A_ii^-1 (b_i - A_ig x_g)  (recuperação do interior)
+    """
+    try:
+        lu = splu(A_ii.tocsc())
+        conn.send(("ready", None))
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+    while True:
+        message = conn.recv()
+        command = message[0]
+        if command == "stop":
+            break
+        try:
+            if command == "schur":
+                result = A_gi @ lu.solve(A_ig @ message[1])
+            elif command == "rhs":
+                result = A_gi @ lu.solve(message[1])
+            else:
+                result = lu.solve(message[1] - A_ig @ message[2])
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+    conn.close()
+
+class SchurComplement:
+    """
+    Subestruturação do sistema reduzido A x = b: cada interior A_ii é fatorado num processo
+    próprio (Process + Pipe, sem serviço externo) e o complemento de Schur da interface
+    S = A_gg - sum_i A_gi A_ii^-1 A_ig é resolvido por CG (BiCGSTAB se complexo) com
+    pré-condicionador de Jacobi (diagonal de A_gg), sem montar S. Mesma interface .solve(b)
+    dos fatores diretos, para o FACTORIZATION_CACHE.
+    """
+    def __init__(self, A, numParts, tol=1e-10, maxiter=None):
+        A = csr_matrix(A)
+        self.n = A.shape[0]
+        self.dtype = A.dtype
+        self.tol, self.maxiter = tol, maxiter
+        self.fill = None
+        self.iterations = 0
+        self.status = 0
+        # Mesma normalização de escala dos solvers de Krylov (matrizes eletrostáticas ~eps0^2)
+        self.scale = np.abs(A.diagonal()).max() if self.n > 0 else 1.0
+        self.scale = self.scale if self.scale > 0 else 1.0
+        A = A / self.scale
+
+        self.part, isInterface = partition_nodes(A, numParts)
+        self.interface = np.flatnonzero(isInterface)
+        self.interiors = [np.flatnonzero((self.part == p) & ~isInterface) for p in range(numParts)]
+        self.interiors = [nodes for nodes in self.interiors if len(nodes) > 0]
+        self.A_gg = A[self.interface][:, self.interface].tocsr()
+        d = self.A_gg.diagonal()
+        d[d == 0] = 1.0
+        self.jacobi = diags(1.0 / d)
+
+        self.workers = []
+        for nodes in self.interiors:
+            rows = A[nodes]
+            args = (rows[:, nodes], rows[:, self.interface].tocsr(), A[self.interface][:, nodes].tocsr())
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_subdomain_worker, args=(child, *args), daemon=True)
+            process.start()
+            child.close()
+            self.workers.append((process, parent))
+        # Fatorações locais em paralelo: espera todos os workers ficarem prontos
+        for _, conn in self.workers:
+            status, detail = conn.recv()
+            if status != "ready":
+                self.close()
+                raise RuntimeError(f"Falha ao fatorar subdomínio: {detail}")
+
+    def _broadcast(self, messages):
+        """Envia um pedido a cada worker e só depois coleta as respostas (subdomínios em paralelo)."""
+        for (_, conn), message in zip(self.workers, messages):
+            conn.send(message)
+        results = []
+        for _, conn in self.workers:
+            status, result = conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"Erro no subdomínio: {result}")
+            results.append(result)
+        return results
+
+    def _schur_matvec(self, x):
+        return self.A_gg @ x - sum(self._broadcast([("schur", x)] * len(self.workers)))
+
+    def _solve_column(self, b):
+        b = b / self.scale
+        b_g = b[self.interface] - sum(self._broadcast([("rhs", b[nodes]) for nodes in self.interiors]))
+        S = LinearOperator((len(self.interface),) * 2, matvec=self._schur_matvec, dtype=self.dtype)
+        count = [0]
+        def callback(_):
+            count[0] += 1
+        krylov = bicgstab if np.iscomplexobj(b_g) or np.iscomplexobj(self.A_gg.data) else cg
+        x_g, status = krylov(S, b_g, rtol=self.tol, maxiter=self.maxiter, M=self.jacobi, callback=callback)
+        if status != 0:
+            # Mesma convenção dos solvers de Krylov: aviso, e o status fica no solveInfo
+            self.status = status
+            warnings.warn(f"CG da interface não convergiu (status={status}).")
+        self.iterations += count[0]
+
+        x = np.zeros(self.n, dtype=np.result_type(self.dtype, b.dtype))
+        x[self.interface] = x_g
+        for nodes, x_i in zip(self.interiors, self._broadcast([("back", b[nodes], x_g) for nodes in self.interiors])):
+            x[nodes] = x_i
+        return x
+
+    def solve(self, b):
+        """Aceita b (n,) ou (n, K); cada coluna é um CG na interface com as mesmas fatorações."""
+        b = np.asarray(b)
+        self.iterations, self.status = 0, 0
+        columns = b.reshape(len(b), -1)
+        x = np.stack([self._solve_column(columns[:, k]) for k in range(columns.shape[1])], axis=1)
+        return x.reshape(b.shape)
+
+    def close(self):
+        for process, conn in self.workers:
+            try:
+                conn.send(("stop",))
+                conn.close()
+            except (OSError, BrokenPipeError):
+                pass
+            process.join(timeout=1)
+        self.workers = []
+
+    def __del__(self):
+        self.close()
+
+class SchurSolver(DirectSolver):
+    """
+    Método "schur" do bloco fem_solver: decomposição de domínio em config['subdomains']
+    partes (0 = número de núcleos). Reaproveita o cache de fatorações do DirectSolver:
+    os workers com os interiores fatorados persistem entre solves do mesmo sistema.
+    """
+    def factorize(self, A):
+        numParts = self.config["subdomains"] or os.cpu_count() or 1
+        self.factor = SchurComplement(A, max(2, numParts), self.config["tol"], self.config["maxiter"])
+        return self.factor
+
+    def solve(self, A, b, key=None):
+        x = super().solve(A, b, key)
+        factor = self.factor
+        self.info.update(iterations=int(factor.iterations), subdomains=len(factor.interiors),
+                         interface_size=int(len(factor.interface)), converged=factor.status == 0,
+                         status=int(factor.status))
+        return x
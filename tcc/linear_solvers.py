@@ -0,0 +1,351 @@
+import time
+import hashlib
+import warnings
+from collections import OrderedDict
+import numpy as np
+from scipy.sparse import diags
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import splu, spilu, cg, minres, bicgstab, gmres, LinearOperator
+
+# Dependências opcionais: CHOLMOD (scikit-sparse) e multigrid algébrico (pyamg)
+try:
+    from sksparse.cholmod import cholesky as cholmod_cholesky
+except ImportError:
+    cholmod_cholesky = None
+
+try:
+    import pyamg
+except ImportError:
+    pyamg = None
+
+DEFAULT_SOLVER_CONFIG = {
+    "method": "direct",        # direct | cholesky | cg | minres | bicgstab | gmres | schur
+    "preconditioner": "none",  # none | jacobi | ilu | amg (apenas métodos iterativos)
+    "tol": 1e-10,
+    "maxiter": None,
+    "restart": 50,             # GMRES
+    "ilu_drop_tol": 1e-4,
+    "ilu_fill_factor": 10,
+    "dirichlet": "elimination",  # elimination (blocos K_ff/K_fd) | penalty
+    "penalty_factor": 1e8,       # peso relativo ao maior termo da diagonal
+    "reordering": "none",        # none (COLAMD do SuperLU) | natural | rcm | amd (métodos diretos)
+    "assembly_workers": 1,       # >1 (ou 0 = todos os núcleos) ativa a montagem paralela
+    "assembly_chunk_size": 100000,  # triângulos por tarefa na montagem paralela
+    "subdomains": 0,             # método schur: número de subdomínios (0 = todos os núcleos)
+    "factorization_cache": 4,    # fatorações guardadas no cache do processo (0 desativa)
+}
+
+DIRECT_METHODS = ("direct", "cholesky")
+KRYLOV_METHODS = ("cg", "minres", "bicgstab", "gmres")
+
+# Ordenação de colunas passada ao SuperLU para cada opção de reordenação. No RCM a
+# permutação simétrica é aplicada antes e o SuperLU fatora na ordem natural.
+ORDERINGS = {"none": "COLAMD", "natural": "NATURAL", "rcm": "NATURAL", "amd": "MMD_AT_PLUS_A"}
+
+# CG/MINRES exigem matriz Hermitiana; o sistema magnetodinâmico é complexo simétrico
+COMPLEX_FALLBACK = {"cg": "bicgstab", "minres": "gmres"}
+
+def array_digest(*arrays):
+    """Hash (sha1) do conteúdo, forma e dtype de um conjunto de arrays."""
+    h = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(str((array.shape, array.dtype.str)).encode())
+        h.update(array.tobytes())
+    return h.hexdigest()
+
+class FactorizationCache:
+    """
+    Cache LRU de fatorações (LU/Cholesky/Schur) dos sistemas reduzidos.
+    A chave identifica malha, materiais e conjunto de nós fixos; trocar apenas os
+    valores de Dirichlet ou o termo fonte reaproveita a fatoração. Fatores removidos
+    (LRU, evict, clear) são fechados: o Schur libera os processos dos subdomínios.
+    """
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _close(factor):
+        close = getattr(factor, "close", None)
+        if close is not None:
+            close()
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, factor):
+        self._entries[key] = factor
+        self._entries.move_to_end(key)
+        self._shrink()
+
+    def _shrink(self):
+        while len(self._entries) > max(self.maxsize, 0):
+            self._close(self._entries.popitem(last=False)[1])
+
+    def resize(self, maxsize):
+        """Tamanho vindo de fem_solver['factorization_cache']; excedentes saem pela ordem LRU."""
+        self.maxsize = maxsize
+        self._shrink()
+
+    def holds(self, factor):
+        return any(entry is factor for entry in self._entries.values())
+
+    def evict(self, match):
+        """Remove (e fecha) as entradas cuja chave satisfaz match(key)."""
+        for key in [key for key in self._entries if match(key)]:
+            self._close(self._entries.pop(key))
+
+    def clear(self):
+        self.evict(lambda key: True)
+
+    close = clear
+
+    def __len__(self):
+        return len(self._entries)
+
+FACTORIZATION_CACHE = FactorizationCache()
+
+def bandwidth(A):
+    """Maior distância |i - j| entre os não-zeros de A."""
+    coo = A.tocoo()
+    return int(np.abs(coo.row - coo.col).max()) if coo.nnz else 0
+
+def fill_statistics(A, factor, reordering):
+    """Preenchimento da fatoração: não-zeros de L+U, razão sobre nnz(A) e memória do fator."""
+    L = factor.L
+    U = getattr(factor, "U", None)
+    # Cholesky guarda só L; conta L + L^T para comparar com a LU. A diagonal entra uma vez.
+    factorNnz = int(L.nnz + (U.nnz if U is not None else L.nnz) - A.shape[0])
+    itemsize = np.dtype(A.dtype).itemsize
+    return {
+        "reordering": reordering,
+        "nnz_A": int(A.nnz),
+        "nnz_factor": factorNnz,
+        "fill_ratio": factorNnz / max(A.nnz, 1),
+        # valores + índices de linha (int32) das colunas do fator
+        "factor_memory_mb": factorNnz * (itemsize + 4) / 2 ** 20,
+        "bandwidth": bandwidth(A),
+    }
+
+class Factorization:
+    """
+    Fator esparso com permutação simétrica opcional: resolve P A P^T y = P b e devolve
+    x = P^T y. Guarda as estatísticas de preenchimento (fill) calculadas na fatoração.
+    """
+    def __init__(self, factor, perm=None, fill=None):
+        self.factor = factor
+        self.perm = perm
+        self.fill = fill
+
+    def solve(self, b):
+        if self.perm is None:
+            return self.factor.solve(b)
+        y = self.factor.solve(b[self.perm])
+        x = np.empty_like(y)
+        x[self.perm] = y
+        return x
+
+def make_preconditioner(A, kind, config):
+    """Retorna um LinearOperator M ~ A^-1 (ou None) para o tipo pedido."""
+    if kind in (None, "none"):
+        return None
+    if kind == "jacobi":
+        d = A.diagonal()
+        d[d == 0] = 1.0
+        return diags(1.0 / d)
+    if kind == "amg":
+        if pyamg is not None:
+            return pyamg.smoothed_aggregation_solver(A.tocsr()).aspreconditioner(cycle="V")
+        warnings.warn("pyamg não instalado; usando ILU como pré-condicionador.")
+        kind = "ilu"
+    if kind == "ilu":
+        ilu = spilu(A.tocsc(), drop_tol=config["ilu_drop_tol"], fill_factor=config["ilu_fill_factor"])
+        return LinearOperator(A.shape, matvec=ilu.solve, dtype=A.dtype)
+    raise ValueError(f"Pré-condicionador '{kind}' não suportado.")
+
+class LinearSolver:
+    """
+    Interface comum: solve(A, b, key) retorna x e preenche self.info (iterações, resíduo, tempos).
+    b pode ter K colunas (K lados direitos). key identifica o sistema no FACTORIZATION_CACHE.
+    """
+    def __init__(self, config=None):
+        self.config = {**DEFAULT_SOLVER_CONFIG, **(config or {})}
+        self.method = self.config["method"]
+        self.info = {}
+        self.factor = None
+
+    def solve(self, A, b, key=None):
+        raise NotImplementedError
+
+    def close(self):
+        """Libera o fator atual se ele não estiver no FACTORIZATION_CACHE (que o fecha ao removê-lo)."""
+        if self.factor is not None and not FACTORIZATION_CACHE.holds(self.factor):
+            FactorizationCache._close(self.factor)
+        self.factor = None
+
+    def _report(self, A, b, x, setup_time, solve_time, iterations, **extra):
+        norm_b = np.linalg.norm(b)
+        residual = np.linalg.norm(b - A @ x) / norm_b if norm_b > 0 else np.linalg.norm(A @ x)
+        self.info = {
+            "method": self.method,
+            "preconditioner": self.config["preconditioner"] if self.method in KRYLOV_METHODS else None,
+            "n": int(A.shape[0]),
+            "nnz": int(A.nnz),
+            "iterations": int(iterations),
+            "residual": float(residual),
+            "setup_time": float(setup_time),
+            "solve_time": float(solve_time),
+            **extra,
+        }
+        return x
+
+class DirectSolver(LinearSolver):
+    """
+    LU esparsa (SuperLU). Mantém a fatoração em self.factor.
+    config['reordering'] escolhe a ordenação que reduz o preenchimento: COLAMD (padrão do
+    SuperLU), natural, Cuthill-McKee reverso (permutação simétrica explícita) ou grau
+    mínimo aproximado sobre A^T + A.
+    """
+    def factorize(self, A):
+        reordering = self.config["reordering"]
+        if reordering not in ORDERINGS:
+            raise ValueError(f"Reordenação '{reordering}' não suportada.")
+        A = A.tocsr()
+        perm = None
+        if reordering == "rcm":
+            perm = reverse_cuthill_mckee(A, symmetric_mode=True)
+            A = A[perm][:, perm]
+        factor = self._factorize(A, ORDERINGS[reordering])
+        self.factor = Factorization(factor, perm, fill_statistics(A, factor, reordering))
+        return self.factor
+
+    def _factorize(self, A, permc_spec):
+        return splu(A.tocsc(), permc_spec=permc_spec)
+
+    def solve(self, A, b, key=None):
+        t0 = time.perf_counter()
+        useCache = key is not None and self.config["factorization_cache"] > 0
+        if useCache:
+            FACTORIZATION_CACHE.resize(self.config["factorization_cache"])
+        factor = FACTORIZATION_CACHE.get(key) if useCache else None
+        cached = factor is not None
+        if not cached:
+            self.close()
+            factor = self.factorize(A)
+            if useCache:
+                FACTORIZATION_CACHE.put(key, factor)
+        self.factor = factor
+        t1 = time.perf_counter()
+        # Apenas substituições triangulares (aceita b com K colunas)
+        x = factor.solve(np.asarray(b, dtype=np.result_type(A.dtype, b.dtype)))
+        t2 = time.perf_counter()
+        return self._report(A, b, x, t1 - t0, t2 - t1, 1, cached=cached, fill=factor.fill)
+
+class CholmodFactor:
+    """Adapta o fator do CHOLMOD à interface .solve(b) do SuperLU."""
+    def __init__(self, factor):
+        self._factor = factor
+
+    def solve(self, b):
+        return self._factor(b)
+
+    @property
+    def L(self):
+        return self._factor.L()
+
+class CholeskySolver(DirectSolver):
+    """
+    Caminho SPD: CHOLMOD quando disponível; caso contrário LU com ordenação simétrica
+    e pivoteamento diagonal (equivalente a uma fatoração tipo Cholesky para matrizes SPD).
+    """
+    def _factorize(self, A, permc_spec):
+        if np.iscomplexobj(A.data):
+            # Sistema complexo simétrico (não Hermitiano): LU padrão
+            return splu(A.tocsc(), permc_spec=permc_spec)
+        # O COLAMD não é simétrico: no caminho SPD o padrão é o grau mínimo em A^T + A
+        permc_spec = "MMD_AT_PLUS_A" if permc_spec == "COLAMD" else permc_spec
+        if cholmod_cholesky is not None:
+            ordering = "natural" if permc_spec == "NATURAL" else "default"
+            return CholmodFactor(cholmod_cholesky(A.tocsc(), ordering_method=ordering))
+        return splu(A.tocsc(), permc_spec=permc_spec, diag_pivot_thresh=0.0,
+                    options={"SymmetricMode": True})
+
+class KrylovSolver(LinearSolver):
+    """CG / MINRES (SPD) e BiCGSTAB / GMRES (complexo) com pré-condicionador opcional."""
+    def solve(self, A, b, key=None):
+        method = self.method
+        if np.iscomplexobj(A.data) and method in COMPLEX_FALLBACK:
+            method = COMPLEX_FALLBACK[method]
+            warnings.warn(f"Sistema complexo não Hermitiano: usando '{method}' no lugar de '{self.method}'.")
+
+        # Normaliza a escala do sistema: as matrizes eletrostáticas têm entradas ~eps0^2, o que
+        # dispara os testes absolutos de breakdown do MINRES/BiCGSTAB
+        scale = np.abs(A.diagonal()).max() if A.shape[0] > 0 else 1.0
+        scale = scale if scale > 0 else 1.0
+        A_s, b_s = A / scale, b / scale
+
+        t0 = time.perf_counter()
+        M = make_preconditioner(A_s, self.config["preconditioner"], self.config)
+        t1 = time.perf_counter()
+
+        iterations = [0]
+        def callback(_):
+            iterations[0] += 1
+
+        # Vários lados direitos: o pré-condicionador é montado uma vez e reutilizado por coluna
+        columns = b_s.reshape(len(b_s), -1)
+        x = np.zeros(columns.shape, dtype=np.result_type(A.dtype, b.dtype))
+        converged = True
+        for k in range(columns.shape[1]):
+            x[:, k], status = self._iterate(method, A_s, columns[:, k], M, callback)
+            if status != 0:
+                converged = False
+                warnings.warn(f"Solver iterativo '{method}' não convergiu (status={status}).")
+        x = x.reshape(b.shape)
+        t2 = time.perf_counter()
+
+        x = self._report(A, b, x, t1 - t0, t2 - t1, iterations[0], converged=converged)
+        self.info["method"] = method
+        return x
+
+    def _iterate(self, method, A, b, M, callback):
+        tol, maxiter = self.config["tol"], self.config["maxiter"]
+        if method == "cg":
+            return cg(A, b, rtol=tol, maxiter=maxiter, M=M, callback=callback)
+        if method == "minres":
+            return minres(A, b, rtol=tol, maxiter=maxiter, M=M, callback=callback)
+        if method == "bicgstab":
+            return bicgstab(A, b, rtol=tol, maxiter=maxiter, M=M, callback=callback)
+        return gmres(A, b, rtol=tol, maxiter=maxiter, M=M, restart=self.config["restart"],
+                     callback=callback, callback_type="pr_norm")
+
+def compare_orderings(A, orderings=("natural", "none", "rcm", "amd"), config=None):
+    """Fatora A com cada reordenação e devolve {reordering: estatísticas de preenchimento}."""
+    method = {**DEFAULT_SOLVER_CONFIG, **(config or {})}["method"]
+    solverClass = CholeskySolver if method == "cholesky" else DirectSolver
+    report = {}
+    for reordering in orderings:
+        solver = solverClass({**(config or {}), "reordering": reordering})
+        t0 = time.perf_counter()
+        fill = solver.factorize(A).fill
+        report[reordering] = {**fill, "factor_time": time.perf_counter() - t0}
+    return report
+
+def get_linear_solver(config=None):
+    """Cria o backend a partir do bloco 'fem_solver' do config.json."""
+    method = {**DEFAULT_SOLVER_CONFIG, **(config or {})}["method"]
+    if method == "direct":
+        return DirectSolver(config)
+    if method == "cholesky":
+        return CholeskySolver(config)
+    if method in KRYLOV_METHODS:
+        return KrylovSolver(config)
+    if method == "schur":
+        # Import tardio: domain_decomposition depende deste módulo
+        from domain_decomposition import SchurSolver
+        return SchurSolver(config)
+    raise ValueError(f"Método de solução linear '{method}' não implementado.")
@@ -21,6 +21,7 @@ from problems import get_problem
 from models.pinn import PINN
 from models.ml_models import train_ml_models
 from solver import ElectrostaticSolver
+from adaptivity import adaptive_refinement
 from utils.data import generate_data_for_ml
 
 def main():
@@ -64,15 +65,28 @@ def main():
 
             # Criar Solver FEM apropriado
             if CONFIG["problem"] == "electrostatic_mesh":
-                fem_solver = ElectrostaticSolver(nodes, nodeTags, triElements, elements, boundaryConditions)
+                fem_solver = ElectrostaticSolver(nodes, nodeTags, triElements, elements, boundaryConditions,
+                                                 solverConfig=fem_data.get("solverConfig"))
 
             if fem_solver:
                 print("--- RESOLVENDO FEM ---", flush=True)
-                fem_solver.apply_boundary_conditions()
-                fem_solver.assemble_global_matrix_and_vector()
-                fem_solver.solve()
+                adaptivity = CONFIG.get("fem_adaptivity", {})
+                if adaptivity.get("enabled"):
+                    # Refinamento adaptativo (ZZ + bissecção); histórico em run_dir/adaptivity.json
+                    fem_solver = adaptive_refinement(
+                        fem_solver, tol=adaptivity.get("tol", 0.05),
+                        max_dofs=adaptivity.get("max_dofs", 200000),
+                        max_iterations=adaptivity.get("max_iterations", 10),
+                        theta=adaptivity.get("theta", 0.5), run_dir=run_dir)
+                    nodes = fem_solver.nodes
+                else:
+                    fem_solver.apply_boundary_conditions()
+                    fem_solver.assemble_global_matrix_and_vector()
+                    fem_solver.solve()
                 fem_solver.calculate_electric_field()
                 u_fem = fem_solver.get_potential()
+                # Campos em binário (memmap) para o visualizador e o backend não re-resolverem
+                fem_solver.save_fields(os.path.join(run_dir, "fem_fields"))
                 print("FEM resolvido com sucesso.", flush=True)
 
                 # Atualizar limites do treino baseados na malha
@@ -150,6 +164,11 @@ def main():
         "pinn_final_loss": final_loss
     }
 
+    # Custo do FEM por fase (comparável ao pinn_time)
+    if fem_solver is not None:
+        metrics["fem_profile"] = fem_solver.profiler.to_dict()
+        print(fem_solver.profiler.summary(), flush=True)
+
     if y_true is not None:
         mse = np.mean((y_true - y_pred_pinn.flatten())**2)
         metrics["pinn_mse"] = float(mse)
@@ -162,19 +181,12 @@ def main():
     model_fem_wrapper = None
     if u_fem is not None and fem_solver is not None:
         try:
-            from scipy.interpolate import LinearNDInterpolator
-            # fem_solver.nodes é (N, 3), pegamos x,y
-            # u_fem é (N,)
+            from utils.fem_field import FemField
+            # Interpolação na malha real (conectividade do FEM); NaN fora do domínio (furos)
             print("Criando interpolador FEM para gerar dados de treino ML...", flush=True)
-            # Precisamos garantir que nodes e u_fem estão no formato correto
-            nodes_xy = fem_solver.nodes[:, :2]
-            interp = LinearNDInterpolator(nodes_xy, u_fem, fill_value=0.0)
-
-            class FemWrapper:
-                def predict(self, x):
-                    return interp(x)
-
-            model_fem_wrapper = FemWrapper()
+            mesh_file = None if CONFIG.get("fem_adaptivity", {}).get("enabled") else CONFIG.get("mesh_file")
+            model_fem_wrapper = FemField(fem_solver.nodes, fem_solver.batch.triElements, u_fem,
+                                         mesh_file=mesh_file)
         except Exception as e:
             print(f"Erro ao criar interpolador FEM: {e}", flush=True)
     else:
@@ -1,14 +1,14 @@
 import deepxde as dde
 import numpy as np
 import tensorflow as tf
-from utils.mesh_loader import MeshLoader
-from solver import ElectrostaticElement
-import meshio
+from utils.mesh_loader import MeshLoader, material_arrays
+from solver import batch_class
+from problems.setup_cache import SETUP_CACHE
 
-def create_electrostatic_mesh_problem(config):
+def prepare_electrostatic_mesh(config):
     """
-    Cria um problema Eletrostático 2D usando uma malha externa (.msh).
-    Equação: -Laplacian(V) = rho/eps (Aqui assumindo rho=0 -> Laplace)
+    Parte cara e independente do DeepXDE: malha, pontos de colocação, pontos/valores das BCs,
+    elementos e condições de contorno do FEM. Memoizada por SETUP_CACHE.
     """
     mesh_file = config.get("mesh_file", "domain.msh")
     loader = MeshLoader(mesh_file)
@@ -21,8 +21,6 @@ def create_electrostatic_mesh_problem(config):
     mask_singularity = ~((np.abs(domain_points[:,0]) < 1e-6) & (np.abs(domain_points[:,1]) < 1e-6))
     domain_points = domain_points[mask_singularity]
 
-    geom = dde.geometry.PointCloud(domain_points, boundary_points=None)
-
     # Calcular Bounding Box da malha para ajustar Configuração
     xmin, ymin = domain_points.min(axis=0)
     xmax, ymax = domain_points.max(axis=0)
@@ -32,45 +30,90 @@ def create_electrostatic_mesh_problem(config):
     print(f"✓ Malha carregada: Bounds [{xmin:.2f}, {xmax:.2f}] x [{ymin:.2f}, {ymax:.2f}]")
     print(f"✓ Ajustando CONFIG: Lx={Lx_mesh:.2f}, Ly={Ly_mesh:.2f}")
 
-    # Atualizar Config Global (Side-effect intencional para alinhar plots)
-    config["Lx"] = float(Lx_mesh)
-    config["Ly"] = float(Ly_mesh)
-    config["train_box"] = [float(xmin), float(ymin), float(xmax), float(ymax)]
-
-    # 2. Equação Diferencial (Laplace)
-    # d2V/dx2 + d2V/dy2 = 0
-    def pde(x, y):
-        dy_xx = dde.grad.hessian(y, x, i=0, j=0)
-        dy_yy = dde.grad.hessian(y, x, i=1, j=1)
-        return -dy_xx - dy_yy
-
-    # 3. Condições de Contorno (Dinâmico via Config)
-    bcs = []
+    # Atualizar Config Global (Side-effect intencional para alinhar plots; reaplicado pelo cache)
+    config_updates = {
+        "Lx": float(Lx_mesh),
+        "Ly": float(Ly_mesh),
+        "train_box": [float(xmin), float(ymin), float(xmax), float(ymax)],
+    }
 
+    # Condições de Contorno (Dinâmico via Config)
     # Normalização: Trabalhar com [0, 1] e reescalar na visualização
     V_MAX = config.get("scaling_factor", 100.0)
 
     bc_configs = config.get("boundary_conditions", {})
 
+    bc_points = {}
     fem_boundary_conditions = {}
 
     for name, val in bc_configs.items():
         points = loader.get_boundary_points(name)
         if len(points) > 0:
             # DeepXDE BC (Normalizado)
-            values = np.full((len(points), 1), val)
-            bc = dde.icbc.PointSetBC(points, values)
-            bcs.append(bc)
+            bc_points[name] = (points, np.full((len(points), 1), val))
 
             # FEM BC (Escala Real = val * V_MAX)
             if name in loader.boundary_nodes:
                 fem_boundary_conditions[name] = {
-                    'nodes': list(loader.boundary_nodes[name]),
+                    'nodes': loader.boundary_nodes[name],
                     'potential': val * V_MAX
                 }
 
             print(f"✓ BC '{name}' carregada: {val} (PINN) / {val*V_MAX}V (FEM) ({len(points)} pontos).")
 
+    # Preparar dados para o Solver FEM (Professor)
+    # Pontos e triângulos do cache de malhas (o .msh não é relido)
+    points = loader.points[:, :2]
+    triangles, order = loader.triangles, loader.order  # triangle (P1) ou triangle6 (P2)
+
+    # Criar elementos do solver (struct-of-arrays: geometria e matrizes locais vetorizadas)
+    elements = batch_class("electrostatic", order)(points, triangles)
+    # Materiais por superfície física (config "materials": {região: {"eps": ..., "rho": ...}})
+    if config.get("materials"):
+        props = material_arrays(loader.triangle_tags, loader.region_names, config["materials"],
+                                {"eps": 1.0, "rho": 0.0})
+        elements.setProperties(props["eps"], props["rho"])
+
+    # Estrutura para o solver
+    fem_data = {
+        "nodes": points,
+        "nodeTags": np.arange(len(points)), # Assumindo sequencial 0..N-1
+        "triElements": triangles,
+        "elements": elements,
+        "boundaryConditions": fem_boundary_conditions,
+        "solverConfig": config.get("fem_solver", {})
+    }
+
+    return {
+        "domain_points": domain_points,
+        "bc_points": bc_points,
+        "fem_data": fem_data,
+        "scaling_factor": V_MAX,
+        "config_updates": config_updates,
+    }
+
+def create_electrostatic_mesh_problem(config):
+    """
+    Cria um problema Eletrostático 2D usando uma malha externa (.msh).
+    Equação: -Laplacian(V) = rho/eps (Aqui assumindo rho=0 -> Laplace)
+    """
+    # 1. Malha, BCs e FEM (cache por hash do config); só os objetos do DeepXDE são recriados
+    prepared = SETUP_CACHE.get(config, prepare_electrostatic_mesh)
+    domain_points = prepared["domain_points"]
+    V_MAX = prepared["scaling_factor"]
+
+    geom = dde.geometry.PointCloud(domain_points, boundary_points=None)
+
+    # 2. Equação Diferencial (Laplace)
+    # d2V/dx2 + d2V/dy2 = 0
+    def pde(x, y):
+        dy_xx = dde.grad.hessian(y, x, i=0, j=0)
+        dy_yy = dde.grad.hessian(y, x, i=1, j=1)
+        return -dy_xx - dy_yy
+
+    # 3. Condições de Contorno (pontos e valores normalizados vindos do cache)
+    bcs = [dde.icbc.PointSetBC(points, values) for points, values in prepared["bc_points"].values()]
+
     # 4. Dados DeepXDE
     data = dde.data.PDE(
         geom,
@@ -94,27 +137,6 @@ def create_electrostatic_mesh_problem(config):
         sigmas=sigmas
     )
 
-    # 5. Preparar dados para o Solver FEM (Professor)
-    # Precisamos reconstruir a conectividade dos elementos
-    mesh = meshio.read(loader.filename)
-
-    points = mesh.points[:, :2] # (N, 2)
-    triangles = mesh.cells_dict.get('triangle', [])
-
-    # Criar elementos do solver
-    elements = [ElectrostaticElement() for _ in range(len(triangles))]
-    for element, tri in zip(elements, triangles):
-        element.setNodes(*points[tri].T)
-
-    # Estrutura para o solver
-    fem_data = {
-        "nodes": points,
-        "nodeTags": np.arange(len(points)), # Assumindo sequencial 0..N-1
-        "triElements": triangles,
-        "elements": elements,
-        "boundaryConditions": fem_boundary_conditions
-    }
-
     pinn_config = {
         "arch_type": "FNN",
         "layers": [2] + [50]*4 + [1],
@@ -128,7 +150,7 @@ def create_electrostatic_mesh_problem(config):
         "data": data,
         "net": net,
         "kind": "electrostatic",
-        "fem_data": fem_data, # Dados extras para o solver FEM
+        "fem_data": prepared["fem_data"], # Dados extras para o solver FEM
         "u_true": None, # Não temos solução analítica
         "use_mesh": True,
         "pinn_config": pinn_config,
@@ -1,14 +1,19 @@
 import numpy as np
 import deepxde as dde
 import tensorflow as tf
+from solver import line_reference
 
 def create_heat_problem(cfg):
     alpha, Lx, T_train = cfg["alpha"], cfg["Lx"], cfg["T_train"]
 
-    def u_true(X):
-        x, t = X[:, 0:1], X[:, 1:2]
-        k = np.pi / Lx
-        return np.sin(k * x) * np.exp(-alpha * (k**2) * t)
+    # Referência FEM (TransientSolver) no lugar da solução analítica
+    if cfg.get("fem_reference"):
+        u_true = line_reference("heat", cfg, alpha)
+    else:
+        def u_true(X):
+            x, t = X[:, 0:1], X[:, 1:2]
+            k = np.pi / Lx
+            return np.sin(k * x) * np.exp(-alpha * (k**2) * t)
 
     def pde(X, y):
         du_t  = dde.grad.jacobian(y, X, i=0, j=1)
@@ -1,9 +1,89 @@
 import deepxde as dde
 import numpy as np
 import tensorflow as tf
-from utils.mesh_loader import MeshLoader
-from solver import MagnetodynamicElement
-import meshio
+from utils.mesh_loader import MeshLoader, material_arrays
+from solver import batch_class
+from problems.setup_cache import SETUP_CACHE
+
+def prepare_magnetodynamic_mesh(config):
+    """
+    Parte cara e independente do DeepXDE: malha, pontos de colocação, pontos/valores das BCs,
+    elementos (com materiais) e condições de contorno do FEM. Memoizada por SETUP_CACHE.
+    """
+    mesh_file = config.get("mesh_file", "domain.msh")
+    loader = MeshLoader(mesh_file)
+
+    f = config.get("frequency", 60.0)
+    sigma = config.get("sigma", 5.8e7) # Cobre
+    mu_r = config.get("mu", 1.0)
+
+    # 1. Geometria
+    domain_points = loader.get_all_points()
+    mask_singularity = ~((np.abs(domain_points[:,0]) < 1e-6) & (np.abs(domain_points[:,1]) < 1e-6))
+    domain_points = domain_points[mask_singularity]
+
+    xmin, ymin = domain_points.min(axis=0)
+    xmax, ymax = domain_points.max(axis=0)
+    # Efeitos no config reaplicados pelo cache
+    config_updates = {
+        "Lx": float(xmax - xmin),
+        "Ly": float(ymax - ymin),
+        "train_box": [float(xmin), float(ymin), float(xmax), float(ymax)],
+    }
+
+    # Condições de Contorno
+    A_MAX = config.get("scaling_factor", 1.0)
+    bc_configs = config.get("boundary_conditions", {})
+    bc_points = {}
+    fem_boundary_conditions = {}
+
+    for name, val in bc_configs.items():
+        points = loader.get_boundary_points(name)
+        if len(points) > 0:
+            # DeepXDE BC (Real e Imag)
+            # Assumindo BC constante real para simplificar, ou zero.
+            bc_points[name] = (points, np.full((len(points), 1), val))
+
+            # FEM BC
+            if name in loader.boundary_nodes:
+                fem_boundary_conditions[name] = {
+                    'nodes': loader.boundary_nodes[name],
+                    'potential': complex(val * A_MAX, 0)
+                }
+
+            print(f"✓ BC '{name}' carregada.")
+
+    # Preparar dados para o Solver FEM
+    # Pontos e triângulos do cache de malhas (o .msh não é relido)
+    points = loader.points[:, :2]
+    triangles, order = loader.triangles, loader.order  # triangle (P1) ou triangle6 (P2)
+
+    # Elementos em formato struct-of-arrays (geometria e matrizes locais vetorizadas)
+    elements = batch_class("magnetodynamic", order)(points, triangles)
+    # Propriedades por superfície física (config "materials": {região: {"mu", "sigma", "J"}});
+    # regiões sem material usam os valores homogêneos (mu, sigma, J=0). "mu" é a permeabilidade
+    # relativa: setProperties guarda nu = 1/mu_r (rigidez 1/(mu_r*mu0))
+    props = material_arrays(loader.triangle_tags, loader.region_names, config.get("materials", {}),
+                            {"mu": mu_r, "sigma": sigma, "J": 0.0})
+    elements.setProperties(props["mu"], props["J"], props["sigma"])
+
+    fem_data = {
+        "nodes": points,
+        "nodeTags": np.arange(len(points)),
+        "triElements": triangles,
+        "elements": elements,
+        "boundaryConditions": fem_boundary_conditions,
+        "solverConfig": config.get("fem_solver", {}),
+        "frequency": f
+    }
+
+    return {
+        "domain_points": domain_points,
+        "bc_points": bc_points,
+        "fem_data": fem_data,
+        "scaling_factor": A_MAX,
+        "config_updates": config_updates,
+    }
 
 def create_magnetodynamic_mesh_problem(config):
     """
@@ -11,9 +91,6 @@ def create_magnetodynamic_mesh_problem(config):
     Equação: Laplacian(A) - j * omega * sigma * mu * A = -mu * J
     Separado em Parte Real e Imaginária.
     """
-    mesh_file = config.get("mesh_file", "domain.msh")
-    loader = MeshLoader(mesh_file)
-
     # Parâmetros Físicos
     f = config.get("frequency", 60.0)
     omega = 2 * np.pi * f
@@ -29,19 +106,13 @@ def create_magnetodynamic_mesh_problem(config):
 
     print(f"✓ Magnetodinâmica: f={f}Hz, sigma={sigma:.2e}, mu_r={mu_r}")
 
-    # 1. Geometria
-    domain_points = loader.get_all_points()
-    mask_singularity = ~((np.abs(domain_points[:,0]) < 1e-6) & (np.abs(domain_points[:,1]) < 1e-6))
-    domain_points = domain_points[mask_singularity]
+    # 1. Malha, BCs e FEM (cache por hash do config); só os objetos do DeepXDE são recriados
+    prepared = SETUP_CACHE.get(config, prepare_magnetodynamic_mesh)
+    domain_points = prepared["domain_points"]
+    A_MAX = prepared["scaling_factor"]
 
     geom = dde.geometry.PointCloud(domain_points, boundary_points=None)
 
-    xmin, ymin = domain_points.min(axis=0)
-    xmax, ymax = domain_points.max(axis=0)
-    config["Lx"] = float(xmax - xmin)
-    config["Ly"] = float(ymax - ymin)
-    config["train_box"] = [float(xmin), float(ymin), float(xmax), float(ymax)]
-
     # 2. Equação Diferencial (Acoplada Real/Imag)
     # A = Ar + j*Ai
     # Laplacian(Ar + jAi) - j*k2*(Ar + jAi) = 0 (Assumindo J=0)
@@ -64,36 +135,13 @@ def create_magnetodynamic_mesh_problem(config):
 
         return [eq1, eq2]
 
-    # 3. Condições de Contorno
+    # 3. Condições de Contorno (pontos e valores vindos do cache)
     bcs = []
-    A_MAX = config.get("scaling_factor", 1.0)
-    bc_configs = config.get("boundary_conditions", {})
-    fem_boundary_conditions = {}
-
-    for name, val in bc_configs.items():
-        points = loader.get_boundary_points(name)
-        if len(points) > 0:
-            # DeepXDE BC (Real e Imag)
-            # Assumindo BC constante real para simplificar, ou zero.
-            values = np.full((len(points), 1), val)
-            zeros = np.zeros((len(points), 1))
-
-            # Dirichlet para Ar
-            bc_r = dde.icbc.PointSetBC(points, values, component=0)
-            # Dirichlet para Ai (Zero)
-            bc_i = dde.icbc.PointSetBC(points, zeros, component=1)
-
-            bcs.append(bc_r)
-            bcs.append(bc_i)
-
-            # FEM BC
-            if name in loader.boundary_nodes:
-                fem_boundary_conditions[name] = {
-                    'nodes': list(loader.boundary_nodes[name]),
-                    'potential': complex(val * A_MAX, 0)
-                }
-
-            print(f"✓ BC '{name}' carregada.")
+    for points, values in prepared["bc_points"].values():
+        # Dirichlet para Ar
+        bcs.append(dde.icbc.PointSetBC(points, values, component=0))
+        # Dirichlet para Ai (Zero)
+        bcs.append(dde.icbc.PointSetBC(points, np.zeros_like(values), component=1))
 
     # 4. Dados DeepXDE
     data = dde.data.PDE(
@@ -113,27 +161,6 @@ def create_magnetodynamic_mesh_problem(config):
         "Glorot normal"
     )
 
-    # 5. Preparar dados para o Solver FEM
-    mesh = meshio.read(loader.filename)
-    points = mesh.points[:, :2]
-    triangles = mesh.cells_dict.get('triangle', [])
-
-    elements = [MagnetodynamicElement() for _ in range(len(triangles))]
-    for element, tri in zip(elements, triangles):
-        element.setNodes(*points[tri].T)
-        # Definir propriedades do material para cada elemento
-        # Aqui assumindo homogêneo, mas poderia vir de tags físicas da malha
-        element.setProperties(mu, 0, sigma) # J=0
-
-    fem_data = {
-        "nodes": points,
-        "nodeTags": np.arange(len(points)),
-        "triElements": triangles,
-        "elements": elements,
-        "boundaryConditions": fem_boundary_conditions,
-        "frequency": f
-    }
-
     pinn_config = {
         "arch_type": "FNN",
         "layers": [2] + [64]*5 + [2],
@@ -148,7 +175,7 @@ def create_magnetodynamic_mesh_problem(config):
         "net": net,
         "kind": "magnetodynamic",
         "num_pde_losses": 2,
-        "fem_data": fem_data,
+        "fem_data": prepared["fem_data"],
         "u_true": None,
         "use_mesh": True,
         "pinn_config": pinn_config,
@@ -0,0 +1,69 @@
+import copy
+import json
+import hashlib
+from collections import OrderedDict
+from utils.mesh_loader import resolve_mesh_path
+from utils.mesh_cache import file_digest
+
+# Campos do config que determinam a parte cara da construção dos problemas de malha
+# (pontos de colocação, BCs, dados do FEM). Chaves escritas pelos próprios problemas
+# (Lx, Ly, train_box) ficam de fora para a segunda chamada bater com a primeira.
+SETUP_FIELDS = ("problem", "mesh_file", "boundary_conditions", "scaling_factor", "materials",
+                "fem_solver", "frequency", "sigma", "mu")
+
+class SetupCache:
+    """
+    Memoização da construção dos problemas por hash do config (mesmo esquema do
+    CheckpointManager._hash_config, restrito a SETUP_FIELDS, mais o SHA da malha). Guarda
+    arrays e objetos do FEM; os objetos do DeepXDE/TensorFlow são sempre recriados.
+    """
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def config_hash(config, fields=SETUP_FIELDS):
+        relevant = {key: config.get(key) for key in fields}
+        mesh_file = resolve_mesh_path(config.get("mesh_file") or "")
+        try:
+            relevant["mesh_sha256"] = file_digest(mesh_file)
+        except OSError:
+            relevant["mesh_sha256"] = None
+        config_str = json.dumps(relevant, sort_keys=True, default=str)
+        return hashlib.md5(config_str.encode('utf-8')).hexdigest()
+
+    def get(self, config, prepare):
+        """
+        Retorna prepare(config) memoizado. prepare devolve um dict cujo item "config_updates"
+        (efeitos colaterais no config, ex.: Lx, Ly, train_box) é reaplicado a cada chamada.
+        Os dicts de BC ("bc_points" e fem_data["boundaryConditions"]) são entregues como cópias;
+        o batch de elementos e os arrays da malha são compartilhados entre as chamadas e não
+        devem ser modificados (ex.: setProperties no batch afetaria as próximas).
+        """
+        key = (prepare.__name__, self.config_hash(config))
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            print(f"✓ Reutilizando construção do problema em cache ({key[1][:8]}).")
+        else:
+            self._entries[key] = prepare(config)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        prepared = self._entries[key]
+        config.update(copy.deepcopy(prepared.get("config_updates", {})))
+        return self._copy_bcs(prepared)
+
+    @staticmethod
+    def _copy_bcs(prepared):
+        prepared = dict(prepared)
+        if "bc_points" in prepared:
+            prepared["bc_points"] = copy.deepcopy(prepared["bc_points"])
+        if "fem_data" in prepared:
+            femData = dict(prepared["fem_data"])
+            femData["boundaryConditions"] = copy.deepcopy(femData.get("boundaryConditions", {}))
+            prepared["fem_data"] = femData
+        return prepared
+
+    def clear(self):
+        self._entries.clear()
+
+SETUP_CACHE = SetupCache()
@@ -1,14 +1,19 @@
 import numpy as np
 import deepxde as dde
 import tensorflow as tf
+from solver import line_reference
 
 def create_wave_problem(cfg):
     c, Lx, T_train = cfg["c"], cfg["Lx"], cfg["T_train"]
 
-    def u_true(X):
-        x, t = X[:, 0:1], X[:, 1:2]
-        k = np.pi / Lx
-        return np.sin(k * x) * np.cos(c * k * t)
+    # Referência FEM (TransientSolver) no lugar da solução analítica
+    if cfg.get("fem_reference"):
+        u_true = line_reference("wave", cfg, c**2)
+    else:
+        def u_true(X):
+            x, t = X[:, 0:1], X[:, 1:2]
+            k = np.pi / Lx
+            return np.sin(k * x) * np.cos(c * k * t)
 
     def pde(X, y):
         u_tt = dde.grad.hessian(y, X, i=0, j=1)
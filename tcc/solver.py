@@ -1,6 +1,70 @@
+import os
+import time
+import logging
 import numpy as np
-from scipy.sparse import lil_matrix
-from scipy.sparse.linalg import spsolve
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from scipy.sparse import lil_matrix, coo_matrix, csr_matrix, diags
+from linear_solvers import get_linear_solver, array_digest, compare_orderings, FACTORIZATION_CACHE
+from utils.profiler import FemProfiler
+from utils.field_store import write_fields
+
+logger = logging.getLogger(__name__)
+
+def scatter_add(indices, values, size):
+    """Soma `values` nas posições `indices` de um vetor de tamanho `size` (real ou complexo)."""
+    indices = np.asarray(indices).ravel()
+    values = np.asarray(values).ravel()
+    if np.iscomplexobj(values):
+        return (np.bincount(indices, weights=values.real, minlength=size)
+                + 1j * np.bincount(indices, weights=values.imag, minlength=size))
+    return np.bincount(indices, weights=values, minlength=size)
+
+def assemble_global_matrix(triElements, localMatrices, numNodes, dtype=float):
+    """
+    Monta a matriz global (CSR) a partir das matrizes locais empilhadas.
+    triElements: (E, n) conectividade; localMatrices: (E, n, n).
+    Os tripletos (linha, coluna, valor) de todos os elementos são gerados de uma vez
+    e as entradas duplicadas são somadas na conversão COO -> CSR.
+    """
+    triElements = np.asarray(triElements)
+    n = triElements.shape[1]
+    rows = np.repeat(triElements, n, axis=1).ravel()
+    cols = np.tile(triElements, (1, n)).ravel()
+    values = np.asarray(localMatrices, dtype=dtype).ravel()
+    return coo_matrix((values, (rows, cols)), shape=(numNodes, numNodes), dtype=dtype).tocsr()
+
+def assemble_global_vector(triElements, localVectors, numNodes, dtype=float):
+    """Monta o vetor global a partir dos vetores locais empilhados (E, n)."""
+    return scatter_add(triElements, np.asarray(localVectors, dtype=dtype), numNodes).astype(dtype)
+
+def assemble_load_matrix(triElements, localVectors, numNodes, dtype=float):
+    """Monta K vetores globais de uma vez a partir dos vetores locais (E, n, K): retorna (numNodes, K)."""
+    localVectors = np.asarray(localVectors, dtype=dtype)
+    numCases = localVectors.shape[2]
+    # Índice achatado nó*K + caso: um único bincount para todas as colunas
+    indices = np.asarray(triElements)[:, :, None] * numCases + np.arange(numCases)
+    return scatter_add(indices, localVectors, numNodes * numCases).astype(dtype).reshape(numNodes, numCases)
+
+def triangle_geometry(x, y):
+    """Coeficientes a, b, c (E, 3) e área Delta (E,) de triângulos P1 com vértices x, y (E, 3)."""
+    a = np.stack([x[:, 1] * y[:, 2] - x[:, 2] * y[:, 1],
+                  x[:, 2] * y[:, 0] - x[:, 0] * y[:, 2],
+                  x[:, 0] * y[:, 1] - x[:, 1] * y[:, 0]], axis=1)
+    b = np.stack([y[:, 1] - y[:, 2], y[:, 2] - y[:, 0], y[:, 0] - y[:, 1]], axis=1)
+    c = np.stack([x[:, 2] - x[:, 1], x[:, 0] - x[:, 2], x[:, 1] - x[:, 0]], axis=1)
+    Delta = 0.5 * np.abs(b[:, 1] * c[:, 2] - b[:, 2] * c[:, 1])
+    return a, b, c, Delta
+
+def stiffness_matrices(b, c, Delta, coef):
+    """Matrizes locais coef/(4*Delta) * (b b^T + c c^T), empilhadas (E, 3, 3)."""
+    fac = coef / (4 * Delta)
+    return fac[:, None, None] * (b[:, :, None] * b[:, None, :] + c[:, :, None] * c[:, None, :])
+
+def mass_matrices(Delta, coef):
+    """Matrizes de massa coef*Delta/12 * (1 + delta_ij), empilhadas (E, 3, 3)."""
+    return (coef * Delta / 12)[:, None, None] * (np.ones((3, 3)) + np.eye(3))
 
 class Element:
     def __init__(self):
@@ -135,8 +199,464 @@ class MagnetodynamicElement(Element):
         Amed = np.abs(np.mean(A))
         self.Jind = omega * self.sigma * Amed
 
+class SparsityPattern:
+    """
+    Montagem simbólica: estrutura CSR (indptr/indices) da malha e o mapa de espalhamento
+    de cada entrada local (E*n*n) para o slot correspondente em `data`. Como a conectividade
+    não muda quando só os materiais mudam, o padrão é calculado uma vez por malha e cada
+    montagem numérica vira um único bincount.
+    """
+    def __init__(self, triElements, numNodes):
+        triElements = np.asarray(triElements, dtype=np.int64)
+        n = triElements.shape[1]
+        rows = np.repeat(triElements, n, axis=1).ravel()
+        cols = np.tile(triElements, (1, n)).ravel()
+        # Chaves linha-major ordenadas => CSR canônico (índices de coluna ordenados por linha)
+        keys, self.scatter = np.unique(rows * numNodes + cols, return_inverse=True)
+        self.indices = (keys % numNodes).astype(np.int32)
+        self.indptr = np.zeros(numNodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(keys // numNodes, minlength=numNodes), out=self.indptr[1:])
+        self.shape = (numNodes, numNodes)
+        self.nnz = len(keys)
+
+    def assemble(self, localMatrices, dtype=float):
+        """Montagem numérica: soma as matrizes locais (E, n, n) direto no array de dados do CSR."""
+        data = scatter_add(self.scatter, np.asarray(localMatrices, dtype=dtype), self.nnz).astype(dtype)
+        return csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+def dirichlet_blocks(matrix, isFixed):
+    """
+    Extrai os blocos K_ff (livre x livre) e K_fd (livre x fixo) numa única passagem sobre
+    os não-zeros, usando a permutação livre/fixo em vez de fatiamentos repetidos.
+    """
+    coo = matrix.tocoo()
+    freeNodes, fixedNodes = np.flatnonzero(~isFixed), np.flatnonzero(isFixed)
+    # Posição de cada nó dentro do seu bloco (livre ou fixo)
+    position = np.empty(len(isFixed), dtype=np.int64)
+    position[freeNodes] = np.arange(len(freeNodes))
+    position[fixedNodes] = np.arange(len(fixedNodes))
+
+    rowFree = ~isFixed[coo.row]
+    colFixed = isFixed[coo.col]
+    ff, fd = rowFree & ~colFixed, rowFree & colFixed
+    K_ff = csr_matrix((coo.data[ff], (position[coo.row[ff]], position[coo.col[ff]])),
+                      shape=(len(freeNodes), len(freeNodes)))
+    K_fd = csr_matrix((coo.data[fd], (position[coo.row[fd]], position[coo.col[fd]])),
+                      shape=(len(freeNodes), len(fixedNodes)))
+    return K_ff, K_fd
+
+class TriangleBatch:
+    """
+    Elementos triangulares lineares armazenados como arrays contíguos (struct-of-arrays).
+    Substitui a lista de objetos Element: x, y, a, b, c são (N, 3), Delta/xc/yc são (N,)
+    e as matrizes locais ficam empilhadas em arrays (N, 3, 3).
+    """
+    order = 1
+    properties = ()
+    # Propriedades que entram na matriz (as demais são termos fonte)
+    materialProperties = ()
+
+    def __init__(self, nodes, triElements):
+        start = time.perf_counter()
+        self.triElements = np.asarray(triElements, dtype=np.int64)
+        self.numElements = len(self.triElements)
+        self.setNodes(nodes)
+        self.setDefaults()
+        self.computeMatrix()
+        # Geometria + matrizes locais (fase 'element_setup' do profiler)
+        self.setupTime = time.perf_counter() - start
+        self._setupReported = False
+
+    def take_setup_time(self):
+        """
+        Tempo de setup para o profiler: só o primeiro solver que usa o batch o recebe; batches
+        reaproveitados (ex.: SETUP_CACHE) reportam 0. Retorna (tempo, reaproveitado).
+        """
+        if self._setupReported:
+            return 0.0, True
+        self._setupReported = True
+        return self.setupTime, False
+
+    def __len__(self):
+        return self.numElements
+
+    def setDefaults(self):
+        """Constantes físicas e propriedades padrão (vácuo, sem fontes)."""
+        raise NotImplementedError
+
+    def setNodes(self, nodes):
+        nodes = np.asarray(nodes)
+        self.x = np.ascontiguousarray(nodes[self.triElements, 0])
+        self.y = np.ascontiguousarray(nodes[self.triElements, 1])
+        self.a, self.b, self.c, self.Delta = triangle_geometry(self.x, self.y)
+        self.xc, self.yc = self.x.mean(axis=1), self.y.mean(axis=1)
+
+    def _as_array(self, value):
+        # Aceita escalar (material homogêneo) ou array por elemento
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.numElements,)).copy()
+
+    def stiffness(self, coef):
+        """Matrizes locais coef/(4*Delta) * (b b^T + c c^T), empilhadas (N, 3, 3)."""
+        return stiffness_matrices(self.b, self.c, self.Delta, coef)
+
+    def mass(self, coef):
+        """Matrizes de massa coef*Delta/12 * (1 + delta_ij), empilhadas (N, 3, 3)."""
+        return mass_matrices(self.Delta, coef)
+
+    def load(self, source):
+        """Vetores locais source*Delta/3 para cada nó, empilhados (N, 3)."""
+        return np.repeat((source * self.Delta / 3)[:, None], 3, axis=1)
+
+    def computeMatrix(self):
+        raise NotImplementedError
+
+    def gradient(self, potential):
+        """
+        Gradiente (constante por elemento) de um campo P1 para todos os elementos.
+        potential: (numNodes,) ou (numNodes, K) para K soluções empilhadas.
+        Retorna (dV/dx, dV/dy) com forma (N,) ou (N, K).
+        """
+        V = np.asarray(potential)[self.triElements]
+        extra = (1,) * (V.ndim - 2)
+        twoDelta = (2 * self.Delta).reshape((-1,) + extra)
+        dx = np.sum(self.b.reshape(self.b.shape + extra) * V, axis=1) / twoDelta
+        dy = np.sum(self.c.reshape(self.c.shape + extra) * V, axis=1) / twoDelta
+        return dx, dy
+
+    def sparsity_pattern(self, numNodes):
+        """Padrão CSR da malha (calculado na primeira montagem e reutilizado depois)."""
+        pattern = getattr(self, "_pattern", None)
+        if pattern is None or pattern.shape[0] != numNodes:
+            pattern = self._pattern = SparsityPattern(self.triElements, numNodes)
+        return pattern
+
+    def element_mean(self, potential):
+        """Média dos valores nodais em cada elemento, (N,) ou (N, K)."""
+        return np.asarray(potential)[self.triElements].mean(axis=1)
+
+    @classmethod
+    def from_elements(cls, nodes, triElements, elements):
+        """Converte a lista de objetos Element (API antiga) em um batch equivalente."""
+        batch = cls(nodes, triElements)
+        for name in cls.properties:
+            setattr(batch, name, np.array([getattr(element, name) for element in elements], dtype=float))
+        batch.computeMatrix()
+        return batch
+
+def electric_field(batch, potential):
+    """E = -grad(V) para todos os elementos: retorna Ex, Ey, |E|."""
+    dx, dy = batch.gradient(potential)
+    Ex, Ey = -dx, -dy
+    return Ex, Ey, np.sqrt(Ex ** 2 + Ey ** 2)
+
+def magnetic_field(batch, potential):
+    """B = rot(A z) para todos os elementos: Bx = dA/dy, By = -dA/dx. Retorna Bx, By, |B|."""
+    dx, dy = batch.gradient(potential)
+    Bx, By = dy, -dx
+    return Bx, By, np.sqrt(Bx ** 2 + By ** 2)
+
+def induced_current(batch, potential, omega):
+    """Densidade de corrente induzida Jind = omega * sigma * |A_medio| por elemento."""
+    sigma = batch.sigma.reshape((-1,) + (1,) * (np.ndim(potential) - 1))
+    return omega * sigma * np.abs(batch.element_mean(potential))
+
+class ElectrostaticBatch(TriangleBatch):
+    properties = ("eps", "rho")
+    materialProperties = ("eps",)
+
+    def setDefaults(self):
+        self.eps0 = 8.854187817e-12
+        self.eps = self._as_array(self.eps0)
+        self.rho = self._as_array(0)
+
+    def computeMatrix(self):
+        self.C = self.stiffness(self.eps * self.eps0)
+        self.Q = self.load(self.rho)
+
+    def setProperties(self, eps, rho):
+        self.eps, self.rho = self._as_array(eps) * self.eps0, self._as_array(rho)
+        self.computeMatrix()
+
+class MagnetostaticBatch(TriangleBatch):
+    properties = ("nu", "J")
+    materialProperties = ("nu",)
+
+    def setDefaults(self):
+        self.mu0 = 4 * np.pi * 1e-7
+        self.nu0 = 1 / self.mu0
+        self.nu = self._as_array(self.nu0)
+        self.J = self._as_array(0)
+
+    def computeMatrix(self):
+        self.S = self.stiffness(self.nu * self.nu0)
+        self.I = self.load(self.J)
+
+    def setProperties(self, nu, J):
+        """nu: relutividade RELATIVA 1/mu_r (escalar ou por elemento); J: densidade de corrente."""
+        self.nu, self.J = self._as_array(nu) * self.nu0, self._as_array(J)
+        self.computeMatrix()
+
+class MagnetodynamicBatch(TriangleBatch):
+    properties = ("nu", "J", "sigma")
+    materialProperties = ("nu", "sigma")
+
+    def setDefaults(self):
+        self.mu0 = 4 * np.pi * 1e-7
+        self.nu0 = 1 / self.mu0
+        # Relutividade relativa (1/mu_r): a rigidez usa nu * nu0 = 1/(mu_r * mu0)
+        self.nu = self._as_array(1.0)
+        self.J = self._as_array(0)
+        self.sigma = self._as_array(0)
+
+    def computeMatrix(self):
+        self.S = self.stiffness(self.nu * self.nu0)
+        self.I = self.load(self.J)
+        # Matriz de massa ponderada por sigma: Delta/12 * (1 + delta_ij)
+        self.C = self.mass(self.sigma)
+
+    def setProperties(self, mu, J, sigma):
+        """
+        mu: permeabilidade RELATIVA mu_r (escalar ou por elemento); guardada como nu = 1/mu_r,
+        de modo que a rigidez é 1/(mu_r * mu0). J: densidade de corrente; sigma: condutividade.
+        """
+        self.nu = 1.0 / self._as_array(mu)
+        self.J = self._as_array(J)
+        self.sigma = self._as_array(sigma)
+        self.computeMatrix()
+
+# --- Triângulos quadráticos (P2) ------------------------------------------------------
+
+# Quadratura de Dunavant de grau 4 (6 pontos) em coordenadas baricêntricas (L1, L2, L3);
+# os pesos somam 1/2, a área do triângulo de referência
+_QA, _QB = 0.445948490915965, 0.091576213509771
+TRIANGLE_QUADRATURE = (
+    np.array([[_QA, _QA, 1 - 2 * _QA], [_QA, 1 - 2 * _QA, _QA], [1 - 2 * _QA, _QA, _QA],
+              [_QB, _QB, 1 - 2 * _QB], [_QB, 1 - 2 * _QB, _QB], [1 - 2 * _QB, _QB, _QB]]),
+    0.5 * np.array([0.223381589678011] * 3 + [0.109951743655322] * 3),
+)
+
+def p2_shape_functions(L):
+    """
+    Funções de forma P2 na ordem do gmsh (vértices 0, 1, 2 e meios das arestas 01, 12, 20)
+    nos pontos baricêntricos L (Q, 3). Retorna N (Q, 6) e dN/d(xi, eta) (Q, 6, 2).
+    """
+    L1, L2, L3 = np.asarray(L, dtype=float).T
+    N = np.stack([L1 * (2 * L1 - 1), L2 * (2 * L2 - 1), L3 * (2 * L3 - 1),
+                  4 * L1 * L2, 4 * L2 * L3, 4 * L3 * L1], axis=1)
+    dNdL = np.zeros((len(L1), 6, 3))
+    dNdL[:, 0, 0], dNdL[:, 1, 1], dNdL[:, 2, 2] = 4 * L1 - 1, 4 * L2 - 1, 4 * L3 - 1
+    dNdL[:, 3, 0], dNdL[:, 3, 1] = 4 * L2, 4 * L1
+    dNdL[:, 4, 1], dNdL[:, 4, 2] = 4 * L3, 4 * L2
+    dNdL[:, 5, 2], dNdL[:, 5, 0] = 4 * L1, 4 * L3
+    # L1 = 1 - xi - eta, L2 = xi, L3 = eta
+    return N, dNdL @ np.array([[-1.0, -1.0], [1.0, 0.0], [0.0, 1.0]])
+
+def p2_gradients(x, y, dN):
+    """Derivadas físicas das funções de forma (E, Q, 6, 2) e det(J) (E, Q) do mapa isoparamétrico."""
+    X = np.stack([x, y], axis=2)                       # (E, 6, 2)
+    J = np.einsum('eia,qib->eqab', X, dN)               # dx_a/dxi_b
+    detJ = J[..., 0, 0] * J[..., 1, 1] - J[..., 0, 1] * J[..., 1, 0]
+    invJ = np.stack([np.stack([J[..., 1, 1], -J[..., 0, 1]], axis=-1),
+                     np.stack([-J[..., 1, 0], J[..., 0, 0]], axis=-1)], axis=-2) / detJ[..., None, None]
+    return np.einsum('qib,eqba->eqia', dN, invJ), detJ
+
+class QuadraticTriangleBatch(TriangleBatch):
+    """
+    Triângulos quadráticos isoparamétricos (triangle6 do gmsh): os nós de meio de aresta
+    seguem as fronteiras curvas. As matrizes locais 6x6 são integradas com a quadratura de
+    6 pontos; como os coeficientes são constantes por elemento, guarda-se apenas a rigidez
+    unitária (E, 6, 6) e os pesos de integração w*|det J| (E, Q).
+    """
+    order = 2
+
+    def setNodes(self, nodes):
+        nodes = np.asarray(nodes)
+        self.x = np.ascontiguousarray(nodes[self.triElements, 0])
+        self.y = np.ascontiguousarray(nodes[self.triElements, 1])
+        L, weights = TRIANGLE_QUADRATURE
+        self.N, dN = p2_shape_functions(L)
+        G, detJ = p2_gradients(self.x, self.y, dN)
+        self.wdet = weights * np.abs(detJ)
+        self.Delta = self.wdet.sum(axis=1)
+        self.unitStiffness = np.einsum('eq,eqia,eqja->eij', self.wdet, G, G)
+        # Centroide real do elemento curvo e gradientes no centroide de referência (pós-processamento)
+        xq, yq = self.x @ self.N.T, self.y @ self.N.T
+        self.xc = np.sum(self.wdet * xq, axis=1) / self.Delta
+        self.yc = np.sum(self.wdet * yq, axis=1) / self.Delta
+        _, dNc = p2_shape_functions(np.full((1, 3), 1 / 3))
+        self.Gc = p2_gradients(self.x, self.y, dNc)[0][:, 0]   # (E, 6, 2)
+
+    def stiffness(self, coef):
+        """Matrizes locais coef * int(grad Ni . grad Nj), empilhadas (N, 6, 6)."""
+        return coef[:, None, None] * self.unitStiffness
+
+    def mass(self, coef):
+        """Matrizes de massa coef * int(Ni Nj), empilhadas (N, 6, 6)."""
+        return np.einsum('e,eq,qi,qj->eij', coef, self.wdet, self.N, self.N)
+
+    def load(self, source):
+        """Vetores locais source * int(Ni), empilhados (N, 6)."""
+        return source[:, None] * (self.wdet @ self.N)
+
+    def gradient(self, potential):
+        """Gradiente no centroide de cada elemento; mesma convenção de formas do P1."""
+        V = np.asarray(potential)[self.triElements]
+        dx = np.einsum('ei,ei...->e...', self.Gc[:, :, 0], V)
+        dy = np.einsum('ei,ei...->e...', self.Gc[:, :, 1], V)
+        return dx, dy
+
+    def element_mean(self, potential):
+        """Média do campo P2 em cada elemento (integral / área), (N,) ou (N, K)."""
+        V = np.asarray(potential)[self.triElements]
+        return np.einsum('ei,ei...->e...', (self.wdet @ self.N) / self.Delta[:, None], V)
+
+class QuadraticElectrostaticBatch(QuadraticTriangleBatch, ElectrostaticBatch):
+    pass
+
+class QuadraticMagnetostaticBatch(QuadraticTriangleBatch, MagnetostaticBatch):
+    pass
+
+class QuadraticMagnetodynamicBatch(QuadraticTriangleBatch, MagnetodynamicBatch):
+    pass
+
+def batch_class(kind, order=1):
+    """Classe de batch para o problema ('electrostatic', 'magnetostatic', 'magnetodynamic') e a ordem."""
+    classes = {
+        ("electrostatic", 1): ElectrostaticBatch, ("electrostatic", 2): QuadraticElectrostaticBatch,
+        ("magnetostatic", 1): MagnetostaticBatch, ("magnetostatic", 2): QuadraticMagnetostaticBatch,
+        ("magnetodynamic", 1): MagnetodynamicBatch, ("magnetodynamic", 2): QuadraticMagnetodynamicBatch,
+    }
+    if (kind, order) not in classes:
+        raise ValueError(f"Elementos de ordem {order} não suportados para '{kind}'.")
+    return classes[(kind, order)]
+
+class LineBatch:
+    """Elementos lineares 1D de 2 nós (heat_1d / wave_1d), com a mesma interface dos batches 2D."""
+    order = 1
+
+    def __init__(self, nodes, elements):
+        self.elements = np.asarray(elements, dtype=np.int64)
+        self.numElements = len(self.elements)
+        x = np.asarray(nodes, dtype=float).reshape(len(nodes), -1)[:, 0]
+        self.x = x[self.elements]
+        self.h = np.abs(self.x[:, 1] - self.x[:, 0])
+
+    def __len__(self):
+        return self.numElements
+
+    @staticmethod
+    def uniform(L, n):
+        """Malha uniforme de [0, L] com n elementos: retorna nós (n+1,) e conectividade (n, 2)."""
+        nodes = np.linspace(0.0, L, n + 1)
+        return nodes, np.column_stack([np.arange(n), np.arange(1, n + 1)])
+
+    def stiffness(self, coef):
+        """Matrizes locais coef/h * [[1, -1], [-1, 1]], empilhadas (N, 2, 2)."""
+        return (coef / self.h)[:, None, None] * np.array([[1.0, -1.0], [-1.0, 1.0]])
+
+    def mass(self, coef):
+        """Matrizes de massa coef*h/6 * [[2, 1], [1, 2]], empilhadas (N, 2, 2)."""
+        return (coef * self.h / 6)[:, None, None] * np.array([[2.0, 1.0], [1.0, 2.0]])
+
+    def load(self, source):
+        """Vetores locais source*h/2 para cada nó, empilhados (N, 2)."""
+        return np.repeat((source * self.h / 2)[:, None], 2, axis=1)
+
+    def sparsity_pattern(self, numNodes):
+        pattern = getattr(self, "_pattern", None)
+        if pattern is None or pattern.shape[0] != numNodes:
+            pattern = self._pattern = SparsityPattern(self.elements, numNodes)
+        return pattern
+
+# --- Montagem paralela por blocos -------------------------------------------------------
+# Os arrays grandes (nós, conectividade, coeficientes e a saída) ficam em memória
+# compartilhada; cada tarefa recebe só os nomes dos segmentos e o intervalo [start, stop)
+# de triângulos, sem serializar arrays entre processos.
+
+def _share_array(array, registry):
+    """Copia `array` para um segmento de memória compartilhada e devolve sua descrição."""
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    registry.append(shm)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm.name, array.shape, array.dtype.str
+
+def _attach_array(spec, handles):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    handles.append(shm)
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _assemble_chunk(specs, start, stop):
+    """Calcula as matrizes locais dos triângulos [start, stop) e grava os valores COO na saída."""
+    handles = []
+    try:
+        nodes = _attach_array(specs["nodes"], handles)
+        tri = _attach_array(specs["triElements"], handles)[start:stop]
+        x, y = nodes[tri, 0], nodes[tri, 1]
+        _, b, c, Delta = triangle_geometry(x, y)
+        local = stiffness_matrices(b, c, Delta, _attach_array(specs["stiffnessCoef"], handles)[start:stop])
+        if specs.get("massCoef") is not None:
+            local = local + mass_matrices(Delta, _attach_array(specs["massCoef"], handles)[start:stop])
+        _attach_array(specs["values"], handles)[start:stop] = local.reshape(len(tri), 9)
+        return stop - start
+    finally:
+        for shm in handles:
+            shm.close()
+
+def assemble_parallel(nodes, triElements, stiffnessCoef, massCoef=None, numNodes=None,
+                      pattern=None, workers=None, chunkSize=100000):
+    """
+    Montagem em paralelo de K = sum_e (rigidez_e(stiffnessCoef) + massa_e(massCoef)).
+    Os triângulos são divididos em blocos de `chunkSize`; cada processo calcula as matrizes
+    locais do seu bloco e grava os valores dos tripletos COO (E, 9) na memória compartilhada.
+    Linhas/colunas dos tripletos vêm do padrão de esparsidade simbólico (SparsityPattern),
+    que soma as duplicatas e gera o CSR final no processo principal.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    triElements = np.asarray(triElements, dtype=np.int64)
+    numElements = len(triElements)
+    numNodes = len(nodes) if numNodes is None else numNodes
+    pattern = pattern if pattern is not None else SparsityPattern(triElements, numNodes)
+    stiffnessCoef = np.broadcast_to(np.asarray(stiffnessCoef, dtype=float), (numElements,))
+    dtype = float
+    if massCoef is not None:
+        massCoef = np.broadcast_to(np.asarray(massCoef), (numElements,))
+        dtype = np.result_type(float, massCoef.dtype)
+
+    workers = workers or os.cpu_count() or 1
+    chunkSize = max(1, int(chunkSize))
+    bounds = [(start, min(start + chunkSize, numElements)) for start in range(0, numElements, chunkSize)]
+
+    registry = []
+    try:
+        specs = {
+            "nodes": _share_array(nodes, registry),
+            "triElements": _share_array(triElements, registry),
+            "stiffnessCoef": _share_array(stiffnessCoef, registry),
+            "massCoef": _share_array(massCoef, registry) if massCoef is not None else None,
+            "values": _share_array(np.empty((numElements, 9), dtype=dtype), registry),
+        }
+        if workers == 1 or len(bounds) == 1:
+            for start, stop in bounds:
+                _assemble_chunk(specs, start, stop)
+        else:
+            # spawn: fork não é seguro num processo com threads (TensorFlow/DeepXDE já carregados);
+            # os workers só recebem os nomes dos blocos de memória compartilhada
+            with ProcessPoolExecutor(max_workers=min(workers, len(bounds)),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = [pool.submit(_assemble_chunk, specs, start, stop) for start, stop in bounds]
+                for future in futures:
+                    future.result()
+        values = np.ndarray((numElements, 9), dtype=dtype, buffer=registry[-1].buf)
+        return pattern.assemble(values, dtype=dtype)
+    finally:
+        for shm in registry:
+            shm.close()
+            shm.unlink()
+
 class Solver:
-    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions):
+    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig=None):
         self.nodes = nodes
         self.nodeTags = nodeTags
         self.triElements = triElements
@@ -144,12 +664,63 @@ class Solver:
         self.boundaryConditions = boundaryConditions
         self.numNodes = len(nodeTags)
         self.numElements = len(triElements)
+        # Tempos, memória e contadores por fase (metrics.json -> 'fem_profile')
+        self.profiler = FemProfiler()
+        # Os solvers trabalham sobre o batch; listas de Element são convertidas (compatibilidade)
+        if isinstance(elements, TriangleBatch):
+            self.batch = elements
+            setupTime, reused = self.batch.take_setup_time()
+            self.profiler.add("element_setup", setupTime, cache_hit=reused)
+        else:
+            with self.profiler.phase("element_setup"):
+                self.batch = self.batchClass.from_elements(nodes, triElements, elements)
+        self.profiler.count(dofs=int(self.numNodes), elements=int(self.numElements),
+                            element_order=int(self.batch.order))
+        # Backend da solução linear (bloco 'fem_solver' do config.json)
+        self.linearSolver = get_linear_solver(solverConfig)
+        self.dirichletMode = self.linearSolver.config["dirichlet"]
+        self.assemblyWorkers = self.linearSolver.config["assembly_workers"]
+        self.solveInfo = {}
+        self._blocks = None
         self.xc = np.zeros(self.numElements)
         self.yc = np.zeros(self.numElements)
 
+    def assemble_matrix(self, stiffnessCoef, massCoef=None, localMatrices=None):
+        """
+        Matriz global com o padrão CSR da malha. Com assembly_workers != 1 as matrizes locais
+        (P1) são recalculadas por blocos num pool de processos (assemble_parallel); caso
+        contrário usa localMatrices (ou as calcula a partir dos coeficientes) no próprio processo.
+        """
+        pattern = self.batch.sparsity_pattern(self.numNodes)
+        dtype = float if massCoef is None else np.result_type(float, np.asarray(massCoef).dtype)
+        if self.assemblyWorkers != 1 and self.batch.order == 1:
+            return assemble_parallel(self.nodes, self.batch.triElements, stiffnessCoef, massCoef,
+                                     numNodes=self.numNodes, pattern=pattern,
+                                     workers=self.assemblyWorkers or None,
+                                     chunkSize=self.linearSolver.config["assembly_chunk_size"])
+        if localMatrices is None:
+            localMatrices = self.batch.stiffness(stiffnessCoef)
+            if massCoef is not None:
+                localMatrices = localMatrices + self.batch.mass(massCoef)
+        return pattern.assemble(localMatrices, dtype=dtype)
+
+    def with_mesh(self, nodes, triElements, batch, boundaryConditions):
+        """
+        Novo solver da mesma classe e configuração sobre outra malha (refinamento adaptativo).
+        As fatorações da malha antiga não serão reusadas e são liberadas.
+        """
+        self.close()
+        return type(self)(nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions,
+                          solverConfig=self.linearSolver.config)
+
     def apply_boundary_conditions(self):
+        with self.profiler.phase("boundary_conditions"):
+            self._apply_boundary_conditions()
+        self.profiler.count(fixed_dofs=int(self.isFixed.sum()), free_dofs=int(len(self.freeNodes)))
+
+    def _apply_boundary_conditions(self):
         self.fixedNodes = []  # List to store indices of fixed nodes
-        self.fixedValues = np.zeros(self.numNodes)  # Potential vector with zeros for fixed nodes
+        self.fixedValues = np.zeros(self.numNodes, dtype=self.potential.dtype)  # Potential vector with zeros for fixed nodes
 
         for groupId, props in self.boundaryConditions.items():
             self.fixedNodes.extend(props['nodes'])
@@ -163,34 +734,199 @@ class Solver:
         self.freeNodes = np.where(~self.isFixed)[0]
 
     def solve(self):
-        # Modify global matrix and vector to apply Dirichlet conditions
-        self.globalMatrix = self.globalMatrix.tocsr()
-        matrix_reduced = self.globalMatrix[self.freeNodes][:, self.freeNodes]
-        vector_reduced = self.globalVector[self.freeNodes] - self.globalMatrix[self.freeNodes][:, self.fixedNodes] @ self.fixedValues[self.fixedNodes]
-
-        # Solve for potentials at free nodes
-        print(f"DEBUG: Solver - Num Nodes: {self.numNodes}")
-        print(f"DEBUG: Solver - Fixed Nodes: {len(self.fixedNodes)}")
-        print(f"DEBUG: Solver - Free Nodes: {len(self.freeNodes)}")
-        print(f"DEBUG: Solver - Fixed Values Max: {np.max(self.fixedValues) if len(self.fixedValues)>0 else 0}")
-        
+        # Contagens (nós fixos/livres, nnz, fill) vão para o profiler e o método, iterações e
+        # resíduo para solveInfo (metrics.json -> 'fem_profile'); o resumo só sai em nível DEBUG
         if len(self.fixedNodes) == 0:
-             print("WARNING: No fixed nodes found! Solution might be non-unique or zero.")
-        
-        # Check Matrix
-        print(f"DEBUG: Global Matrix nnz: {self.globalMatrix.nnz}")
-        
-        freeValues = spsolve(matrix_reduced, vector_reduced)
-        
-        print(f"DEBUG: Solver - Free Values Max: {np.max(np.abs(freeValues)) if len(freeValues)>0 else 0}")
+            print("⚠️ Nenhum nó fixo: a solução pode não ser única (ou ser nula).")
 
+        self.globalMatrix = self.globalMatrix.tocsr()
         # Construct the complete potential vector in the correct order (same order as nodeTags)
-        self.potential[self.fixedNodes] = self.fixedValues[self.fixedNodes]
-        self.potential[self.freeNodes] = freeValues
+        self.potential[:] = self.solve_dirichlet(self.globalVector, self.fixedValues)
+        logger.debug("%s (%s): %d DOFs (%d fixos), nnz=%d, %s it, resíduo=%.2e, setup=%.3fs, solve=%.3fs",
+                     self.solveInfo["method"], self.dirichletMode, self.numNodes, len(self.fixedNodes),
+                     self.globalMatrix.nnz, self.solveInfo["iterations"], self.solveInfo["residual"],
+                     self.solveInfo["setup_time"], self.solveInfo["solve_time"])
+
+    def dirichlet_blocks(self):
+        """Blocos K_ff e K_fd, extraídos uma vez por matriz global e conjunto de nós fixos."""
+        self.globalMatrix = self.globalMatrix.tocsr()
+        if (self._blocks is None or self._blocks[0] is not self.globalMatrix
+                or not np.array_equal(self._blocks[1], self.isFixed)):
+            K_ff, K_fd = dirichlet_blocks(self.globalMatrix, self.isFixed)
+            self._blocks = (self.globalMatrix, self.isFixed.copy(), K_ff, K_fd)
+        return self._blocks[2], self._blocks[3]
+
+    def penalized_matrix(self):
+        """
+        Alternativa sem extração: K + w*I nos nós fixos (mantém a simetria).
+        Retorna a matriz (cacheada como os blocos) e o peso w.
+        """
+        self.globalMatrix = self.globalMatrix.tocsr()
+        if (self._blocks is None or self._blocks[0] is not self.globalMatrix
+                or not np.array_equal(self._blocks[1], self.isFixed)):
+            weight = self.linearSolver.config["penalty_factor"] * np.abs(self.globalMatrix.diagonal()).max()
+            penalized = (self.globalMatrix + diags(weight * self.isFixed.astype(float))).tocsr()
+            self._blocks = (self.globalMatrix, self.isFixed.copy(), penalized, weight)
+        return self._blocks[2], self._blocks[3]
+
+    def solve_dirichlet(self, loads, fixed):
+        """
+        Impõe as condições de Dirichlet e resolve. loads/fixed: (numNodes,) ou (numNodes, K).
+        Retorna o potencial completo com a mesma forma.
+        """
+        with self.profiler.phase("solve"):
+            values = self._solve_dirichlet(loads, fixed)
+        # Fatoração (setup) e substituições/iterações, separadas pelo backend linear; somadas
+        # sobre as chamadas, como o wall_time da fase (transiente/varredura resolvem várias vezes)
+        info = self.solveInfo
+        entry = self.profiler.phases["solve"]
+        entry["method"] = info.get("method")
+        for field, value in (("factorization_time", info.get("setup_time")),
+                             ("substitution_time", info.get("solve_time")),
+                             ("iterations", info.get("iterations"))):
+            if value is not None:
+                entry[field] = entry.get(field, 0) + value
+        entry["cached_calls"] = entry.get("cached_calls", 0) + bool(info.get("cached"))
+        self.profiler.count(nnz=int(self.globalMatrix.nnz), nnz_reduced=info.get("nnz"),
+                            nnz_factor=(info.get("fill") or {}).get("nnz_factor"))
+        return values
+
+    def _solve_dirichlet(self, loads, fixed):
+        fixedNodes = np.flatnonzero(self.isFixed)
+        key = self.factorization_key()
+        if self.dirichletMode == "penalty":
+            matrix, weight = self.penalized_matrix()
+            mask = self.isFixed.reshape((-1,) + (1,) * (np.ndim(loads) - 1))
+            values = self.linearSolver.solve(matrix, loads + weight * mask * fixed, key=key)
+            values[fixedNodes] = fixed[fixedNodes]
+        elif self.dirichletMode == "elimination":
+            K_ff, K_fd = self.dirichlet_blocks()
+            vector_reduced = loads[self.freeNodes] - K_fd @ fixed[fixedNodes]
+            values = fixed.copy()
+            values[self.freeNodes] = self.linearSolver.solve(K_ff, vector_reduced, key=key)
+        else:
+            raise ValueError(f"Modo de Dirichlet '{self.dirichletMode}' não suportado.")
+        self.solveInfo = self.linearSolver.info
+        return values
+
+    def mesh_hash(self):
+        if getattr(self, "_meshHash", None) is None:
+            self._meshHash = array_digest(np.asarray(self.nodes)[:, :2], self.batch.triElements)
+        return self._meshHash
+
+    def matrix_parameters(self):
+        """Parâmetros escalares (além dos materiais) que alteram a matriz global."""
+        return ()
+
+    def factorization_key(self):
+        """Chave do cache de fatoração: malha, materiais, nós fixos e método de solução."""
+        materials = [getattr(self.batch, name) for name in self.batch.materialProperties]
+        return (type(self).__name__, self.mesh_hash(), array_digest(*materials),
+                array_digest(self.freeNodes), self.matrix_parameters(), self.linearSolver.method,
+                self.linearSolver.config["reordering"], self.dirichletMode,
+                self.linearSolver.config["penalty_factor"])
+
+    def close(self):
+        """
+        Descarta as fatorações desta malha (FACTORIZATION_CACHE e fator do backend linear):
+        chamado quando a malha é substituída (with_mesh) ou o solver não será mais usado.
+        """
+        meshHash = getattr(self, "_meshHash", None)
+        if meshHash is not None:
+            name = type(self).__name__
+            FACTORIZATION_CACHE.evict(lambda key: key[0] == name and key[1] == meshHash)
+        self.linearSolver.close()
+
+    def reduced_matrix(self):
+        """Matriz efetivamente fatorada: K_ff (eliminação) ou K penalizada."""
+        if self.dirichletMode == "penalty":
+            return self.penalized_matrix()[0]
+        return self.dirichlet_blocks()[0]
+
+    def reordering_report(self, orderings=("natural", "none", "rcm", "amd")):
+        """
+        Preenchimento e memória da fatoração do sistema reduzido para cada reordenação
+        (natural = numeração do gmsh, sem reordenar). Imprime a tabela e devolve o dict.
+        """
+        if not hasattr(self, "freeNodes"):
+            self.apply_boundary_conditions()
+        report = compare_orderings(self.reduced_matrix(), orderings, self.linearSolver.config)
+        print(f"{'ordem':>8} {'banda':>8} {'nnz(A)':>10} {'nnz(L+U)':>10} {'fill':>7} {'mem [MB]':>9} {'t [s]':>7}")
+        for name, fill in report.items():
+            print(f"{name:>8} {fill['bandwidth']:8d} {fill['nnz_A']:10d} {fill['nnz_factor']:10d} "
+                  f"{fill['fill_ratio']:7.2f} {fill['factor_memory_mb']:9.2f} {fill['factor_time']:7.3f}")
+        return report
+
+    def solve_many(self, bc_value_sets, loadVectors=None):
+        """
+        Resolve o mesmo sistema para vários conjuntos de valores de Dirichlet.
+        bc_value_sets: lista de dicts {nome_do_contorno: potencial}; contornos omitidos mantêm
+        o valor de boundaryConditions. Os conjuntos de nós fixos não mudam, então a fatoração
+        (cacheada) é reutilizada e só o lifting do lado direito e as substituições são refeitos.
+        loadVectors: opcional, (K, numNodes) com termos fonte por caso.
+        Retorna os potenciais empilhados (numNodes, K).
+        """
+        if not hasattr(self, "freeNodes"):
+            self.apply_boundary_conditions()
+        numCases = len(bc_value_sets)
+
+        fixed = np.zeros((self.numNodes, numCases), dtype=self.potential.dtype)
+        for k, values in enumerate(bc_value_sets):
+            for name, props in self.boundaryConditions.items():
+                fixed[props['nodes'], k] = values.get(name, props['potential'])
+
+        if loadVectors is None:
+            loads = np.repeat(self.globalVector[:, None], numCases, axis=1)
+        else:
+            loads = np.asarray(loadVectors).T.astype(self.potential.dtype)
+
+        return self.solve_dirichlet(loads, fixed)
+
+    def load_matrix(self, sources):
+        """
+        Vetores de carga de K casos de excitação. sources: (numElements, K) com o termo fonte
+        de cada elemento por caso (rho no eletrostático, J nos magnéticos). Retorna (numNodes, K).
+        """
+        sources = np.asarray(sources).reshape(self.numElements, -1)
+        # int(Ni) por elemento (P1: Delta/3; P2: quadratura), escalado pela fonte de cada caso
+        unit = self.batch.load(np.ones(self.numElements))
+        return assemble_load_matrix(self.triElements, unit[:, :, None] * sources[:, None, :],
+                                    self.numNodes, dtype=self.potential.dtype)
+
+    def solve_excitations(self, sources):
+        """
+        Resolve K casos de excitação (ex.: padrões de corrente de fase) com a mesma matriz e as
+        mesmas condições de contorno: monta a matriz de carga (numNodes, K) e faz uma única
+        fatoração com K substituições (backends iterativos reutilizam o pré-condicionador).
+        A matriz global deve estar montada. Retorna dict com 'potential' (K, numNodes) e os
+        campos por elemento de excitation_fields, também (K, numElements).
+        """
+        if not hasattr(self, "freeNodes"):
+            self.apply_boundary_conditions()
+        loads = self.load_matrix(sources)
+        fixed = np.repeat(self.fixedValues[:, None], loads.shape[1], axis=1)
+        potentials = self.solve_dirichlet(loads, fixed)
+        with self.profiler.phase("post_processing"):
+            fields = self.excitation_fields(potentials)
+        return {"potential": potentials.T, **{name: value.T for name, value in fields.items()},
+                "solveInfo": self.solveInfo}
+
+    def excitation_fields(self, potentials):
+        """Campos por elemento para potenciais empilhados (numNodes, K)."""
+        raise NotImplementedError
+
+    def save_fields(self, directory, metadata=None):
+        """Grava o potencial e os campos por elemento no formato binário de utils.field_store."""
+        fields = {"potential": self.potential, **self.excitation_fields(self.potential)}
+        metadata = {"solver": type(self).__name__, "element_order": int(self.batch.order),
+                    "parameters": list(self.matrix_parameters()), **(metadata or {})}
+        return write_fields(directory, np.asarray(self.nodes)[:, :2], self.batch.triElements, fields, metadata)
 
 class ElectrostaticSolver(Solver):
-    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions):
-        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions)
+    batchClass = ElectrostaticBatch
+
+    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig=None):
+        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig)
         self.globalMatrix = lil_matrix((self.numNodes, self.numNodes))
         self.globalVector = np.zeros(self.numNodes)
         self.potential = np.zeros(self.numNodes)
@@ -200,18 +936,28 @@ class ElectrostaticSolver(Solver):
         self.rho = np.zeros(self.numElements)
 
     def assemble_global_matrix_and_vector(self):
+        with self.profiler.phase("assembly"):
+            self.globalMatrix = self.assemble_matrix(self.batch.eps * self.batch.eps0, localMatrices=self.batch.C)
+            self.globalVector = assemble_global_vector(self.triElements, self.batch.Q, self.numNodes)
+
+    def assemble_global_matrix_and_vector_reference(self):
+        # Montagem elemento a elemento (referência para validar a montagem vetorizada)
+        self.globalMatrix = lil_matrix((self.numNodes, self.numNodes))
+        self.globalVector = np.zeros(self.numNodes)
         for e, nodeIndices in enumerate(self.triElements):
             for iLocal, iGlobal in enumerate(nodeIndices):
-                self.globalVector[iGlobal] += self.elements[e].Q[iLocal]
+                self.globalVector[iGlobal] += self.batch.Q[e, iLocal]
                 for jLocal, jGlobal in enumerate(nodeIndices):
-                    self.globalMatrix[iGlobal, jGlobal] += self.elements[e].C[iLocal, jLocal]
+                    self.globalMatrix[iGlobal, jGlobal] += self.batch.C[e, iLocal, jLocal]
 
     def calculate_electric_field(self):
-        for i, nodeIndices in enumerate(self.triElements):
-            V_elem = self.potential[nodeIndices]
-            self.elements[i].setNodePotentials(V_elem)
-            self.Ex[i], self.Ey[i], self.modE[i] = self.elements[i].Ex, self.elements[i].Ey, self.elements[i].modE
-            self.xc[i], self.yc[i] = self.elements[i].xc, self.elements[i].yc
+        with self.profiler.phase("post_processing"):
+            self.Ex, self.Ey, self.modE = electric_field(self.batch, self.potential)
+            self.xc, self.yc = self.batch.xc, self.batch.yc
+
+    def excitation_fields(self, potentials):
+        Ex, Ey, modE = electric_field(self.batch, potentials)
+        return {"Ex": Ex, "Ey": Ey, "modE": modE}
 
     def get_potential(self):
         return self.potential
@@ -220,8 +966,10 @@ class ElectrostaticSolver(Solver):
         return self.Ex, self.Ey, self.modE, self.xc, self.yc
 
 class MagnetostaticSolver(Solver):
-    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions):
-        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions)
+    batchClass = MagnetostaticBatch
+
+    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig=None):
+        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig)
         self.globalMatrix = lil_matrix((self.numNodes, self.numNodes))
         self.globalVector = np.zeros(self.numNodes)
         self.potential = np.zeros(self.numNodes)
@@ -230,18 +978,28 @@ class MagnetostaticSolver(Solver):
         self.modB = np.zeros(self.numElements)
 
     def assemble_global_matrix_and_vector(self):
+        with self.profiler.phase("assembly"):
+            self.globalMatrix = self.assemble_matrix(self.batch.nu * self.batch.nu0, localMatrices=self.batch.S)
+            self.globalVector = assemble_global_vector(self.triElements, self.batch.I, self.numNodes)
+
+    def assemble_global_matrix_and_vector_reference(self):
+        # Montagem elemento a elemento (referência para validar a montagem vetorizada)
+        self.globalMatrix = lil_matrix((self.numNodes, self.numNodes))
+        self.globalVector = np.zeros(self.numNodes)
         for e, nodeIndices in enumerate(self.triElements):
             for iLocal, iGlobal in enumerate(nodeIndices):
-                self.globalVector[iGlobal] += self.elements[e].I[iLocal]
+                self.globalVector[iGlobal] += self.batch.I[e, iLocal]
                 for jLocal, jGlobal in enumerate(nodeIndices):
-                    self.globalMatrix[iGlobal, jGlobal] += self.elements[e].S[iLocal, jLocal]
+                    self.globalMatrix[iGlobal, jGlobal] += self.batch.S[e, iLocal, jLocal]
 
     def calculate_magnetic_field(self):
-        for i, nodeIndices in enumerate(self.triElements):
-            A_elem = self.potential[nodeIndices]
-            self.elements[i].setNodePotentials(A_elem)
-            self.Bx[i], self.By[i], self.modB[i] = self.elements[i].Bx, self.elements[i].By, self.elements[i].modB
-            self.xc[i], self.yc[i] = self.elements[i].xc, self.elements[i].yc
+        with self.profiler.phase("post_processing"):
+            self.Bx, self.By, self.modB = magnetic_field(self.batch, self.potential)
+            self.xc, self.yc = self.batch.xc, self.batch.yc
+
+    def excitation_fields(self, potentials):
+        Bx, By, modB = magnetic_field(self.batch, potentials)
+        return {"Bx": Bx, "By": By, "modB": modB}
 
     def get_potential(self):
         return self.potential
@@ -249,9 +1007,27 @@ class MagnetostaticSolver(Solver):
     def get_magnetic_field(self):
         return self.Bx, self.By, self.modB, self.xc, self.yc
  
+# Estado compartilhado pelos processos do sweep (enviado uma vez por worker no initializer)
+_SWEEP_STATE = {}
+
+def _init_sweep_worker(state):
+    _SWEEP_STATE.update(state)
+
+def _solve_frequency(frequency):
+    """Resolve (S + j*2*pi*f*C) A = F nos nós livres para uma frequência."""
+    st = _SWEEP_STATE
+    omega = 2 * np.pi * frequency
+    matrix = (st["S_ff"] + 1j * omega * st["C_ff"]).tocsr()
+    vector = st["F_free"] - (st["S_fd"] + 1j * omega * st["C_fd"]) @ st["g_fixed"]
+    linearSolver = get_linear_solver(st["solverConfig"])
+    values = linearSolver.solve(matrix, vector)
+    return values, linearSolver.info
+
 class MagnetodynamicSolver(Solver):
-    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions, frequency):
-        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions)
+    batchClass = MagnetodynamicBatch
+
+    def __init__(self, nodes, nodeTags, triElements, elements, boundaryConditions, frequency, solverConfig=None):
+        super().__init__(nodes, nodeTags, triElements, elements, boundaryConditions, solverConfig)
         self.globalMatrix = lil_matrix((self.numNodes, self.numNodes), dtype='complex')
         self.globalVector = np.zeros(self.numNodes, dtype='complex')
         self.potential = np.zeros(self.numNodes, dtype='complex')
@@ -262,24 +1038,96 @@ class MagnetodynamicSolver(Solver):
         self.frequency = frequency
 
     def assemble_global_matrix_and_vector(self):
+        with self.profiler.phase("assembly"):
+            omega = 2 * np.pi * self.frequency
+            self.globalMatrix = self.assemble_matrix(self.batch.nu * self.batch.nu0, 1j * omega * self.batch.sigma)
+            self.globalVector = assemble_global_vector(self.triElements, self.batch.I, self.numNodes, dtype='complex')
+
+    def assemble_global_matrix_and_vector_reference(self):
+        # Montagem elemento a elemento (referência para validar a montagem vetorizada)
+        self.globalMatrix = lil_matrix((self.numNodes, self.numNodes), dtype='complex')
+        self.globalVector = np.zeros(self.numNodes, dtype='complex')
         f = self.frequency
         for e, nodeIndices in enumerate(self.triElements):
-            element = self.elements[e]
             for iLocal, iGlobal in enumerate(nodeIndices):
-                self.globalVector[iGlobal] += element.I[iLocal]
+                self.globalVector[iGlobal] += self.batch.I[e, iLocal]
                 for jLocal, jGlobal in enumerate(nodeIndices):
-                    self.globalMatrix[iGlobal, jGlobal] += complex(element.S[iLocal, jLocal], 2 * np.pi * f * element.C[iLocal, jLocal])
+                    self.globalMatrix[iGlobal, jGlobal] += complex(self.batch.S[e, iLocal, jLocal], 2 * np.pi * f * self.batch.C[e, iLocal, jLocal])
+
+    def matrix_parameters(self):
+        return (float(self.frequency),)
+
+    def with_mesh(self, nodes, triElements, batch, boundaryConditions):
+        self.close()
+        return type(self)(nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions,
+                          self.frequency, solverConfig=self.linearSolver.config)
+
+    def frequency_sweep(self, frequencies, workers=None):
+        """
+        Resolve o mesmo estator para várias frequências. As matrizes globais de rigidez S e de
+        condutividade C são montadas (e particionadas livre/fixo) uma única vez; cada frequência
+        só forma S + j*2*pi*f*C e resolve. As frequências rodam em paralelo num pool de processos
+        (workers=1 resolve no próprio processo).
+        Retorna dict com 'frequency' (F,), 'potential' (F, numNodes), 'modB' e 'Jind' (F, numElements)
+        e 'solveInfo' (lista por frequência).
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+        if not hasattr(self, "freeNodes"):
+            self.apply_boundary_conditions()
+
+        pattern = self.batch.sparsity_pattern(self.numNodes)
+        S, C = pattern.assemble(self.batch.S), pattern.assemble(self.batch.C)
+        F = assemble_global_vector(self.triElements, self.batch.I, self.numNodes, dtype='complex')
+        S_ff, S_fd = dirichlet_blocks(S, self.isFixed)
+        C_ff, C_fd = dirichlet_blocks(C, self.isFixed)
+        fixedNodes = np.flatnonzero(self.isFixed)
+        state = {
+            "S_ff": S_ff, "S_fd": S_fd, "C_ff": C_ff, "C_fd": C_fd,
+            "F_free": F[self.freeNodes], "g_fixed": self.fixedValues[fixedNodes],
+            "solverConfig": self.linearSolver.config,
+        }
+
+        if workers is None:
+            workers = min(len(frequencies), os.cpu_count() or 1)
+        if workers <= 1:
+            _init_sweep_worker(state)
+            results = [_solve_frequency(f) for f in frequencies]
+        else:
+            # spawn: fork não é seguro dentro do processo de treino (threads do TensorFlow);
+            # o estado de cada worker chega pelo initializer
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_sweep_worker, initargs=(state,),
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                results = list(pool.map(_solve_frequency, frequencies))
+
+        potentials = np.zeros((self.numNodes, len(frequencies)), dtype='complex')
+        potentials[fixedNodes] = self.fixedValues[fixedNodes, None]
+        potentials[self.freeNodes] = np.stack([values for values, _ in results], axis=1)
+
+        _, _, modB = magnetic_field(self.batch, potentials)
+        # Mesma convenção de calculate_Jind: omega recebe a frequência
+        Jind = induced_current(self.batch, potentials, frequencies)
+        return {
+            "frequency": frequencies,
+            "potential": potentials.T,
+            "modB": modB.T,
+            "Jind": Jind.T,
+            "solveInfo": [info for _, info in results],
+        }
+
+    def excitation_fields(self, potentials):
+        Bx, By, modB = magnetic_field(self.batch, potentials)
+        # Mesma convenção de calculate_Jind: omega recebe a frequência
+        return {"Bx": Bx, "By": By, "modB": modB, "Jind": induced_current(self.batch, potentials, self.frequency)}
 
     def calculate_Jind(self):
-        for e, element in enumerate(self.elements):
-            self.Jind[e] = element.Jind
+        # Mesma convenção dos elementos: omega recebe a frequência do solver
+        self.Jind = induced_current(self.batch, self.potential, self.frequency)
 
     def calculate_magnetic_field(self):
-        for i, nodeIndices in enumerate(self.triElements):
-            A_elem = self.potential[nodeIndices]
-            self.elements[i].setNodePotentials(A_elem, self.frequency)
-            self.Bx[i], self.By[i], self.modB[i] = self.elements[i].Bx, self.elements[i].By, self.elements[i].modB
-            self.xc[i], self.yc[i] = self.elements[i].xc, self.elements[i].yc
+        with self.profiler.phase("post_processing"):
+            self.Bx, self.By, self.modB = magnetic_field(self.batch, self.potential)
+            self.calculate_Jind()
+            self.xc, self.yc = self.batch.xc, self.batch.yc
 
     def get_potential(self):
         return self.potential
@@ -289,4 +1137,174 @@ class MagnetodynamicSolver(Solver):
         return self.Jind
 
     def get_magnetic_field(self):
-        return self.Bx, self.By, self.modB, self.xc, self.yc
\ No newline at end of file
+        return self.Bx, self.By, self.modB, self.xc, self.yc
+
+class TransientSolver:
+    """
+    Referência numérica para problemas transientes em malhas 1D (LineBatch) ou 2D (batches
+    triangulares P1/P2), com Dirichlet constante no tempo:
+      heat: capacity * du/dt - div(diffusivity * grad u) = source   (método theta:
+            theta=1 Euler implícito, theta=1/2 Crank-Nicolson)
+      wave: d2u/dt2 - div(diffusivity * grad u) = source, diffusivity = c^2   (Newmark,
+            beta=1/4, gamma=1/2: aceleração média, incondicionalmente estável)
+    A matriz do passo não muda com o tempo: é fatorada uma vez e reutilizada em todos os
+    passos. Os instantâneos vão para um .npy em disco (memmap) a cada save_every passos.
+    """
+    def __init__(self, nodes, connectivity, batch, boundaryConditions, kind="heat",
+                 diffusivity=1.0, capacity=1.0, source=0.0, solverConfig=None):
+        if kind not in ("heat", "wave"):
+            raise ValueError(f"Problema transiente '{kind}' não suportado.")
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.connectivity = np.asarray(connectivity, dtype=np.int64)
+        self.numNodes = len(self.nodes)
+        self.numElements = len(self.connectivity)
+        self.batch = batch
+        self.boundaryConditions = boundaryConditions
+        self.kind = kind
+        self.linearSolver = get_linear_solver(solverConfig)
+        self.profiler = FemProfiler()
+        self.times = self.snapshots = None
+
+        def coef(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (self.numElements,))
+
+        with self.profiler.phase("assembly"):
+            pattern = batch.sparsity_pattern(self.numNodes)
+            self.K = pattern.assemble(batch.stiffness(coef(diffusivity)))
+            self.M = pattern.assemble(batch.mass(coef(capacity)))
+            self.F = assemble_global_vector(self.connectivity, batch.load(coef(source)), self.numNodes)
+
+        self.isFixed = np.zeros(self.numNodes, dtype=bool)
+        self.fixedValues = np.zeros(self.numNodes)
+        for props in boundaryConditions.values():
+            self.isFixed[props['nodes']] = True
+            self.fixedValues[props['nodes']] = props['potential']
+        self.freeNodes = np.flatnonzero(~self.isFixed)
+        self.fixedNodes = np.flatnonzero(self.isFixed)
+        self.profiler.count(dofs=int(self.numNodes), free_dofs=int(len(self.freeNodes)),
+                            elements=int(self.numElements), nnz=int(self.K.nnz))
+
+    def _factorize(self, A):
+        """Fatora a matriz reduzida uma vez (backends diretos); iterativos resolvem a cada chamada."""
+        if hasattr(self.linearSolver, "factorize"):
+            return self.linearSolver.factorize(A).solve
+        return lambda b: self.linearSolver.solve(A, b)
+
+    def _initial(self, values):
+        values = values(self.nodes) if callable(values) else values
+        u = np.array(np.broadcast_to(np.asarray(values, dtype=float), (self.numNodes,)))
+        return u
+
+    def _open_snapshots(self, output, numSnapshots):
+        """Instantâneos em disco (np.lib.format.open_memmap) ou em memória se output=None."""
+        shape = (numSnapshots, self.numNodes)
+        if output is None:
+            return np.zeros(shape)
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        return np.lib.format.open_memmap(output, mode="w+", dtype=float, shape=shape)
+
+    def run(self, u0, dt, num_steps, v0=0.0, save_every=1, output=None, theta=0.5, beta=0.25, gamma=0.5):
+        """
+        Integra num_steps passos de tamanho dt a partir de u0 (array ou função dos nós) e,
+        na onda, da velocidade inicial v0. output: caminho do .npy dos instantâneos
+        (num_snapshots, numNodes); os tempos vão para <output>_times.npy.
+        Retorna (times, snapshots).
+        """
+        numSnapshots = num_steps // save_every + 1
+        snapshots = self._open_snapshots(output, numSnapshots)
+        times = np.arange(numSnapshots) * save_every * dt
+        g = self.fixedValues[self.fixedNodes]
+        free = self.freeNodes
+
+        u = self._initial(u0)
+        u[self.fixedNodes] = g
+        snapshots[0] = u
+        with self.profiler.phase("solve"):
+            if self.kind == "heat":
+                A = (self.M + theta * dt * self.K).tocsr()
+                B = (self.M - (1 - theta) * dt * self.K).tocsr()
+                A_ff, A_fd = dirichlet_blocks(A, self.isFixed)
+                solve = self._factorize(A_ff)
+                lift = dt * self.F[free] - A_fd @ g
+                for step in range(1, num_steps + 1):
+                    u[free] = solve((B @ u)[free] + lift)
+                    if step % save_every == 0:
+                        snapshots[step // save_every] = u
+            else:
+                # Nos nós fixos u = g, v = a = 0
+                v = self._initial(v0)
+                v[self.fixedNodes] = 0.0
+                a = np.zeros(self.numNodes)
+                M_ff, _ = dirichlet_blocks(self.M, self.isFixed)
+                a[free] = self._factorize(M_ff)(self.F[free] - (self.K @ u)[free])
+                E_ff, _ = dirichlet_blocks((self.M + beta * dt ** 2 * self.K).tocsr(), self.isFixed)
+                solve = self._factorize(E_ff)
+                for step in range(1, num_steps + 1):
+                    predictor = u + dt * v + (0.5 - beta) * dt ** 2 * a
+                    aNew = np.zeros(self.numNodes)
+                    aNew[free] = solve(self.F[free] - (self.K @ predictor)[free])
+                    u = predictor + beta * dt ** 2 * aNew
+                    v = v + dt * ((1 - gamma) * a + gamma * aNew)
+                    a = aNew
+                    if step % save_every == 0:
+                        snapshots[step // save_every] = u
+        self.profiler.phases["solve"].update(steps=int(num_steps), dt=float(dt))
+
+        if output is not None:
+            snapshots.flush()
+            np.save(os.path.splitext(output)[0] + "_times.npy", times)
+        self.times, self.snapshots = times, snapshots
+        return times, snapshots
+
+    def evaluate(self, X):
+        """
+        Solução nos pontos X = (x, [y], t): interpolação FEM no espaço e linear no tempo entre
+        instantâneos. NaN fora da malha ou fora do intervalo simulado. Serve como u_true.
+        """
+        X = np.asarray(X, dtype=float)
+        space, t = X[:, :-1], X[:, -1]
+        if self.nodes.ndim == 1 or self.nodes.shape[1] == 1:
+            x = self.nodes.reshape(-1)
+            order = np.argsort(x)
+            xs = x[order]
+            i = np.clip(np.searchsorted(xs, space[:, 0]) - 1, 0, len(xs) - 2)
+            w = (space[:, 0] - xs[i]) / (xs[i + 1] - xs[i])
+            index = np.column_stack([order[i], order[i + 1]])
+            weights = np.column_stack([1 - w, w])
+            inside = (space[:, 0] >= xs[0]) & (space[:, 0] <= xs[-1])
+        else:
+            from utils.fem_field import FemField
+            field = FemField(self.nodes, self.connectivity)
+            element, bary = field.locate(space)
+            inside = element >= 0
+            index = self.connectivity[np.maximum(element, 0)]
+            if self.connectivity.shape[1] == 6:
+                weights, _ = p2_shape_functions(np.where(inside[:, None], bary, 1 / 3))
+            else:
+                weights = np.where(inside[:, None], bary, 0.0)
+
+        k = np.clip(np.searchsorted(self.times, t, side="right") - 1, 0, len(self.times) - 2)
+        wt = ((t - self.times[k]) / (self.times[k + 1] - self.times[k]))[:, None]
+        values = np.sum(weights * ((1 - wt) * self.snapshots[k[:, None], index]
+                                   + wt * self.snapshots[k[:, None] + 1, index]), axis=1)
+        inside &= (t >= self.times[0]) & (t <= self.times[-1] + 1e-12)
+        values[~inside] = np.nan
+        return values[:, None]
+
+def line_reference(kind, cfg, diffusivity, output=None):
+    """
+    Ground truth FEM para heat_1d / wave_1d: malha uniforme de [0, Lx] com cfg["fem_nx"]
+    elementos, Dirichlet nulo nas pontas, u(x, 0) = sin(pi x / Lx) (e du/dt = 0 na onda),
+    integrada até T_eval com passo cfg["fem_dt"]. Retorna a função u_true(X).
+    """
+    Lx, T_train = cfg["Lx"], cfg["T_train"]
+    T_end = cfg.get("T_eval", 1.5 * T_train)
+    nx = cfg.get("fem_nx", 200)
+    numSteps = int(np.ceil(T_end / cfg.get("fem_dt", T_end / 1000)))
+    nodes, elements = LineBatch.uniform(Lx, nx)
+    boundaryConditions = {"Left": {"nodes": [0], "potential": 0.0},
+                          "Right": {"nodes": [nx], "potential": 0.0}}
+    solver = TransientSolver(nodes, elements, LineBatch(nodes, elements), boundaryConditions, kind,
+                             diffusivity=diffusivity, solverConfig=cfg.get("fem_solver"))
+    solver.run(lambda x: np.sin(np.pi * x / Lx), T_end / numSteps, numSteps, output=output)
+    return solver.evaluate
@@ -0,0 +1,62 @@
+import numpy as np
+import meshio
+
+from solver import ElectrostaticSolver, MagnetostaticSolver, MagnetodynamicSolver, batch_class
+from utils.benchmark_assembly import structured_mesh
+
+def perturbed_mesh(n=5, seed=0):
+    """Malha estruturada com nós internos deslocados (elementos de formas diferentes)."""
+    nodes, triElements = structured_mesh(n)
+    interior = (nodes > 0).all(axis=1) & (nodes < 1).all(axis=1)
+    rng = np.random.default_rng(seed)
+    nodes[interior] += rng.uniform(-0.2, 0.2, (interior.sum(), 2)) / n
+    return nodes, triElements
+
+def quadratic_mesh(n=3):
+    """Malha P2 (triangle6, ordem do gmsh) a partir da P1: um nó no meio de cada aresta."""
+    nodes, triElements = structured_mesh(n)
+    edges = np.sort(triElements[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 3, 2), axis=2)
+    unique, inverse = np.unique(edges.reshape(-1, 2), axis=0, return_inverse=True)
+    midpoints = nodes[unique].mean(axis=1)
+    mid = len(nodes) + inverse.reshape(-1, 3)
+    return np.vstack([nodes, midpoints]), np.hstack([triElements, mid])
+
+def write_square_mesh(filename, n=3):
+    """Quadrado unitário em .msh (gmsh 2.2): superfície "Domain" (tag 1) e linha "Left" (tag 2)."""
+    nodes, triElements = structured_mesh(n)
+    left = np.flatnonzero(nodes[:, 0] == 0)
+    left = left[np.argsort(nodes[left, 1])]
+    lines = np.column_stack([left[:-1], left[1:]])
+    mesh = meshio.Mesh(np.column_stack([nodes, np.zeros(len(nodes))]), [("line", lines), ("triangle", triElements)],
+                       cell_data={"gmsh:physical": [np.full(len(lines), 2), np.full(len(triElements), 1)],
+                                  "gmsh:geometrical": [np.full(len(lines), 1), np.full(len(triElements), 1)]},
+                       field_data={"Domain": np.array([1, 2]), "Left": np.array([2, 1])})
+    mesh.write(str(filename), file_format="gmsh22", binary=False)
+    return nodes, triElements
+
+def side_conditions(nodes, left=1.0, right=0.0):
+    """Dirichlet nos lados x=0 e x=1 do quadrado unitário."""
+    return {"Left": {"nodes": np.flatnonzero(np.isclose(nodes[:, 0], 0.0)), "potential": left},
+            "Right": {"nodes": np.flatnonzero(np.isclose(nodes[:, 0], 1.0)), "potential": right}}
+
+def make_solver(kind, nodes, triElements, boundaryConditions=None, **solverConfig):
+    """Solver com materiais e fontes aleatórios (mas reprodutíveis) por elemento."""
+    rng = np.random.default_rng(1)
+    E = len(triElements)
+    boundaryConditions = boundaryConditions or {}
+    batch = batch_class(kind, 1)(nodes, triElements)
+    if kind == "electrostatic":
+        batch.setProperties(rng.uniform(1, 5, E), rng.uniform(-1, 1, E))
+        return ElectrostaticSolver(nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions,
+                                   solverConfig=solverConfig)
+    if kind == "magnetostatic":
+        batch.setProperties(1.0 / rng.uniform(1, 1000, E), rng.uniform(-1, 1, E))
+        return MagnetostaticSolver(nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions,
+                                   solverConfig=solverConfig)
+    batch.setProperties(rng.uniform(1, 1000, E), rng.uniform(-1, 1, E), rng.uniform(0, 5.8e7, E))
+    return MagnetodynamicSolver(nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions, 60.0,
+                                solverConfig=solverConfig)
+
+def assembled(solver, method="assemble_global_matrix_and_vector"):
+    getattr(solver, method)()
+    return solver.globalMatrix.toarray(), np.array(solver.globalVector)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from adaptivity import refine_mesh, mark_elements
+from fem_cases import perturbed_mesh
+
+def signed_areas(nodes, triElements):
+    p = nodes[triElements]
+    e1, e2 = p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]
+    return 0.5 * (e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0])
+
+def test_refined_mesh_is_conforming_and_preserves_area():
+    nodes, triElements = perturbed_mesh(6)
+    marked = np.zeros(len(triElements), dtype=bool)
+    marked[::7] = True
+    left = np.flatnonzero(np.isclose(nodes[:, 0], 0.0))
+    newNodes, newElements, parent, boundary = refine_mesh(nodes, triElements, marked, {"Left": left})
+
+    assert len(newElements) > len(triElements) + marked.sum()
+    # Orientação positiva e área total/por pai preservadas
+    area, parentArea = signed_areas(newNodes, newElements), signed_areas(nodes, triElements)
+    assert (parentArea > 0).all() and (area > 0).all()
+    np.testing.assert_allclose(area.sum(), 1.0, rtol=1e-12)
+    np.testing.assert_allclose(np.bincount(parent, weights=area), parentArea, rtol=1e-12)
+
+    # Conformidade: sem nós pendentes, arestas com 1 elemento só no contorno do quadrado
+    edges = np.sort(newElements[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    unique, counts = np.unique(edges, axis=0, return_counts=True)
+    assert counts.max() == 2
+    mid = newNodes[unique[counts == 1]].mean(axis=1)
+    assert np.any(np.isclose(mid, 0.0) | np.isclose(mid, 1.0), axis=1).all()
+
+    # Pontos médios no lado x=0 entram no grupo de contorno
+    np.testing.assert_array_equal(np.sort(boundary["Left"]),
+                                  np.flatnonzero(np.isclose(newNodes[:, 0], 0.0)))
+
+def test_dorfler_marking_is_minimal():
+    eta = np.array([0.1, 3.0, 0.5, 2.0, 0.2])
+    marked = mark_elements(eta, theta=0.5)
+    np.testing.assert_array_equal(marked, [False, True, False, False, False])
+    assert mark_elements(eta, theta=1.0).all()
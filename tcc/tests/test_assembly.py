@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+from fem_cases import perturbed_mesh, make_solver, assembled
+
+@pytest.mark.parametrize("kind", ["electrostatic", "magnetostatic", "magnetodynamic"])
+def test_vectorized_assembly_matches_reference(kind):
+    nodes, triElements = perturbed_mesh()
+    K, F = assembled(make_solver(kind, nodes, triElements))
+    K_ref, F_ref = assembled(make_solver(kind, nodes, triElements), "assemble_global_matrix_and_vector_reference")
+    scale = np.abs(K_ref).max()
+    np.testing.assert_allclose(K, K_ref, rtol=1e-12, atol=1e-12 * scale)
+    np.testing.assert_allclose(F, F_ref, rtol=1e-12, atol=1e-14)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from linear_solvers import FACTORIZATION_CACHE
+from fem_cases import perturbed_mesh, make_solver, side_conditions
+
+def setup_function():
+    FACTORIZATION_CACHE.clear()
+
+def solved(method, **solverConfig):
+    nodes, triElements = perturbed_mesh(8)
+    solver = make_solver("electrostatic", nodes, triElements, side_conditions(nodes),
+                         method=method, factorization_cache=0, **solverConfig)
+    solver.apply_boundary_conditions()
+    solver.assemble_global_matrix_and_vector()
+    solver.solve()
+    return solver
+
+def test_schur_matches_direct():
+    direct = solved("direct")
+    schur = solved("schur", subdomains=2)
+    try:
+        assert schur.solveInfo["converged"] and schur.solveInfo["subdomains"] == 2
+        np.testing.assert_allclose(schur.potential, direct.potential, rtol=1e-6, atol=1e-8)
+    finally:
+        schur.close()
+
+def test_schur_warns_when_interface_cg_does_not_converge():
+    with pytest.warns(UserWarning, match="não convergiu"):
+        schur = solved("schur", subdomains=2, maxiter=1, tol=1e-14)
+    try:
+        assert not schur.solveInfo["converged"]
+        assert schur.solveInfo["status"] > 0
+    finally:
+        schur.close()
@@ -0,0 +1,74 @@
+import numpy as np
+
+from linear_solvers import FACTORIZATION_CACHE, FactorizationCache
+from solver import ElectrostaticBatch, ElectrostaticSolver
+from utils.benchmark_assembly import structured_mesh
+
+def make_solver(n=6, **solverConfig):
+    nodes, triElements = structured_mesh(n)
+    left, right = np.flatnonzero(nodes[:, 0] == 0), np.flatnonzero(nodes[:, 0] == 1)
+    boundaryConditions = {"Left": {"nodes": left, "potential": 1.0},
+                          "Right": {"nodes": right, "potential": 0.0}}
+    solver = ElectrostaticSolver(nodes, np.arange(len(nodes)), triElements,
+                                 ElectrostaticBatch(nodes, triElements), boundaryConditions,
+                                 solverConfig=solverConfig)
+    solver.apply_boundary_conditions()
+    solver.assemble_global_matrix_and_vector()
+    return solver
+
+def setup_function():
+    FACTORIZATION_CACHE.clear()
+
+def test_repeated_solve_reuses_factorization():
+    solver = make_solver()
+    solver.solve()
+    solver.solve()
+    assert solver.solveInfo["cached"]
+    assert len(FACTORIZATION_CACHE) == 1
+
+def test_cache_disabled():
+    solver = make_solver(factorization_cache=0)
+    solver.solve()
+    solver.solve()
+    assert not solver.solveInfo["cached"]
+    assert len(FACTORIZATION_CACHE) == 0
+
+def test_penalty_factor_is_part_of_key():
+    a = make_solver(dirichlet="penalty", penalty_factor=1e8)
+    b = make_solver(dirichlet="penalty", penalty_factor=1e10)
+    a.apply_boundary_conditions()
+    b.apply_boundary_conditions()
+    assert a.factorization_key() != b.factorization_key()
+
+def test_close_evicts_solver_entries():
+    a, b = make_solver(4), make_solver(5)
+    a.solve()
+    b.solve()
+    assert len(FACTORIZATION_CACHE) == 2
+    a.close()
+    assert len(FACTORIZATION_CACHE) == 1
+    b.solve()
+    assert b.solveInfo["cached"]
+
+def test_evicted_factors_are_closed():
+    class Factor:
+        closed = False
+        def close(self):
+            self.closed = True
+    cache = FactorizationCache(maxsize=1)
+    first, second = Factor(), Factor()
+    cache.put("a", first)
+    cache.put("b", second)
+    assert first.closed and not second.closed
+    cache.clear()
+    assert second.closed
+
+def test_solve_phase_accumulates_over_calls():
+    solver = make_solver()
+    solver.solve()
+    first = dict(solver.profiler.phases["solve"])
+    solver.solve()
+    solve = solver.profiler.phases["solve"]
+    assert solve["calls"] == 2 and solve["cached_calls"] == 1
+    assert solve["factorization_time"] >= first["factorization_time"]
+    assert solve["substitution_time"] > first["substitution_time"]
@@ -0,0 +1,40 @@
+import os
+import numpy as np
+
+from utils.fem_field import FemField, index_path
+from fem_cases import perturbed_mesh, quadratic_mesh
+
+def sample_points(n=500, seed=2):
+    return np.random.default_rng(seed).uniform(0, 1, (n, 2))
+
+def test_linear_field_is_interpolated_exactly():
+    nodes, triElements = perturbed_mesh(6)
+    field = FemField(nodes, triElements, 2 * nodes[:, 0] - 3 * nodes[:, 1] + 0.5)
+    points = sample_points()
+    np.testing.assert_allclose(field(points), 2 * points[:, 0] - 3 * points[:, 1] + 0.5, atol=1e-12)
+
+def test_quadratic_field_is_interpolated_exactly_with_p2():
+    nodes, triElements = quadratic_mesh(4)
+    u = lambda p: p[:, 0] ** 2 + p[:, 0] * p[:, 1] - p[:, 1] ** 2
+    points = sample_points()
+    np.testing.assert_allclose(FemField(nodes, triElements, u(nodes))(points), u(points), atol=1e-12)
+
+def test_points_outside_mesh_and_in_holes_are_nan():
+    nodes, triElements = perturbed_mesh(8)
+    # Furo: remove os triângulos com centroide em [0.375, 0.625]^2
+    centroid = nodes[triElements].mean(axis=1)
+    hole = np.all((centroid > 0.375) & (centroid < 0.625), axis=1)
+    field = FemField(nodes, triElements[~hole], np.ones(len(nodes)))
+    values = field(np.array([[0.5, 0.5], [1.5, 0.5], [-0.1, 0.2], [0.1, 0.1]]))
+    assert np.isnan(values[:3]).all()
+    assert values[3] == 1.0
+
+def test_locator_is_saved_next_to_mesh(tmp_path):
+    nodes, triElements = perturbed_mesh(6)
+    mesh_file = str(tmp_path / "square.msh")
+    first = FemField(nodes, triElements, nodes[:, 0], mesh_file=mesh_file)
+    assert os.path.exists(index_path(mesh_file))
+    second = FemField(nodes, triElements, nodes[:, 0], mesh_file=mesh_file)
+    np.testing.assert_array_equal(second.cellTriangles, first.cellTriangles)
+    points = sample_points()
+    np.testing.assert_allclose(second(points), points[:, 0], atol=1e-12)
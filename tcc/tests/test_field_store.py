@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from utils.field_store import FieldStore, open_fields, write_fields
+from fem_cases import perturbed_mesh, make_solver, side_conditions
+
+@pytest.mark.parametrize("kind", ["electrostatic", "magnetodynamic"])
+def test_save_fields_roundtrip(kind, tmp_path):
+    nodes, triElements = perturbed_mesh(5)
+    solver = make_solver(kind, nodes, triElements, side_conditions(nodes))
+    solver.apply_boundary_conditions()
+    solver.assemble_global_matrix_and_vector()
+    solver.solve()
+    solver.save_fields(str(tmp_path), metadata={"run": "teste"})
+
+    assert FieldStore.exists(str(tmp_path))
+    store = open_fields(str(tmp_path))
+    assert store.header["metadata"]["solver"] == type(solver).__name__
+    assert store.header["metadata"]["run"] == "teste"
+    np.testing.assert_array_equal(store.nodes, nodes)
+    np.testing.assert_array_equal(store.triElements, triElements)
+    fields = {"potential": solver.potential, **solver.excitation_fields(solver.potential)}
+    assert store.names == list(fields)
+    for name, values in fields.items():
+        stored = store[name]
+        assert isinstance(stored, np.memmap)
+        assert stored.dtype == values.dtype and stored.shape == values.shape
+        assert store.location(name) == ("node" if name == "potential" else "element")
+        np.testing.assert_array_equal(stored, values)
+    assert store["potential"].dtype == (np.complex128 if kind == "magnetodynamic" else np.float64)
+
+def test_stacked_and_mismatched_fields(tmp_path):
+    nodes, triElements = perturbed_mesh(3)
+    stacked = np.arange(len(nodes) * 4, dtype=np.float32).reshape(-1, 4)
+    write_fields(str(tmp_path), nodes, triElements, {"u": stacked, "empty": np.empty((len(nodes), 0))})
+    store = open_fields(str(tmp_path))
+    assert store["u"].dtype == np.float32 and store["u"].shape == (len(nodes), 4)
+    np.testing.assert_array_equal(store["u"], stacked)
+    assert store["empty"].shape == (len(nodes), 0)
+    with pytest.raises(KeyError):
+        store["v"]
+    with pytest.raises(ValueError):
+        write_fields(str(tmp_path / "bad"), nodes, triElements, {"u": np.zeros(len(nodes) + 1)})
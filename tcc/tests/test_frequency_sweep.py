@@ -0,0 +1,19 @@
+import numpy as np
+
+from fem_cases import perturbed_mesh, make_solver, side_conditions
+
+def test_frequency_sweep_matches_single_solves():
+    nodes, triElements = perturbed_mesh(6)
+    frequencies = [10.0, 60.0, 400.0]
+    solver = make_solver("magnetodynamic", nodes, triElements, side_conditions(nodes))
+    serial = solver.frequency_sweep(frequencies, workers=1)
+    parallel = solver.frequency_sweep(frequencies, workers=2)
+    np.testing.assert_allclose(parallel["potential"], serial["potential"], rtol=1e-10, atol=1e-14)
+
+    for k, frequency in enumerate(frequencies):
+        single = make_solver("magnetodynamic", nodes, triElements, side_conditions(nodes))
+        single.frequency = frequency
+        single.apply_boundary_conditions()
+        single.assemble_global_matrix_and_vector()
+        single.solve()
+        np.testing.assert_allclose(serial["potential"][k], single.potential, rtol=1e-8, atol=1e-12)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from solver import MagnetodynamicBatch, MagnetodynamicSolver, MagnetostaticBatch
+from utils.benchmark_assembly import structured_mesh
+from utils.mesh_loader import material_arrays
+
+MU0 = 4 * np.pi * 1e-7
+REGIONS = {1: "Air", 2: "Iron"}
+
+def two_region_mesh(n=4):
+    """Quadrado unitário: metade esquerda 'Air' (tag 1), metade direita 'Iron' (tag 2)."""
+    nodes, triElements = structured_mesh(n)
+    tags = np.where(nodes[triElements, 0].mean(axis=1) < 0.5, 1, 2)
+    return nodes, triElements, tags
+
+def magnetodynamic_batch(nodes, triElements, tags, mu_iron):
+    # Mesmo caminho de problems/magnetodynamic_mesh.py
+    props = material_arrays(tags, REGIONS, {"Iron": {"mu": mu_iron, "sigma": 5.8e7}},
+                            {"mu": 1.0, "sigma": 0.0, "J": 0.0})
+    batch = MagnetodynamicBatch(nodes, triElements)
+    batch.setProperties(props["mu"], props["J"], props["sigma"])
+    return batch
+
+def test_magnetodynamic_vacuum_reluctivity():
+    nodes, triElements, tags = two_region_mesh()
+    batch = magnetodynamic_batch(nodes, triElements, tags, 1.0)
+    np.testing.assert_allclose(batch.nu * batch.nu0, 1.0 / MU0)
+
+def test_doubling_mu_r_halves_region_stiffness():
+    nodes, triElements, tags = two_region_mesh()
+    iron = tags == 2
+    soft = magnetodynamic_batch(nodes, triElements, tags, 1000.0)
+    softer = magnetodynamic_batch(nodes, triElements, tags, 2000.0)
+    np.testing.assert_allclose(softer.S[iron], 0.5 * soft.S[iron])
+    np.testing.assert_allclose(softer.S[~iron], soft.S[~iron])
+
+    # Energia da matriz global (parte real = rigidez) diminui com mu_r maior
+    def energy(batch):
+        solver = MagnetodynamicSolver(nodes, np.arange(len(nodes)), triElements, batch, {}, 60.0)
+        solver.assemble_global_matrix_and_vector()
+        x = nodes[:, 0] ** 2 + nodes[:, 1]
+        return np.real(x @ (solver.globalMatrix @ x))
+    assert energy(softer) < energy(soft)
+
+def test_magnetostatic_and_magnetodynamic_agree():
+    # Magnetostático recebe 1/mu_r, magnetodinâmico recebe mu_r: mesma razão entre regiões
+    nodes, triElements, tags = two_region_mesh()
+    mu = material_arrays(tags, REGIONS, {"Iron": {"mu": 500.0}}, {"mu": 1.0})["mu"]
+    static = MagnetostaticBatch(nodes, triElements)
+    static.setProperties(1.0 / mu, 0.0)
+    dynamic = MagnetodynamicBatch(nodes, triElements)
+    dynamic.setProperties(mu, 0.0, 0.0)
+    ratio = static.S / np.where(dynamic.S == 0, 1.0, dynamic.S)
+    np.testing.assert_allclose(ratio[dynamic.S != 0], ratio[dynamic.S != 0].flat[0])
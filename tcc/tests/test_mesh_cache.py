@@ -0,0 +1,54 @@
+import os
+import numpy as np
+
+from utils import mesh_cache
+from utils.mesh_cache import CachedMesh, load_mesh
+from fem_cases import write_square_mesh
+
+def test_cached_mesh_roundtrip(tmp_path):
+    filename = tmp_path / "square.msh"
+    nodes, triElements = write_square_mesh(filename)
+    mesh = CachedMesh.from_file(str(filename))
+    mesh.save(str(tmp_path / "cache" / mesh.digest))
+    loaded = CachedMesh.load(str(tmp_path / "cache" / mesh.digest))
+
+    assert loaded.digest == mesh.digest and loaded.order == 1
+    assert loaded.boundary_names == ["Left"] and loaded.region_names == {1: "Domain"}
+    for name in CachedMesh.ARRAYS:
+        original, cached = getattr(mesh, name), getattr(loaded, name)
+        assert isinstance(cached, np.memmap) and cached.dtype == original.dtype
+        np.testing.assert_array_equal(cached, original)
+    np.testing.assert_array_equal(loaded.points[:, :2], nodes)
+    np.testing.assert_array_equal(loaded.triangles, triElements)
+    np.testing.assert_array_equal(loaded.boundary_nodes["Left"], np.flatnonzero(nodes[:, 0] == 0))
+
+def test_load_mesh_is_addressed_by_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(mesh_cache, "_MESHES", {})
+    cache_dir = str(tmp_path / "cache")
+    first, second = tmp_path / "a.msh", tmp_path / "b.msh"
+    write_square_mesh(first)
+    write_square_mesh(second)
+    mesh = load_mesh(str(first), cache_dir)
+    # Mesmo conteúdo com outro nome: mesma entrada do cache
+    assert load_mesh(str(second), cache_dir) is mesh
+    assert os.listdir(cache_dir) == [mesh.digest]
+
+    # Conteúdo novo: novo sha e nova pasta; o cache em disco é relido com memmap
+    write_square_mesh(first, n=4)
+    changed = load_mesh(str(first), cache_dir)
+    assert changed.digest != mesh.digest and len(changed.triangles) == 32
+    monkeypatch.setattr(mesh_cache, "_MESHES", {})
+    reloaded = load_mesh(str(second), cache_dir)
+    assert reloaded is not mesh and isinstance(reloaded.points, np.memmap)
+
+def test_corrupt_cache_is_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.setattr(mesh_cache, "_MESHES", {})
+    filename = tmp_path / "square.msh"
+    write_square_mesh(filename)
+    digest = mesh_cache.file_digest(str(filename))
+    directory = tmp_path / "cache" / digest
+    directory.mkdir(parents=True)
+    (directory / "meta.json").write_text("{")
+    mesh = load_mesh(str(filename), str(tmp_path / "cache"))
+    assert len(mesh.triangles) == 18
+    assert (directory / "points.npy").exists()
@@ -0,0 +1,56 @@
+import os
+import pytest
+
+from utils import mesh_cache
+from utils.mesh_catalog import MeshCatalog, CATALOG_FILE
+from fem_cases import write_square_mesh
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """Catálogo em tmp_path/meshes que conta as entradas recalculadas (_build)."""
+    monkeypatch.setattr(mesh_cache, "DEFAULT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(mesh_cache, "_MESHES", {})
+    builds = []
+    build = MeshCatalog._build
+    def counting_build(path, stat):
+        builds.append(os.path.basename(path))
+        return build(path, stat)
+    monkeypatch.setattr(MeshCatalog, "_build", staticmethod(counting_build))
+    mesh_dir = tmp_path / "meshes"
+    mesh_dir.mkdir()
+    write_square_mesh(mesh_dir / "square.msh")
+    return MeshCatalog(str(mesh_dir)), builds
+
+def test_entries_are_persisted_and_reused(catalog):
+    catalog, builds = catalog
+    entry, = catalog.list()
+    assert (entry["num_nodes"], entry["num_elements"], entry["order"]) == (16, 18, 1)
+    assert entry["boundaries"] == ["Left"] and entry["bbox"] == [0.0, 0.0, 1.0, 1.0]
+    assert entry["quality"]["min"] > 0.8
+    # Outra instância lê o .catalog.json sem reler a malha
+    again = MeshCatalog(catalog.mesh_dir)
+    assert again.list() == [entry] and builds == ["square.msh"]
+    assert os.path.exists(os.path.join(catalog.mesh_dir, CATALOG_FILE))
+
+def test_touch_keeps_entry_and_new_content_rebuilds(catalog):
+    catalog, builds = catalog
+    mtime = catalog.list()[0]["mtime_ns"] + 10 ** 9
+    path = os.path.join(catalog.mesh_dir, "square.msh")
+    # Só o mtime muda: o SHA-256 confirma o conteúdo e a entrada é mantida
+    os.utime(path, ns=(mtime, mtime))
+    assert catalog.get("square.msh")["mtime_ns"] == mtime and len(builds) == 1
+    write_square_mesh(path, n=4)
+    assert catalog.get("square.msh")["num_elements"] == 32 and len(builds) == 2
+
+def test_unreadable_mesh_gets_cached_error_entry(catalog):
+    catalog, builds = catalog
+    with open(os.path.join(catalog.mesh_dir, "broken.msh"), "w") as f:
+        f.write("não é uma malha\n")
+    entries = {entry["filename"]: entry for entry in catalog.list()}
+    assert "error" in entries["broken.msh"] and "error" not in entries["square.msh"]
+    catalog.list()
+    assert sorted(builds) == ["broken.msh", "square.msh"]
+    os.remove(os.path.join(catalog.mesh_dir, "broken.msh"))
+    assert [entry["filename"] for entry in catalog.list()] == ["square.msh"]
+    with pytest.raises(FileNotFoundError):
+        catalog.get("broken.msh")
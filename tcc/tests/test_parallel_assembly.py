@@ -0,0 +1,11 @@
+import numpy as np
+import pytest
+
+from fem_cases import perturbed_mesh, make_solver, assembled
+
+@pytest.mark.parametrize("kind", ["electrostatic", "magnetodynamic"])
+def test_parallel_assembly_matches_serial(kind):
+    nodes, triElements = perturbed_mesh(8)
+    K, _ = assembled(make_solver(kind, nodes, triElements))
+    K_par, _ = assembled(make_solver(kind, nodes, triElements, assembly_workers=2, assembly_chunk_size=30))
+    np.testing.assert_allclose(K_par, K, rtol=1e-12, atol=1e-12 * np.abs(K).max())
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from solver import batch_class
+from fem_cases import quadratic_mesh
+
+def test_quadratic_elements_integrate_quadratics_exactly():
+    # u = x^2 + xy no quadrado unitário: int |grad u|^2 = 3, int u^2 = 101/180, área = 1
+    nodes, triElements = quadratic_mesh()
+    batch = batch_class("electrostatic", 2)(nodes, triElements)
+    ones = np.ones(len(triElements))
+    pattern = batch.sparsity_pattern(len(nodes))
+    u = nodes[:, 0] ** 2 + nodes[:, 0] * nodes[:, 1]
+    K, M = pattern.assemble(batch.stiffness(ones)), pattern.assemble(batch.mass(ones))
+    assert u @ K @ u == pytest.approx(3.0, rel=1e-12)
+    assert u @ M @ u == pytest.approx(101 / 180, rel=1e-12)
+    assert batch.load(ones).sum() == pytest.approx(1.0, rel=1e-12)
+    np.testing.assert_allclose(K @ np.ones(len(nodes)), 0.0, atol=1e-12)
@@ -0,0 +1,14 @@
+import numpy as np
+
+from fem_cases import perturbed_mesh
+from solver import assemble_global_matrix, batch_class
+
+def test_sparsity_pattern_reuse_after_material_change():
+    nodes, triElements = perturbed_mesh()
+    batch = batch_class("electrostatic", 1)(nodes, triElements)
+    pattern = batch.sparsity_pattern(len(nodes))
+    assert batch.sparsity_pattern(len(nodes)) is pattern
+    for eps in (1.0, np.linspace(1, 10, len(triElements))):
+        batch.setProperties(eps, 0.0)
+        expected = assemble_global_matrix(triElements, batch.C, len(nodes)).toarray()
+        np.testing.assert_allclose(pattern.assemble(batch.C).toarray(), expected)
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from solver import line_reference
+
+CFG = {"Lx": 1.0, "T_train": 0.2, "T_eval": 0.3}
+
+def analytic(kind, diffusivity, x, t):
+    """Modo sin(pi x): decai com exp(-alpha pi^2 t) no calor e oscila com cos(c pi t) na onda."""
+    if kind == "heat":
+        return np.sin(np.pi * x) * np.exp(-diffusivity * np.pi ** 2 * t)
+    return np.sin(np.pi * x) * np.cos(np.sqrt(diffusivity) * np.pi * t)
+
+@pytest.mark.parametrize("kind, diffusivity", [("heat", 0.1), ("wave", 1.0)])
+def test_line_reference_matches_analytic_solution(kind, diffusivity, tmp_path):
+    output = tmp_path / f"{kind}.npy"
+    u_true = line_reference(kind, CFG, diffusivity, output=str(output))
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 1, 400), rng.uniform(0, CFG["T_eval"], 400)])
+    # Erro dominado pela interpolação linear entre nós (h = 1/200): ~3e-5
+    np.testing.assert_allclose(u_true(X)[:, 0], analytic(kind, diffusivity, X[:, 0], X[:, 1]), atol=1e-4)
+    snapshots = np.load(output, mmap_mode="r")
+    assert snapshots.shape == (1001, 201)
+    assert np.load(tmp_path / f"{kind}_times.npy")[-1] == pytest.approx(CFG["T_eval"])
+
+def test_points_outside_simulated_interval_are_nan():
+    u_true = line_reference("heat", CFG, 0.1)
+    values = u_true(np.array([[0.5, CFG["T_eval"] + 0.01], [0.5, -0.01], [1.2, 0.1], [0.5, 0.1]]))
+    assert np.isnan(values[:3]).all()
+    assert np.isfinite(values[3]).all()
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Adicionar raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver import (SparsityPattern, ElectrostaticBatch, assemble_parallel)
+
+def structured_mesh(n):
+    """Malha estruturada do quadrado unitário: (n+1)^2 nós e 2*n^2 triângulos."""
+    xs = np.linspace(0.0, 1.0, n + 1)
+    X, Y = np.meshgrid(xs, xs)
+    nodes = np.column_stack([X.ravel(), Y.ravel()])
+    ids = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+    p0, p1 = ids[:-1, :-1].ravel(), ids[:-1, 1:].ravel()
+    p2, p3 = ids[1:, :-1].ravel(), ids[1:, 1:].ravel()
+    triElements = np.concatenate([np.column_stack([p0, p1, p3]), np.column_stack([p0, p3, p2])])
+    return nodes, triElements
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+def benchmark_assembly(n=700, workers=(1, 2, 4, 8), chunk_size=100000, repeat=3):
+    print("=" * 50)
+    print("BENCHMARK: MONTAGEM SERIAL x PARALELA")
+    print("=" * 50)
+    nodes, triElements = structured_mesh(n)
+    coef = 1.0 + np.random.default_rng(0).random(len(triElements))
+    print(f"Malha: {len(nodes)} nós, {len(triElements)} triângulos, chunk={chunk_size}")
+
+    pattern = SparsityPattern(triElements, len(nodes))
+
+    def serial():
+        # Caminho serial completo: geometria + matrizes locais + soma no CSR
+        batch = ElectrostaticBatch(nodes, triElements)
+        return pattern.assemble(batch.stiffness(coef))
+
+    t_serial, reference = best_of(serial, repeat)
+    print(f"{'workers':>8} {'tempo [s]':>10} {'speedup':>8} {'erro max':>10}")
+    print(f"{'serial':>8} {t_serial:10.3f} {1.0:8.2f} {0.0:10.1e}")
+
+    results = {"serial": t_serial}
+    for w in workers:
+        t, matrix = best_of(lambda: assemble_parallel(nodes, triElements, coef, pattern=pattern,
+                                                      workers=w, chunkSize=chunk_size), repeat)
+        error = abs(matrix - reference).max()
+        print(f"{w:>8} {t:10.3f} {t_serial / t:8.2f} {error:10.1e}")
+        results[w] = t
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=700, help="Divisões por lado (2*n^2 triângulos)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark_assembly(args.n, args.workers, args.chunk_size, args.repeat)
@@ -0,0 +1,185 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# Adicionar raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solver import ElectrostaticSolver, MagnetostaticSolver, MagnetodynamicSolver, batch_class
+from utils.mesh_cache import load_mesh
+from utils.benchmark_assembly import structured_mesh
+from utils.profiler import FemProfiler
+
+SOLVERS = {
+    "electrostatic": ElectrostaticSolver,
+    "magnetostatic": MagnetostaticSolver,
+    "magnetodynamic": MagnetodynamicSolver,
+}
+
+# Materiais homogêneos de referência (mesmas convenções de setProperties dos problemas)
+MATERIALS = {
+    "electrostatic": (1.0, 0.0),          # eps relativo, rho
+    "magnetostatic": (1.0, 1.0),          # nu relativo, J
+    "magnetodynamic": (1.0, 1.0, 5.8e7),  # mu relativo, J, sigma
+}
+FREQUENCY = 60.0
+DEFAULT_LADDER = [0.08, 0.04, 0.02, 0.01]
+
+def generate_mesh(geometry, lc, order, mesh_dir):
+    """Gera (ou reutiliza) a malha da escada; 'synthetic' dispensa o gmsh."""
+    if geometry == "synthetic":
+        return None
+    filename = os.path.join(mesh_dir, f"{geometry}_lc{lc:g}_p{order}.msh")
+    if not os.path.exists(filename):
+        if geometry == "stator":
+            from utils.generate_stator import generate_stator_mesh
+            generate_stator_mesh(filename, order=order, lc=lc)
+        elif geometry == "plate_holes":
+            from utils.generate_plate_holes import generate_plate_holes
+            generate_plate_holes(filename, order=order, lc=lc, seed=0)
+        else:
+            raise ValueError(f"Geometria '{geometry}' não suportada.")
+    return filename
+
+def load_case(geometry, lc, mesh_file):
+    """Nós, conectividade, ordem e grupos de contorno (o primeiro grupo recebe 1, os demais 0)."""
+    if mesh_file is None:
+        n = max(1, int(round(1.0 / lc)))
+        nodes, triElements = structured_mesh(n)
+        groups = {"Left": np.flatnonzero(nodes[:, 0] == 0.0), "Right": np.flatnonzero(nodes[:, 0] == 1.0)}
+        return nodes, triElements, 1, groups
+    mesh = load_mesh(mesh_file)
+    groups = {name: np.asarray(nodes, dtype=np.int64) for name, nodes in sorted(mesh.boundary_nodes.items())}
+    return np.asarray(mesh.points[:, :2]), np.asarray(mesh.triangles), mesh.order, groups
+
+def run_case(kind, geometry, lc, mesh_file, solverConfig):
+    """Monta e resolve um caso; retorna a linha da tabela com o perfil por fase."""
+    nodes, triElements, order, groups = load_case(geometry, lc, mesh_file)
+    boundaryConditions = {name: {'nodes': groupNodes, 'potential': 1.0 if k == 0 else 0.0}
+                          for k, (name, groupNodes) in enumerate(groups.items())}
+
+    batch = batch_class(kind, order)(nodes, triElements)
+    batch.setProperties(*MATERIALS[kind])
+    args = (FREQUENCY,) if kind == "magnetodynamic" else ()
+    solver = SOLVERS[kind](nodes, np.arange(len(nodes)), triElements, batch, boundaryConditions,
+                           *args, solverConfig=solverConfig)
+    solver.apply_boundary_conditions()
+    solver.assemble_global_matrix_and_vector()
+    solver.solve()
+    if kind == "electrostatic":
+        solver.calculate_electric_field()
+    else:
+        solver.calculate_magnetic_field()
+
+    profile = solver.profiler.to_dict()
+    # Cada degrau da escada é uma malha nova: a fatoração não será reusada
+    solver.close()
+    row = {"geometry": geometry, "lc": lc, "solver": kind, "order": order}
+    for key in ("dofs", "free_dofs", "elements", "nnz", "nnz_factor", "total_time", "peak_rss_mb"):
+        row[key] = profile.get(key)
+    for phase in FemProfiler.PHASES:
+        row[f"{phase}_time"] = profile["phases"].get(phase, {}).get("wall_time")
+    row["factorization_time"] = profile["phases"]["solve"].get("factorization_time")
+    return row, profile
+
+def run_isolated(*args):
+    """Roda o caso num processo novo (spawn), para que o pico de RSS seja só do caso."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_case, *args).result()
+
+def write_tables(rows, profiles, out_dir):
+    with open(os.path.join(out_dir, "benchmark.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(out_dir, "benchmark.json"), "w") as f:
+        json.dump({"rows": rows, "profiles": profiles}, f, indent=4)
+
+def plot_scaling(rows, out_dir):
+    """Gráficos log-log: tempo por fase x DOFs (um por solver) e pico de RSS x DOFs."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("⚠️ matplotlib não instalado; gráficos de escalabilidade não gerados.")
+        return
+
+    for kind in sorted({row["solver"] for row in rows}):
+        data = sorted((row for row in rows if row["solver"] == kind), key=lambda row: row["dofs"])
+        dofs = np.array([row["dofs"] for row in data], dtype=float)
+        fig, ax = plt.subplots(figsize=(7, 5))
+        for phase in FemProfiler.PHASES + ("total",):
+            times = np.array([row[f"{phase}_time"] or np.nan for row in data], dtype=float)
+            ax.loglog(dofs, times, marker="o", label=phase)
+        # Referências O(N) e O(N^1.5)
+        if len(dofs) > 1:
+            t0 = data[0]["total_time"]
+            ax.loglog(dofs, t0 * dofs / dofs[0], "k--", alpha=0.4, label="O(N)")
+            ax.loglog(dofs, t0 * (dofs / dofs[0]) ** 1.5, "k:", alpha=0.4, label="O(N^1.5)")
+        ax.set_xlabel("DOFs")
+        ax.set_ylabel("Tempo [s]")
+        ax.set_title(f"Escalabilidade FEM: {kind}")
+        ax.grid(True, which="both", alpha=0.3)
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(os.path.join(out_dir, f"scaling_{kind}.png"), dpi=120)
+        plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for kind in sorted({row["solver"] for row in rows}):
+        data = sorted((row for row in rows if row["solver"] == kind), key=lambda row: row["dofs"])
+        ax.loglog([row["dofs"] for row in data], [row["peak_rss_mb"] for row in data], marker="o", label=kind)
+    ax.set_xlabel("DOFs")
+    ax.set_ylabel("Pico de RSS [MB]")
+    ax.grid(True, which="both", alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, "scaling_memory.png"), dpi=120)
+    plt.close(fig)
+
+def benchmark_fem(geometry="stator", ladder=DEFAULT_LADDER, solvers=tuple(SOLVERS), order=1,
+                  solverConfig=None, out_dir=None, isolate=True):
+    print("=" * 50)
+    print(f"BENCHMARK FEM: {geometry} (P{order}), lc = {ladder}")
+    print("=" * 50)
+    if out_dir is None:
+        out_dir = os.path.join("results", "benchmarks", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    mesh_dir = os.path.join(out_dir, "meshes")
+    os.makedirs(mesh_dir, exist_ok=True)
+
+    rows, profiles = [], []
+    for lc in sorted(ladder, reverse=True):
+        mesh_file = generate_mesh(geometry, lc, order, mesh_dir)
+        for kind in solvers:
+            args = (kind, geometry, lc, mesh_file, solverConfig)
+            row, profile = run_isolated(*args) if isolate else run_case(*args)
+            rows.append(row)
+            profiles.append({"geometry": geometry, "lc": lc, "solver": kind, **profile})
+            print(f"lc={lc:<8g} {kind:<15} DOFs={row['dofs']:<9} montagem={row['assembly_time']:.3f}s "
+                  f"solução={row['solve_time']:.3f}s total={row['total_time']:.3f}s RSS={row['peak_rss_mb']}MB",
+                  flush=True)
+
+    write_tables(rows, profiles, out_dir)
+    plot_scaling(rows, out_dir)
+    print(f"✓ Resultados em: {out_dir}")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--geometry", default="stator", choices=["stator", "plate_holes", "synthetic"])
+    parser.add_argument("--lc", type=float, nargs="+", default=DEFAULT_LADDER, help="Escada de tamanhos de malha")
+    parser.add_argument("--solvers", nargs="+", default=list(SOLVERS), choices=list(SOLVERS))
+    parser.add_argument("--order", type=int, default=1, choices=[1, 2])
+    parser.add_argument("--method", default=None, help="Backend linear (bloco fem_solver)")
+    parser.add_argument("--out", default=None, help="Diretório de saída (padrão: results/benchmarks/<data>)")
+    parser.add_argument("--no-isolate", action="store_true", help="Roda tudo no mesmo processo")
+    args = parser.parse_args()
+    config = {"method": args.method} if args.method else None
+    benchmark_fem(args.geometry, args.lc, args.solvers, args.order, config, args.out, not args.no_isolate)
@@ -30,6 +30,10 @@ def generate_data_for_ml(problem, cfg, model_fem=None):
         Xtr[:,0] = bx0 + Xtr[:,0] * (bx1 - bx0)
         Xtr[:,1] = by0 + Xtr[:,1] * (by1 - by0)
         ytr = u_true(Xtr)
+        # Filtrar NaNs (furos / fora da malha)
+        mask_valid = ~np.isnan(ytr)
+        Xtr = Xtr[mask_valid]
+        ytr = ytr[mask_valid]
 
         # Teste: Pontos aleatórios fora do box (mas dentro do domínio global)
         Lx = cfg.get("Lx", 1.0)
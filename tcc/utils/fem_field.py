@@ -0,0 +1,131 @@
+import os
+import sys
+import numpy as np
+
+# Adicionar raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linear_solvers import array_digest
+from solver import p2_shape_functions
+
+def index_path(mesh_file):
+    """Arquivo do índice espacial salvo ao lado da malha (malha.msh -> malha.locator.npz)."""
+    return os.path.splitext(mesh_file)[0] + ".locator.npz"
+
+class FemField:
+    """
+    Avalia uma solução FEM (P1 ou P2) em pontos arbitrários usando a conectividade real
+    da malha. Um grid uniforme sobre a bounding box guarda, para cada célula, os triângulos
+    cujas bounding boxes a tocam (formato CSR); a consulta testa só esses candidatos, com
+    coordenadas baricêntricas vetorizadas. Pontos fora da malha (furos, exterior) dão NaN.
+    Com mesh_file, o índice é salvo ao lado da malha e reutilizado enquanto a malha não mudar.
+    """
+    def __init__(self, nodes, triElements, values=None, mesh_file=None, tol=1e-10, batch_size=200000):
+        self.nodes = np.asarray(nodes, dtype=float)[:, :2]
+        self.triElements = np.asarray(triElements, dtype=np.int64)
+        self.values = None if values is None else np.asarray(values)
+        self.tol = tol
+        self.batch_size = batch_size
+
+        # Mapa afim de cada triângulo (vértices = 3 primeiros nós, também no P2)
+        p = self.nodes[self.triElements[:, :3]]
+        self.origin = p[:, 0]
+        T = np.stack([p[:, 1] - p[:, 0], p[:, 2] - p[:, 0]], axis=2)     # (E, 2, 2)
+        det = T[:, 0, 0] * T[:, 1, 1] - T[:, 0, 1] * T[:, 1, 0]
+        det[det == 0] = np.nan
+        self.invT = np.stack([np.stack([T[:, 1, 1], -T[:, 0, 1]], axis=1),
+                              np.stack([-T[:, 1, 0], T[:, 0, 0]], axis=1)], axis=1) / det[:, None, None]
+
+        digest = array_digest(self.nodes, self.triElements)
+        path = index_path(mesh_file) if mesh_file else None
+        if path and os.path.exists(path):
+            cached = np.load(path)
+            if str(cached["digest"]) == digest:
+                self._set_index(cached["bbox"], cached["shape"], cached["cellStart"], cached["cellTriangles"])
+                return
+        self._build_index(p)
+        if path:
+            try:
+                np.savez(path, digest=digest, bbox=self.bbox, shape=self.shape,
+                         cellStart=self.cellStart, cellTriangles=self.cellTriangles)
+            except OSError as e:
+                print(f"⚠️ Não foi possível salvar o índice espacial em {path}: {e}")
+
+    def _set_index(self, bbox, shape, cellStart, cellTriangles):
+        self.bbox = np.asarray(bbox, dtype=float)
+        self.shape = np.asarray(shape, dtype=np.int64)
+        self.cellStart = cellStart
+        self.cellTriangles = cellTriangles
+        self.cellSize = (self.bbox[2:] - self.bbox[:2]) / self.shape
+
+    def _build_index(self, p):
+        # ~1 triângulo por célula em média
+        lo, hi = self.nodes.min(axis=0), self.nodes.max(axis=0)
+        extent = np.maximum(hi - lo, 1e-12)
+        n = max(1, len(self.triElements))
+        nx = max(1, int(np.sqrt(n * extent[0] / extent[1])))
+        ny = max(1, int(n / nx))
+        self._set_index(np.concatenate([lo, hi]), [nx, ny], None, None)
+
+        i0, j0 = self._cell(p.min(axis=1)).T
+        i1, j1 = self._cell(p.max(axis=1)).T
+        counts = (i1 - i0 + 1) * (j1 - j0 + 1)
+        tri = np.repeat(np.arange(len(p)), counts)
+        # Posição de cada par (triângulo, célula) dentro da caixa de células do triângulo
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        width = (i1 - i0 + 1)[tri]
+        cells = (j0[tri] + offset // width) * nx + (i0[tri] + offset % width)
+
+        order = np.argsort(cells, kind="stable")
+        self.cellTriangles = tri[order]
+        self.cellStart = np.zeros(nx * ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=nx * ny), out=self.cellStart[1:])
+
+    def _cell(self, points):
+        ij = np.floor((points - self.bbox[:2]) / self.cellSize).astype(np.int64)
+        return np.clip(ij, 0, self.shape - 1)
+
+    def locate(self, points):
+        """Elemento que contém cada ponto (-1 fora da malha) e coordenadas baricêntricas (P, 3)."""
+        points = np.asarray(points, dtype=float)[:, :2]
+        element = np.full(len(points), -1, dtype=np.int64)
+        bary = np.full((len(points), 3), np.nan)
+        for start in range(0, len(points), self.batch_size):
+            chunk = points[start:start + self.batch_size]
+            inside = np.all((chunk >= self.bbox[:2]) & (chunk <= self.bbox[2:]), axis=1)
+            ids = np.flatnonzero(inside)
+            i, j = self._cell(chunk[ids]).T
+            cell = j * self.shape[0] + i
+            counts = self.cellStart[cell + 1] - self.cellStart[cell]
+            # Pares (ponto, triângulo candidato)
+            pointOf = np.repeat(ids, counts)
+            offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            candidate = self.cellTriangles[np.repeat(self.cellStart[cell], counts) + offset]
+
+            local = np.einsum('kab,kb->ka', self.invT[candidate], chunk[pointOf] - self.origin[candidate])
+            lam = np.column_stack([1 - local.sum(axis=1), local])
+            hit = np.all(lam >= -self.tol, axis=1)
+            # Primeiro candidato que contém o ponto (pontos em arestas ficam com um dos vizinhos)
+            first = np.flatnonzero(hit)
+            first = first[np.unique(pointOf[first], return_index=True)[1]]
+            element[start + pointOf[first]] = candidate[first]
+            bary[start + pointOf[first]] = lam[first]
+        return element, bary
+
+    def __call__(self, points, values=None):
+        """Interpola os valores nodais (numNodes,) ou (numNodes, K) nos pontos; NaN fora da malha."""
+        values = self.values if values is None else np.asarray(values)
+        element, bary = self.locate(points)
+        found = element >= 0
+        result = np.full((len(element),) + values.shape[1:], np.nan,
+                         dtype=np.result_type(values.dtype, float))
+        if self.triElements.shape[1] == 6:
+            weights, _ = p2_shape_functions(bary[found])
+        else:
+            weights = bary[found]
+        result[found] = np.einsum('pi,pi...->p...', weights, values[self.triElements[element[found]]])
+        return result
+
+    def predict(self, points):
+        """Interface compatível com os modelos de ML (usada como ground truth)."""
+        return self(points)
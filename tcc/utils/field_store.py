@@ -0,0 +1,94 @@
+import os
+import json
+import numpy as np
+
+HEADER = "fields.json"
+FORMAT_VERSION = 1
+
+def _write_array(directory, name, array):
+    """Grava o array cru (C-contíguo) em <name>.bin e devolve a entrada do cabeçalho."""
+    array = np.ascontiguousarray(array)
+    filename = f"{name}.bin"
+    array.tofile(os.path.join(directory, filename))
+    return {"file": filename, "dtype": array.dtype.str, "shape": list(array.shape)}
+
+def write_fields(directory, nodes, triElements, fields, metadata=None):
+    """
+    Formato binário dos campos de uma solução FEM: um arquivo .bin cru por array (float64,
+    complex128, int64...) e um cabeçalho fields.json com número de nós e elementos, nomes,
+    dtype, forma e localização (node/element) de cada campo. Os arrays podem ser abertos com
+    np.memmap sem carregar o arquivo inteiro.
+    fields: {nome: array} com primeira dimensão numNodes ou numElements.
+    """
+    os.makedirs(directory, exist_ok=True)
+    nodes = np.asarray(nodes)
+    triElements = np.asarray(triElements)
+    numNodes, numElements = len(nodes), len(triElements)
+    header = {
+        "version": FORMAT_VERSION,
+        "num_nodes": int(numNodes),
+        "num_elements": int(numElements),
+        "nodes": _write_array(directory, "nodes", nodes),
+        "elements": _write_array(directory, "elements", triElements),
+        "fields": {},
+        "metadata": metadata or {},
+    }
+    for name, values in fields.items():
+        values = np.asarray(values)
+        if len(values) == numNodes:
+            location = "node"
+        elif len(values) == numElements:
+            location = "element"
+        else:
+            raise ValueError(f"Campo '{name}' com {len(values)} valores não casa com nós nem elementos.")
+        header["fields"][name] = {**_write_array(directory, f"field_{name}", values), "location": location}
+
+    # O cabeçalho é gravado por último: um fields.json presente indica arquivos completos
+    with open(os.path.join(directory, HEADER), "w") as f:
+        json.dump(header, f, indent=4)
+    return header
+
+class FieldStore:
+    """Leitura preguiçosa (np.memmap, somente leitura) de um diretório gravado por write_fields."""
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, HEADER)) as f:
+            self.header = json.load(f)
+        self.numNodes = self.header["num_nodes"]
+        self.numElements = self.header["num_elements"]
+
+    @staticmethod
+    def exists(directory):
+        return os.path.exists(os.path.join(directory, HEADER))
+
+    def _open(self, entry):
+        shape = tuple(entry["shape"])
+        if 0 in shape:
+            return np.empty(shape, dtype=entry["dtype"])
+        return np.memmap(os.path.join(self.directory, entry["file"]), dtype=entry["dtype"], mode="r", shape=shape)
+
+    @property
+    def names(self):
+        return list(self.header["fields"])
+
+    @property
+    def nodes(self):
+        return self._open(self.header["nodes"])
+
+    @property
+    def triElements(self):
+        return self._open(self.header["elements"])
+
+    def location(self, name):
+        return self.header["fields"][name]["location"]
+
+    def field(self, name):
+        if name not in self.header["fields"]:
+            raise KeyError(f"Campo '{name}' não encontrado em {self.directory}.")
+        return self._open(self.header["fields"][name])
+
+    def __getitem__(self, name):
+        return self.field(name)
+
+def open_fields(directory):
+    return FieldStore(directory)
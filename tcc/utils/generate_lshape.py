@@ -1,7 +1,7 @@
 import gmsh
 import sys
 
-def generate_lshape(filename="meshes/files/lshape.msh", lc=0.05):
+def generate_lshape(filename="meshes/files/lshape.msh", lc=0.05, order=1):
     gmsh.initialize()
     gmsh.model.add("lshape")
 
@@ -32,6 +32,9 @@ def generate_lshape(filename="meshes/files/lshape.msh", lc=0.05):
     gmsh.model.addPhysicalGroup(2, [s], 1, name="Domain")
 
     gmsh.model.mesh.generate(2)
+    # Elementos quadráticos (triangle6/line3): nós de meio de aresta sobre as curvas
+    if order > 1:
+        gmsh.model.mesh.setOrder(order)
     gmsh.write(filename)
     gmsh.finalize()
     print(f"Mesh saved to {filename}")
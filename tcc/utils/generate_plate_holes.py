@@ -3,7 +3,10 @@ import sys
 import os
 import random
 
-def generate_plate_holes(filename="meshes/files/plate_holes.msh", L=1.0, n_holes=5, min_r=0.05, max_r=0.1):
+def generate_plate_holes(filename="meshes/files/plate_holes.msh", L=1.0, n_holes=5, min_r=0.05, max_r=0.1, order=1, lc=None, seed=None):
+    # seed fixa a posição dos furos (malhas comparáveis entre tamanhos lc); gerador local
+    # para não alterar o estado global do random no processo que chama
+    rng = random.Random(seed)
     gmsh.initialize()
     gmsh.model.add("plate_holes")
 
@@ -27,16 +30,16 @@ def generate_plate_holes(filename="meshes/files/plate_holes.msh", L=1.0, n_holes
             cy = (j + 0.5) * step
             cells.append((cx, cy))
             
-    random.shuffle(cells)
+    rng.shuffle(cells)
     
     for k in range(min(n_holes, len(cells))):
         cx, cy = cells[k]
         # Randomizar levemente a posição dentro da célula
         jitter = step * 0.2
-        cx += random.uniform(-jitter, jitter)
-        cy += random.uniform(-jitter, jitter)
+        cx += rng.uniform(-jitter, jitter)
+        cy += rng.uniform(-jitter, jitter)
         
-        r = random.uniform(min_r, max_r)
+        r = rng.uniform(min_r, max_r)
         
         # Garantir que não toque as bordas
         if cx - r < 0: cx = r + 0.01
@@ -102,10 +105,14 @@ def generate_plate_holes(filename="meshes/files/plate_holes.msh", L=1.0, n_holes
     gmsh.model.addPhysicalGroup(2, surfaces, name="Domain")
 
     # 5. Gerar Malha
-    gmsh.option.setNumber("Mesh.MeshSizeMax", 0.03) # Resolução fina
-    gmsh.option.setNumber("Mesh.MeshSizeMin", 0.01)
+    # lc=None mantém a resolução fina padrão (0.03 / 0.01)
+    gmsh.option.setNumber("Mesh.MeshSizeMax", lc if lc is not None else 0.03)
+    gmsh.option.setNumber("Mesh.MeshSizeMin", lc / 3 if lc is not None else 0.01)
     
     gmsh.model.mesh.generate(2)
+    # Elementos quadráticos (triangle6/line3): nós de meio de aresta sobre as curvas
+    if order > 1:
+        gmsh.model.mesh.setOrder(order)
     
     # Salvar
     os.makedirs(os.path.dirname(filename), exist_ok=True)
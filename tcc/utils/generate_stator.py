@@ -3,7 +3,7 @@ import sys
 import os
 import numpy as np
 
-def generate_stator_mesh(filename="meshes/files/stator.msh", r_in=0.5, r_out=1.0, n_slots=12, slot_depth=0.2, slot_width_ratio=0.5):
+def generate_stator_mesh(filename="meshes/files/stator.msh", r_in=0.5, r_out=1.0, n_slots=12, slot_depth=0.2, slot_width_ratio=0.5, order=1, lc=0.02):
     """
     Gera uma malha de estator de motor simplificada.
     """
@@ -11,7 +11,7 @@ def generate_stator_mesh(filename="meshes/files/stator.msh", r_in=0.5, r_out=1.0
     gmsh.model.add("stator")
 
     # Parâmetros geométricos
-    lc = 0.02  # REFINADO: 0.05 -> 0.02 para mais pontos de treino
+    # lc: tamanho característico (padrão REFINADO: 0.05 -> 0.02 para mais pontos de treino)
 
     # 1. Disco Externo (Estator completo)
     disk_out = gmsh.model.occ.addDisk(0, 0, 0, r_out, r_out)
@@ -66,6 +66,9 @@ def generate_stator_mesh(filename="meshes/files/stator.msh", r_in=0.5, r_out=1.0
 
     # Gerar Malha
     gmsh.model.mesh.generate(2)
+    # Elementos quadráticos (triangle6/line3): nós de meio de aresta sobre as curvas
+    if order > 1:
+        gmsh.model.mesh.setOrder(order)
     
     # Salvar
     os.makedirs(os.path.dirname(filename), exist_ok=True)
@@ -0,0 +1,181 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import meshio
+
+from utils.mesh_loader import LINE_CELLS, triangle_cells, triangle_tags
+
+CACHE_VERSION = 1
+# Diretório do cache (pode ser trocado pela variável de ambiente TCC_MESH_CACHE)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "TCC_MESH_CACHE", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "meshes", ".cache"))
+
+# Memória do processo: (caminho, mtime, tamanho) -> sha e sha -> CachedMesh
+_DIGESTS = {}
+_MESHES = {}
+
+def file_digest(filename, chunk_size=1 << 20):
+    """SHA-256 do conteúdo do .msh; reaproveitado enquanto mtime e tamanho não mudarem."""
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    if key not in _DIGESTS:
+        h = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+        _DIGESTS[key] = h.hexdigest()
+    return _DIGESTS[key]
+
+def line_cells(mesh):
+    """Arestas de contorno (line/line3, todos os blocos) e a tag física de cada uma (-1 sem tag)."""
+    physical = mesh.cell_data.get("gmsh:physical", [])
+    blocks, tags = [], []
+    for i, block in enumerate(mesh.cells):
+        if block.type in LINE_CELLS:
+            data = np.asarray(block.data).reshape(len(block.data), -1)
+            blocks.append(data)
+            tags.append(np.asarray(physical[i]) if i < len(physical) else np.full(len(data), -1))
+    if not blocks:
+        return np.empty((0, 2), dtype=np.int64), np.empty(0, dtype=np.int64)
+    # line e line3 juntos: completa com o primeiro nó para formar um array retangular
+    width = max(block.shape[1] for block in blocks)
+    blocks = [np.pad(block, ((0, 0), (0, width - block.shape[1])), mode="edge") for block in blocks]
+    return np.concatenate(blocks).astype(np.int64), np.concatenate(tags).astype(np.int64)
+
+def boundary_node_sets(lines, line_tags, tag_to_name, numNodes):
+    """
+    Nós de cada contorno nomeado: um np.unique sobre a chave tag * numNodes + nó ordena por tag
+    e depois por nó. Retorna {nome: int32 array ordenado}.
+    """
+    boundary = {}
+    nodes = lines.ravel()
+    tags = np.repeat(line_tags, lines.shape[1])
+    known = np.isin(tags, list(tag_to_name))
+    if not known.any():
+        return boundary
+    keys = np.unique(tags[known] * numNodes + nodes[known])
+    keyTags, keyNodes = np.divmod(keys, numNodes)
+    starts = np.flatnonzero(np.r_[True, np.diff(keyTags) != 0])
+    for group in np.split(np.arange(len(keys)), starts[1:]):
+        boundary[tag_to_name[keyTags[group[0]]]] = keyNodes[group].astype(np.int32)
+    return boundary
+
+class CachedMesh:
+    """
+    Malha já convertida em arrays: pontos, triângulos (P1/P2) e suas tags, arestas de contorno
+    e suas tags, nomes físicos ({nome: [tag, dim]}), nós de contorno e nós do domínio.
+    Os arrays vindos do cache são memmaps somente leitura.
+    """
+    ARRAYS = ("points", "triangles", "triangle_tags", "lines", "line_tags", "domain_nodes")
+
+    def __init__(self, digest, order, field_data, boundary_nodes, **arrays):
+        self.digest = digest
+        self.order = int(order)
+        self.field_data = {name: [int(v) for v in value] for name, value in field_data.items()}
+        self.boundary_nodes = boundary_nodes
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @property
+    def physical_names(self):
+        """{tag: nome} de todas as dimensões."""
+        return {tag: name for name, (tag, *_) in self.field_data.items()}
+
+    def names_by_dim(self, dim):
+        return {value[0]: name for name, value in self.field_data.items() if len(value) > 1 and value[1] == dim}
+
+    @property
+    def region_names(self):
+        """{tag: nome} das superfícies físicas (dim 2)."""
+        return self.names_by_dim(2)
+
+    @property
+    def boundary_names(self):
+        """Nomes das linhas físicas (dim 1), na ordem do arquivo."""
+        return list(self.names_by_dim(1).values())
+
+    @classmethod
+    def from_file(cls, filename, digest=None):
+        try:
+            mesh = meshio.read(filename)
+        except SystemExit:
+            # O meshio encerra o processo (sys.exit) quando não reconhece o formato
+            raise ValueError(f"Formato de malha não reconhecido pelo meshio: {filename}") from None
+        triangles, order = triangle_cells(mesh)
+        lines, lineTags = line_cells(mesh)
+        # field_data: Nome -> [tag, dim]
+        fieldData = {name: np.asarray(value).tolist() for name, value in mesh.field_data.items()}
+        tagToName = {value[0]: name for name, value in fieldData.items()}
+        points = np.asarray(mesh.points, dtype=float)
+        if len(triangles):
+            domainNodes = np.unique(triangles).astype(np.int32)
+        else:
+            domainNodes = np.empty(0, dtype=np.int32)
+        return cls(digest or file_digest(filename), order, fieldData,
+                   boundary_node_sets(lines, lineTags, tagToName, len(points)),
+                   points=points, triangles=np.asarray(triangles, dtype=np.int64),
+                   triangle_tags=triangle_tags(mesh), lines=lines, line_tags=lineTags,
+                   domain_nodes=domainNodes)
+
+    def save(self, directory):
+        """Grava um .npy por array e meta.json; a pasta final aparece de uma vez (rename atômico)."""
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            for name in self.ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), getattr(self, name))
+            boundaries = {}
+            for k, (name, nodes) in enumerate(self.boundary_nodes.items()):
+                boundaries[name] = f"boundary_{k}.npy"
+                np.save(os.path.join(staging, boundaries[name]), nodes)
+            meta = {"version": CACHE_VERSION, "digest": self.digest, "order": self.order,
+                    "field_data": self.field_data, "boundaries": boundaries}
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=4)
+            os.rename(staging, directory)
+        except OSError:
+            # Outro processo gravou a mesma malha antes (ou disco somente leitura)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION:
+            raise ValueError("Versão do cache de malha incompatível.")
+
+        def array(filename):
+            return np.load(os.path.join(directory, filename), mmap_mode="r")
+        boundary = {name: array(filename) for name, filename in meta["boundaries"].items()}
+        return cls(meta["digest"], meta["order"], meta["field_data"], boundary,
+                   **{name: array(f"{name}.npy") for name in cls.ARRAYS})
+
+def load_mesh(filename, cache_dir=None):
+    """
+    Ponto único de leitura de .msh: o conteúdo é identificado pelo SHA-256 do arquivo e os
+    arrays ficam em <cache_dir>/<sha>/ (.npy abertos com mmap). O texto do gmsh só é
+    interpretado na primeira vez que um conteúdo aparece; no mesmo processo o objeto é reusado.
+    """
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"Mesh file not found: {filename}")
+    digest = file_digest(filename)
+    if digest in _MESHES:
+        return _MESHES[digest]
+
+    directory = os.path.join(cache_dir or DEFAULT_CACHE_DIR, digest)
+    mesh = None
+    if os.path.exists(os.path.join(directory, "meta.json")):
+        try:
+            mesh = CachedMesh.load(directory)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Cache de malha inválido em {directory} ({e}); relendo {filename}.")
+            shutil.rmtree(directory, ignore_errors=True)
+    if mesh is None:
+        mesh = CachedMesh.from_file(filename, digest)
+        mesh.save(directory)
+    _MESHES[digest] = mesh
+    return mesh
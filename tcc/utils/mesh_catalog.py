@@ -0,0 +1,169 @@
+import os
+import json
+import tempfile
+import threading
+import numpy as np
+
+from utils.mesh_cache import file_digest, load_mesh
+
+CATALOG_VERSION = 1
+CATALOG_FILE = ".catalog.json"
+
+def triangle_quality(points, triangles):
+    """
+    Qualidade de cada triângulo (vértices P1): q = 4*sqrt(3)*área / soma dos lados², 1 para o
+    equilátero e 0 para o degenerado. Retorna (q, área).
+    """
+    p = np.asarray(points)[:, :2][np.asarray(triangles)[:, :3]]
+    e0, e1, e2 = p[:, 1] - p[:, 0], p[:, 2] - p[:, 1], p[:, 0] - p[:, 2]
+    area = 0.5 * np.abs(e0[:, 0] * e2[:, 1] - e0[:, 1] * e2[:, 0])
+    sumSq = (e0 ** 2).sum(axis=1) + (e1 ** 2).sum(axis=1) + (e2 ** 2).sum(axis=1)
+    q = np.divide(4.0 * np.sqrt(3.0) * area, sumSq, out=np.zeros_like(area), where=sumSq > 0)
+    return q, area
+
+def mesh_entry(filename, stat=None):
+    """Metadados de um .msh (lidos do cache de arrays da malha, não do texto do gmsh)."""
+    stat = stat or os.stat(filename)
+    mesh = load_mesh(filename)
+    points = np.asarray(mesh.points)
+    entry = {
+        "filename": os.path.basename(filename),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_digest(filename),
+        "num_nodes": int(len(points)),
+        "num_elements": int(len(mesh.triangles)),
+        "order": mesh.order,
+        "boundaries": mesh.boundary_names,
+        "regions": list(mesh.region_names.values()),
+        "bbox": None,
+        "quality": None,
+    }
+    if len(points):
+        entry["bbox"] = [float(v) for v in (*points[:, :2].min(axis=0), *points[:, :2].max(axis=0))]
+    if len(mesh.triangles):
+        q, area = triangle_quality(points, mesh.triangles)
+        entry["quality"] = {
+            "min": float(q.min()),
+            "mean": float(q.mean()),
+            "max": float(q.max()),
+            "poor_elements": int(np.count_nonzero(q < 0.3)),
+            "min_area": float(area.min()),
+            "max_area": float(area.max()),
+        }
+    return entry
+
+class MeshCatalog:
+    """
+    Índice JSON (<mesh_dir>/.catalog.json) com os metadados das malhas. Uma entrada vale
+    enquanto tamanho e mtime do arquivo baterem (só um os.stat); se mudarem, o SHA-256 decide
+    se o conteúdo mudou de fato antes de recalcular. Malhas ilegíveis também entram no índice
+    (campo "error"), para não serem relidas a cada listagem.
+    """
+    def __init__(self, mesh_dir, path=None):
+        self.mesh_dir = mesh_dir
+        self.path = path or os.path.join(mesh_dir, CATALOG_FILE)
+        self.lock = threading.Lock()
+        self.entries = self._read()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == CATALOG_VERSION:
+                return data["meshes"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def _write(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".catalog-", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": CATALOG_VERSION, "meshes": self.entries}, f, indent=4)
+        os.replace(staging, self.path)
+
+    def _refresh(self, filename):
+        """Valida (ou recalcula) a entrada de um arquivo; retorna (entrada, mudou)."""
+        path = os.path.join(self.mesh_dir, filename)
+        stat = os.stat(path)
+        entry = self.entries.get(filename)
+        if entry is not None and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return entry, False
+        if entry is not None and entry["sha256"] == file_digest(path):
+            # Só o mtime mudou (ex.: arquivo copiado/tocado): conteúdo igual
+            entry["mtime_ns"] = stat.st_mtime_ns
+        else:
+            entry = self._build(path, stat)
+        self.entries[filename] = entry
+        return entry, True
+
+    @staticmethod
+    def _build(path, stat):
+        """
+        Entrada completa ou, se a malha não puder ser lida, uma entrada de erro com a mesma
+        validação por tamanho/mtime: o arquivo quebrado só é relido quando mudar.
+        """
+        try:
+            return mesh_entry(path, stat)
+        except Exception as e:
+            print(f"⚠️ Catálogo: falha ao ler {os.path.basename(path)}: {e}")
+            return {
+                "filename": os.path.basename(path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_digest(path),
+                "error": str(e) or type(e).__name__,
+            }
+
+    def list(self):
+        """Entradas de todos os .msh do diretório (arquivos novos entram, removidos saem)."""
+        with self.lock:
+            files = sorted(f for f in os.listdir(self.mesh_dir) if f.endswith(".msh")) \
+                if os.path.isdir(self.mesh_dir) else []
+            changed = set(self.entries) != set(files)
+            self.entries = {name: self.entries[name] for name in files if name in self.entries}
+            result = []
+            for name in files:
+                try:
+                    entry, updated = self._refresh(name)
+                except OSError:
+                    # Removido entre o listdir e o stat
+                    continue
+                changed |= updated
+                result.append(entry)
+            if changed:
+                self._write()
+            return result
+
+    def get(self, filename):
+        """
+        Entrada de uma malha; FileNotFoundError se o arquivo não existir. Malhas ilegíveis
+        devolvem a entrada com o campo "error".
+        """
+        with self.lock:
+            path = os.path.join(self.mesh_dir, filename)
+            if not os.path.exists(path):
+                self.entries.pop(filename, None)
+                raise FileNotFoundError(f"Mesh file not found: {path}")
+            entry, changed = self._refresh(filename)
+            if changed:
+                self._write()
+            return entry
+
+    def update(self, filename):
+        """Recalcula a entrada (upload/geração), sem confiar em tamanho e mtime."""
+        with self.lock:
+            path = os.path.join(self.mesh_dir, filename)
+            self.entries[filename] = self._build(path, os.stat(path))
+            self._write()
+            return self.entries[filename]
+
+_CATALOGS = {}
+
+def mesh_catalog(mesh_dir):
+    """Um catálogo por diretório no processo (compartilhado entre rotas e jobs de geração)."""
+    mesh_dir = os.path.abspath(mesh_dir)
+    if mesh_dir not in _CATALOGS:
+        _CATALOGS[mesh_dir] = MeshCatalog(mesh_dir)
+    return _CATALOGS[mesh_dir]
@@ -1,91 +1,95 @@
 import numpy as np
 import os
-import meshio
+
+# Tipos de célula do meshio por ordem dos elementos (1: linear, 2: quadrático)
+TRIANGLE_CELLS = {"triangle": 1, "triangle6": 2}
+LINE_CELLS = ("line", "line3")
+
+def triangle_cells(mesh):
+    """Conectividade dos triângulos de um objeto meshio e sua ordem (triangle6 tem prioridade)."""
+    for cell_type in ("triangle6", "triangle"):
+        if cell_type in mesh.cells_dict:
+            return mesh.cells_dict[cell_type], TRIANGLE_CELLS[cell_type]
+    return np.empty((0, 3), dtype=int), 1
+
+def triangle_tags(mesh):
+    """Tag física (gmsh:physical) de cada triângulo, na mesma ordem de triangle_cells (-1 sem tag)."""
+    cells, order = triangle_cells(mesh)
+    cell_type = "triangle6" if order == 2 else "triangle"
+    physical = mesh.cell_data.get("gmsh:physical", [])
+    blocks = [np.asarray(physical[i]) if i < len(physical) else np.full(len(block.data), -1)
+              for i, block in enumerate(mesh.cells) if block.type == cell_type]
+    if not blocks:
+        return np.full(len(cells), -1, dtype=np.int64)
+    return np.concatenate(blocks).astype(np.int64)
+
+def material_arrays(tags, region_names, materials, defaults):
+    """
+    Propriedades por elemento a partir das superfícies físicas da malha.
+    tags: (E,) tag de cada triângulo; region_names: {tag: nome}; materials: {nome: {prop: valor}}
+    (config "materials"); defaults: {prop: valor} para regiões sem material ou sem a propriedade.
+    Cada propriedade vira uma tabela indexada pela tag e é atribuída num único indexamento.
+    Retorna {prop: (E,) array}.
+    """
+    tags = np.asarray(tags, dtype=np.int64)
+    unknown = set(materials) - set(region_names.values())
+    if unknown:
+        print(f"⚠️ Materiais sem região física correspondente na malha: {sorted(unknown)}")
+    # Posição extra no fim da tabela: triângulos sem tag (-1) recebem o padrão
+    size = max([int(tags.max(initial=-1))] + list(region_names)) + 2
+    result = {}
+    for prop, default in defaults.items():
+        table = np.full(size, default, dtype=np.result_type(float, default))
+        for tag, name in region_names.items():
+            if prop in materials.get(name, {}):
+                table[tag] = materials[name][prop]
+        result[prop] = table[tags]
+    return result
+
+def resolve_mesh_path(filename):
+    """Resolve path: check if absolute, else check in meshes/, else use as is."""
+    if os.path.isabs(filename):
+        return filename
+    # Try meshes/ directory first
+    meshes_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "meshes", filename)
+    if os.path.exists(meshes_path):
+        return meshes_path
+    return filename
 
 class MeshLoader:
     def __init__(self, filename):
-        # Resolve path: check if absolute, else check in meshes/, else use as is
-        if os.path.isabs(filename):
-            self.filename = filename
-        else:
-            # Try meshes/ directory first
-            meshes_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "meshes", filename)
-            if os.path.exists(meshes_path):
-                self.filename = meshes_path
-            else:
-                self.filename = filename
+        self.filename = resolve_mesh_path(filename)
                 
         self.nodes = {} # id -> [x, y, z] (Not strictly used as dict anymore, but kept for compatibility if needed)
         self.points = None # (N, 3) array
         self.physical_names = {} # tag -> name
-        self.boundary_nodes = {} # name -> list of node indices (0-indexed)
-        self.domain_nodes = [] # list of node indices inside domain
+        self.region_names = {} # tag -> name (só superfícies físicas, dim 2)
+        self.triangle_tags = None # (E,) tag física de cada triângulo
+        self.triangles = None # (E, 3) ou (E, 6) conectividade dos triângulos
+        self.order = 1 # ordem dos elementos (1: P1, 2: P2)
+        self.boundary_nodes = {} # name -> int32 array of node indices (0-indexed, sorted)
+        self.domain_nodes = np.empty(0, dtype=np.int32) # int32 array of node indices inside domain
         
         self._load_mesh()
 
     def _load_mesh(self):
-        if not os.path.exists(self.filename):
-            raise FileNotFoundError(f"Mesh file not found: {self.filename}")
-            
-        mesh = meshio.read(self.filename)
-        print(f"DEBUG: Mesh object: {mesh}")
-        print(f"DEBUG: Mesh keys: {dir(mesh)}")
-        print(f"DEBUG: mesh.cell_data keys: {mesh.cell_data.keys()}")
-        if hasattr(mesh, "cell_sets"):
-             print(f"DEBUG: mesh.cell_sets keys: {mesh.cell_sets.keys()}")
-        
+        # Import tardio: utils.mesh_cache usa os auxiliares deste módulo
+        from utils.mesh_cache import load_mesh
+
+        # Arrays do cache endereçado pelo conteúdo (o .msh só é interpretado na primeira vez)
+        mesh = load_mesh(self.filename)
+        self.mesh = mesh
         self.points = mesh.points
-        
-        # Parse physical names
-        # mesh.field_data maps Name -> [tag, dim]
-        tag_to_name = {}
-        print(f"DEBUG: mesh.field_data keys: {list(mesh.field_data.keys())}")
-        for name, data in mesh.field_data.items():
-            tag = data[0]
-            tag_to_name[tag] = name
-            self.physical_names[tag] = name
-            
-        # Process cells
-        # mesh.cells_dict['line'] -> (M, 2)
-        # mesh.cell_data['gmsh:physical'] -> list of arrays corresponding to cells
-        
-        # We need to match cell blocks to cell data
-        # meshio stores cells as a list of blocks, and cell_data as a dict of lists
-        
-        # Iterate over blocks to find lines and triangles
-        cell_data_physical = mesh.cell_data.get('gmsh:physical', [])
-        print(f"DEBUG: cell_data_physical len: {len(cell_data_physical)}")
-        
-        for i, cell_block in enumerate(mesh.cells):
-            cell_type = cell_block.type
-            data = cell_block.data # (N_cells, N_nodes_per_cell)
-            
-            # Get physical tags for this block
-            if i < len(cell_data_physical):
-                tags = cell_data_physical[i]
-            else:
-                tags = []
-            
-            if cell_type == 'line':
-                # Boundary elements
-                for j, tag in enumerate(tags):
-                    if tag in tag_to_name:
-                        name = tag_to_name[tag]
-                        if name not in self.boundary_nodes:
-                            self.boundary_nodes[name] = set()
-                        
-                        # Add nodes to boundary set
-                        for node_idx in data[j]:
-                            self.boundary_nodes[name].add(node_idx)
-                            
-            elif cell_type == 'triangle':
-                # Domain elements
-                domain_set = set(self.domain_nodes)
-                for cell in data:
-                    for node_idx in cell:
-                        domain_set.add(node_idx)
-                self.domain_nodes = list(domain_set)
-        
+        self.triangles = mesh.triangles
+        self.order = mesh.order
+        self.physical_names = mesh.physical_names
+        self.region_names = mesh.region_names
+        self.triangle_tags = mesh.triangle_tags
+        self.boundary_nodes = dict(mesh.boundary_nodes)
+        self.domain_nodes = mesh.domain_nodes
+
+        print(f"DEBUG: Mesh {os.path.basename(self.filename)} (sha256 {mesh.digest[:12]}): "
+              f"{len(self.points)} nós, {len(self.triangles)} triângulos P{self.order}")
         print(f"DEBUG: Detected boundaries: {list(self.boundary_nodes.keys())}")
         for name, nodes in self.boundary_nodes.items():
             print(f"DEBUG: Boundary '{name}' has {len(nodes)} nodes.")
@@ -95,13 +99,12 @@ class MeshLoader:
         if boundary_name not in self.boundary_nodes:
             return np.empty((0, 2))
         
-        node_indices = list(self.boundary_nodes[boundary_name])
         # self.points is (N, 3), take (N, 2)
-        return self.points[node_indices, :2]
+        return self.points[self.boundary_nodes[boundary_name], :2]
 
     def get_domain_points(self):
         """Returns (N, 2) array of all points in the domain."""
-        if not self.domain_nodes:
+        if len(self.domain_nodes) == 0:
             # If no domain nodes identified (e.g. only points loaded), return all
             return self.points[:, :2]
             
@@ -124,16 +127,11 @@ def load_mesh_data(filename):
     # NodeTags (just indices 1-based for compatibility if needed, or 0-based)
     nodeTags = np.arange(len(nodes))
     
-    # Elements and TriElements
-    mesh = meshio.read(loader.filename)
-    
-    # Extract triangles
-    triElements = []
-    if 'triangle' in mesh.cells_dict:
-        triElements = mesh.cells_dict['triangle']
+    # Elements and TriElements (triangle ou triangle6), do cache de malhas
+    triElements = loader.triangles
     
-    # Elements (all cells)
-    elements = mesh.cells
+    # Elements (células de contorno e de domínio)
+    elements = [("line", loader.mesh.lines), ("triangle6" if loader.order == 2 else "triangle", triElements)]
     
     # Boundary Conditions
     boundaryConditions = {}
@@ -141,7 +139,7 @@ def load_mesh_data(filename):
         boundaryConditions[name] = {
             "type": "dirichlet", # Default, can be changed in config
             "value": 0.0,
-            "nodes": list(node_indices)
+            "nodes": node_indices
         }
         
     return nodes, nodeTags, triElements, elements, boundaryConditions
@@ -0,0 +1,66 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# resource só existe em sistemas POSIX; sem ele o pico de RSS fica como None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss_mb():
+    """Pico de memória residente do processo (MB) desde o início da execução."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+class FemProfiler:
+    """
+    Instrumentação leve do pipeline FEM: tempo de parede e pico de RSS por fase
+    (element_setup, boundary_conditions, assembly, solve, post_processing) e contadores
+    (DOFs, elementos, nnz). Fases repetidas acumulam tempo e número de chamadas.
+    """
+    PHASES = ("element_setup", "boundary_conditions", "assembly", "solve", "post_processing")
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, wall_time, **extra):
+        """Registra uma fase medida fora do profiler (ex.: tempo de setup do batch)."""
+        entry = self.phases.setdefault(name, {"wall_time": 0.0, "calls": 0})
+        entry["wall_time"] += float(wall_time)
+        entry["calls"] += 1
+        entry["peak_rss_mb"] = peak_rss_mb()
+        entry.update(extra)
+
+    def count(self, **counters):
+        self.counters.update({key: value for key, value in counters.items() if value is not None})
+
+    def to_dict(self):
+        ordered = {name: self.phases[name] for name in self.PHASES if name in self.phases}
+        ordered.update({name: data for name, data in self.phases.items() if name not in ordered})
+        return {
+            "phases": ordered,
+            "total_time": sum(data["wall_time"] for data in ordered.values()),
+            "peak_rss_mb": peak_rss_mb(),
+            **self.counters,
+        }
+
+    def summary(self):
+        """Tabela legível das fases (para o log do experimento)."""
+        lines = [f"{'fase':<20} {'tempo [s]':>10} {'pico RSS [MB]':>14}"]
+        for name, data in self.to_dict()["phases"].items():
+            rss = data.get("peak_rss_mb")
+            lines.append(f"{name:<20} {data['wall_time']:10.4f} {rss if rss is not None else float('nan'):14.1f}")
+        return "\n".join(lines)
@@ -1,4 +1,3 @@
-import meshio
 import matplotlib.pyplot as plt
 import numpy as np
 import sys
@@ -28,11 +27,11 @@ def view_mesh():
     fig, ax = plt.subplots(figsize=(10, 10))
     
     # 1. Plotar Elementos (Triângulos)
-    mesh = meshio.read(mesh_file)
-    points = mesh.points[:, :2]
+    points = loader.points[:, :2]
     
-    if "triangle" in mesh.cells_dict:
-        triangles = mesh.cells_dict["triangle"]
+    if len(loader.triangles):
+        # P2: os 3 primeiros nós são os vértices
+        triangles = loader.triangles[:, :3]
         ax.triplot(points[:, 0], points[:, 1], triangles, 'k-', lw=0.5, alpha=0.3, label='Malha')
     
     # 2. Plotar Nós de Contorno (Coloridos por Grupo)
@@ -1,10 +1,8 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-import meshio
 import os
 import sys
-from scipy.interpolate import griddata
 import shutil
 
 # Adicionar raiz ao path para imports
@@ -15,6 +13,10 @@ from problems import get_problem
 from models.pinn import PINN
 from solver import ElectrostaticSolver, MagnetostaticSolver, MagnetodynamicSolver
 from utils.checkpoint import CheckpointManager
+from utils.fem_field import FemField
+from utils.field_store import FieldStore, open_fields
+from utils.mesh_loader import resolve_mesh_path
+from utils.mesh_cache import load_mesh
 
 def generate_interactive_plot(run_dir=None, config=None, pinn_instance=None):
     print("="*50)
@@ -190,13 +192,46 @@ def plot_2d(run_dir, config, pinn_instance, problem):
     fig.update_layout(title=f"Análise 2D: {config['problem']}", template="plotly_dark", height=500)
     save_plot(fig, run_dir)
 
+def solve_fem(kind, fem_data):
+    """Resolve o FEM do problema (quando a execução não gravou os campos); retorna |potencial|."""
+    print(f"Resolvendo FEM ({kind})...")
+
+    solver = None
+    if kind == "electrostatic":
+        solver = ElectrostaticSolver(
+            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
+            fem_data["elements"], fem_data["boundaryConditions"],
+            solverConfig=fem_data.get("solverConfig")
+        )
+    elif kind == "magnetostatic":
+        solver = MagnetostaticSolver(
+            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
+            fem_data["elements"], fem_data["boundaryConditions"],
+            solverConfig=fem_data.get("solverConfig")
+        )
+    elif kind == "magnetodynamic":
+        solver = MagnetodynamicSolver(
+            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
+            fem_data["elements"], fem_data["boundaryConditions"], fem_data["frequency"],
+            solverConfig=fem_data.get("solverConfig")
+        )
+
+    if solver is None:
+        return None
+    solver.assemble_global_matrix_and_vector()
+    solver.apply_boundary_conditions()
+    solver.solve()
+    # Magnitude para visualização (magnetodinâmico é complexo)
+    return np.abs(solver.get_potential())
+
 def plot_mesh(run_dir, config, pinn_instance, problem):
     print("--- Gerando Visualização Mesh (FEM vs PINN) ---")
 
-    mesh_file = config["mesh_file"]
-    mesh = meshio.read(mesh_file)
+    mesh_file = resolve_mesh_path(config["mesh_file"])
+    mesh = load_mesh(mesh_file)
     points = mesh.points[:, :2]
-    triangles = mesh.cells_dict.get("triangle")
+    # P2 (triangle6): os 3 primeiros nós são os vértices, usados no plot
+    triangles = mesh.triangles[:, :3] if len(mesh.triangles) else None
 
     if pinn_instance is None:
         pinn = PINN(config, problem)
@@ -211,37 +246,25 @@ def plot_mesh(run_dir, config, pinn_instance, problem):
     fem_data = problem["fem_data"]
     kind = problem.get("kind", "electrostatic")
 
-    print(f"Resolvendo FEM ({kind})...")
-
-    solver = None
-    if kind == "electrostatic":
-        solver = ElectrostaticSolver(
-            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
-            fem_data["elements"], fem_data["boundaryConditions"]
-        )
-    elif kind == "magnetostatic":
-        solver = MagnetostaticSolver(
-            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
-            fem_data["elements"], fem_data["boundaryConditions"]
-        )
-    elif kind == "magnetodynamic":
-        solver = MagnetodynamicSolver(
-            fem_data["nodes"], fem_data["nodeTags"], fem_data["triElements"],
-            fem_data["elements"], fem_data["boundaryConditions"], fem_data["frequency"]
-        )
-
-    if solver:
-        solver.assemble_global_matrix_and_vector()
-        solver.apply_boundary_conditions()
-        solver.solve()
-        fem_potential = solver.get_potential()
-
-        # Handle Complex Numbers for Magnetodynamic
-        if np.iscomplexobj(fem_potential):
-            fem_potential = np.abs(fem_potential) # Magnitude for visualization
+    fem_triangles = fem_data["triElements"]
+    # Índice espacial salvo ao lado da malha só quando a conectividade é a do próprio .msh
+    locator_file = mesh_file
+    store_dir = os.path.join(run_dir, "fem_fields") if run_dir else None
+    if store_dir and FieldStore.exists(store_dir):
+        # Solução gravada pelo main.py: abre via memmap em vez de re-resolver o FEM
+        print(f"Carregando campos FEM de {store_dir}...")
+        store = open_fields(store_dir)
+        points = np.asarray(store.nodes)
+        fem_triangles = np.asarray(store.triElements)
+        triangles = fem_triangles[:, :3]
+        fem_potential = np.abs(store["potential"])
+        # Malha do store (ex.: refinada pela adaptividade) difere do .msh: índice não é salvo
+        locator_file = None
     else:
-        print("Solver não instanciado.")
-        return
+        fem_potential = solve_fem(kind, fem_data)
+        if fem_potential is None:
+            print("Solver não instanciado.")
+            return
 
     # 4. Preparar Dados 2D
     scale = problem.get("scaling_factor", 1.0)
@@ -307,7 +330,7 @@ def plot_mesh(run_dir, config, pinn_instance, problem):
     else:
         slice_pinn = slice_pred_pinn.ravel() * scale
 
-    slice_fem = griddata(points, U_fem, slice_points, method='linear')
+    slice_fem = FemField(points, fem_triangles, U_fem, mesh_file=locator_file)(slice_points)
     slice_error = np.abs(slice_pinn - slice_fem)
 
     # --- PLOTLY LAYOUT ---